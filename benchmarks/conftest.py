@@ -0,0 +1,47 @@
+"""
+Benchmarks, run with::
+
+    $ pytest benchmarks --benchmark-only
+
+They are skipped by a plain ``pytest`` run. Each benchmark is warmed up and
+timed with the garbage collector disabled, for numbers stable enough to
+compare between runs. Save a baseline before a change::
+
+    $ pytest benchmarks --benchmark-only --benchmark-save=baseline
+
+then compare with it, failing on a regression of the median over 10%::
+
+    $ pytest benchmarks --benchmark-only --benchmark-compare \
+        --benchmark-compare-fail=median:10%
+"""
+
+import pytest
+
+from lego_deck.users.models import User
+from lego_deck.users.tests.factories import UserFactory
+
+
+def pytest_collection_modifyitems(config, items):
+    benchmarks = [
+        item for item in items if "benchmark" in getattr(item, "fixturenames", ())
+    ]
+    if not config.getoption("benchmark_only"):
+        skip = pytest.mark.skip(reason="benchmarks only run with --benchmark-only")
+        for item in benchmarks:
+            item.add_marker(skip)
+        return
+    for item in benchmarks:
+        # Appended, a benchmark's own marker takes precedence.
+        item.add_marker(
+            pytest.mark.benchmark(
+                warmup=True,
+                disable_gc=True,
+                group=item.module.__name__,
+            ),
+            append=True,
+        )
+
+
+@pytest.fixture()
+def user(db) -> User:
+    return UserFactory()
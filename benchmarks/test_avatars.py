@@ -0,0 +1,34 @@
+"""
+Time to produce all avatar variants from one upload, the Celery task's cost per
+image. Throughput per worker process is ``1 / mean``.
+"""
+
+import io
+
+import pytest
+from PIL import Image
+
+from lego_deck.users import avatars
+
+
+def _photo(size: tuple[int, int], format_: str = "JPEG") -> bytes:
+    # Noise compresses like a photo would, a flat colour is unrealistically cheap.
+    image = Image.effect_noise(size, 64).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=format_)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    ("size", "format_"),
+    [((1024, 768), "JPEG"), ((4032, 3024), "JPEG"), ((1024, 768), "PNG")],
+    ids=["jpeg-1024", "jpeg-4032", "png-1024"],
+)
+def test_render_variants(benchmark, size, format_):
+    data = _photo(size, format_)
+
+    def render():
+        return avatars.render_variants(Image.open(io.BytesIO(data)))
+
+    variants = benchmark(render)
+    assert len(variants) == len(avatars.SIZES) * len(avatars.FORMATS)
@@ -0,0 +1,82 @@
+"""
+Cache client benchmarks:
+
+- latency of reading a hot key through plain django-redis and the two-tier
+  client, this needs a Redis server at ``REDIS_URL``,
+- encoding and decoding representative payloads with and without compression,
+  the stored size is in each result's ``extra_info``.
+"""
+
+import pytest
+import redis
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import render_to_string
+from django_redis.cache import RedisCache
+from rest_framework.renderers import JSONRenderer
+
+from lego_deck.core import page_cache
+from lego_deck.users.api.serializers import UserSerializer
+from lego_deck.users.tests.factories import UserFactory
+
+
+@pytest.fixture(
+    params=[
+        "django_redis.client.DefaultClient",
+        "lego_deck.core.cache.TwoTierClient",
+    ],
+    ids=["django-redis", "two-tier"],
+)
+def cache(request):
+    try:
+        redis.Redis.from_url(settings.REDIS_URL).ping()
+    except redis.ConnectionError:
+        pytest.skip(f"no Redis server at {settings.REDIS_URL}")
+    cache = RedisCache(settings.REDIS_URL, {"OPTIONS": {"CLIENT_CLASS": request.param}})
+    if hasattr(cache.client, "ensure_listener"):
+        cache.client.ensure_listener()
+        cache.client.subscribed.wait(timeout=5)
+    cache.set("benchmark:settings", {"site_name": "Lego Deck", "maintenance": False})
+    yield cache
+    cache.delete("benchmark:settings")
+
+
+def test_get_hot_key(benchmark, cache):
+    assert benchmark(cache.get, "benchmark:settings")["site_name"] == "Lego Deck"
+
+
+@pytest.fixture(params=["api_response", "fragment", "page"])
+def payload(request, rf):
+    if request.param == "api_response":
+        users = UserFactory.build_batch(50)
+        for pk, user in enumerate(users, start=1):
+            user.pk = pk
+        serializer = UserSerializer(users, many=True, context={"request": rf.get("/")})
+        return JSONRenderer().render(serializer.data)
+    home = rf.get("/")
+    home.user = AnonymousUser()
+    html = render_to_string("pages/home.html", request=home)
+    if request.param == "fragment":
+        return html
+    return page_cache.Entry(html.encode(), 200, [("Content-Type", "text/html")], 0)
+
+
+@pytest.fixture(
+    params=[
+        "django_redis.compressors.identity.IdentityCompressor",
+        "lego_deck.core.cache.Lz4Compressor",
+    ],
+    ids=["uncompressed", "lz4"],
+)
+def client(request):
+    # Encoding doesn't connect.
+    return RedisCache(
+        settings.REDIS_URL,
+        {"OPTIONS": {"COMPRESSOR": request.param}},
+    ).client
+
+
+@pytest.mark.django_db()
+def test_encode_decode(benchmark, client, payload):
+    benchmark.extra_info["bytes"] = len(client.encode(payload))
+    assert benchmark(lambda: client.decode(client.encode(payload))) == payload
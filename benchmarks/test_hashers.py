@@ -0,0 +1,44 @@
+"""
+Logins per second per core: password checks with the production costs, from
+as many threads as there are cores and hashing processes, in the pool or in
+the threads themselves.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.hashers import make_password
+
+from lego_deck.users import hashers
+
+PASSWORD = "correct horse battery staple"  # noqa: S105
+CORES = len(os.sched_getaffinity(0))
+# Checked per round, a few per core.
+LOGINS = 4 * CORES
+
+
+@pytest.fixture(params=[CORES, 0], ids=["pool", "inline"])
+def workers(request, settings):
+    settings.PASSWORD_HASHERS = ["lego_deck.users.hashers.Argon2PasswordHasher"]
+    settings.PASSWORD_HASHING_WORKERS = request.param
+    settings.PASSWORD_HASHING_QUEUE = LOGINS
+    yield request.param
+    hashers.pool.shutdown()
+
+
+def test_logins(benchmark, workers):
+    encoded = make_password(PASSWORD)
+    with ThreadPoolExecutor(CORES) as threads:
+
+        def logins():
+            return all(
+                threads.map(check_password, [PASSWORD] * LOGINS, [encoded] * LOGINS),
+            )
+
+        assert benchmark.pedantic(logins, rounds=5, warmup_rounds=1)
+
+    benchmark.extra_info["logins_per_second_per_core"] = (
+        LOGINS / benchmark.stats.stats.median / CORES
+    )
@@ -0,0 +1,68 @@
+"""
+Throughput of log calls, ``ops`` in the results is log calls per second, with:
+
+- the previous configuration: a ``StreamHandler`` formatting and writing the
+  record in the calling thread,
+- ``lego_deck.core.log.QueueHandler`` with the JSON formatter.
+
+Each is measured writing to ``/dev/null`` and to a stream taking 50µs per
+write, like a stdout whose reader falls behind. Records dropped by the queue
+are counted in ``extra_info``.
+"""
+
+import logging
+import os
+import time
+
+import pytest
+
+from lego_deck.core import log
+
+VERBOSE = "%(levelname)s %(asctime)s %(module)s %(process)d %(thread)d %(message)s"
+
+
+class SlowStream:
+    def __init__(self, stream, delay: float):
+        self.stream = stream
+        self.delay = delay
+
+    def write(self, data):
+        time.sleep(self.delay)
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+@pytest.fixture(params=["devnull", "slow"])
+def stream(request):
+    with open(os.devnull, "w") as devnull:  # noqa: PTH123
+        yield devnull if request.param == "devnull" else SlowStream(devnull, 50e-6)
+
+
+@pytest.fixture(params=["stream", "queue"])
+def handler(request, stream):
+    handler: logging.Handler
+    if request.param == "stream":
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(VERBOSE))
+    else:
+        handler = log.QueueHandler(stream)
+        handler.setFormatter(log.JsonFormatter())
+    yield handler
+    handler.close()
+
+
+@pytest.fixture()
+def logger(handler):
+    logger = logging.getLogger("benchmarks.logging")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    yield logger
+    logger.removeHandler(handler)
+
+
+def test_log_call(benchmark, logger, handler):
+    benchmark(logger.info, "Processed %s in %.1fms", "/api/users/me/", 12.5)
+    benchmark.extra_info["dropped"] = getattr(handler, "dropped", 0)
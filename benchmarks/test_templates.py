@@ -0,0 +1,68 @@
+"""
+Render time of the base layout, and of the pages with cached fragments with a
+cold and a warm cache.
+"""
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from lego_deck.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture()
+def home_request(rf):
+    request = rf.get("/")
+    request.user = AnonymousUser()
+    return request
+
+
+@pytest.fixture()
+def detail_request(rf, user: User):
+    request = rf.get(user.get_absolute_url())
+    request.user = user
+    return request
+
+
+def _render_home(request):
+    return render_to_string("pages/home.html", request=request)
+
+
+def _render_detail(request):
+    context = {"object": request.user, "is_owner": True}
+    return render_to_string("users/user_detail.html", context, request=request)
+
+
+def test_home_cold(benchmark, home_request):
+    benchmark.pedantic(
+        _render_home,
+        args=(home_request,),
+        setup=cache.clear,
+        rounds=200,
+    )
+
+
+def test_home_warm(benchmark, home_request):
+    _render_home(home_request)
+    benchmark(_render_home, home_request)
+
+
+def test_user_detail_cold(benchmark, detail_request):
+    benchmark.pedantic(
+        _render_detail,
+        args=(detail_request,),
+        setup=cache.clear,
+        rounds=200,
+    )
+
+
+def test_user_detail_warm(benchmark, detail_request):
+    _render_detail(detail_request)
+    benchmark(_render_detail, detail_request)
+
+
+def test_base(benchmark, detail_request):
+    benchmark(render_to_string, "base.html", request=detail_request)
@@ -0,0 +1,125 @@
+"""
+Components on the path of most user requests: API serialization, social
+signup, password hashing, token authentication, sessions and URL reversing.
+"""
+
+from importlib import import_module
+
+import pytest
+from allauth.socialaccount.models import SocialLogin
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+
+from config.settings.base import PASSWORD_HASHERS
+from lego_deck.users.adapters import SocialAccountAdapter
+from lego_deck.users.api.serializers import UserSerializer
+from lego_deck.users.models import User
+from lego_deck.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+PASSWORD = "correct horse battery staple"  # noqa: S105
+
+
+def test_serialize_user(benchmark, rf, user: User):
+    context = {"request": rf.get("/api/users/me/")}
+
+    def render():
+        return JSONRenderer().render(UserSerializer(user, context=context).data)
+
+    assert benchmark(render)
+
+
+def test_serialize_users(benchmark, rf):
+    users = UserFactory.create_batch(50)
+    context = {"request": rf.get("/api/users/")}
+
+    def render():
+        return JSONRenderer().render(
+            UserSerializer(users, many=True, context=context).data,
+        )
+
+    assert benchmark(render)
+
+
+def test_populate_user(benchmark, rf):
+    adapter = SocialAccountAdapter()
+    request = rf.get("/accounts/google/login/callback/")
+    data = {
+        "username": "alice",
+        "email": "alice@example.com",
+        "first_name": "Alice",
+        "last_name": "Liddell",
+    }
+
+    def populate():
+        return adapter.populate_user(request, SocialLogin(user=User()), data)
+
+    assert benchmark(populate).name == "Alice Liddell"
+
+
+# The hashers production is configured with, not the fast one tests use.
+@pytest.fixture(params=PASSWORD_HASHERS, ids=lambda path: path.rsplit(".", 1)[1])
+def hasher(request) -> str:
+    library = import_string(request.param).library
+    if library:
+        # A name and a module, or just a module.
+        pytest.importorskip(library[1] if isinstance(library, tuple) else library)
+    return request.param
+
+
+def test_hash_password(benchmark, settings, hasher):
+    settings.PASSWORD_HASHERS = [hasher]
+
+    assert benchmark(make_password, PASSWORD)
+
+
+def test_check_password(benchmark, settings, hasher):
+    settings.PASSWORD_HASHERS = [hasher]
+    encoded = make_password(PASSWORD)
+
+    assert benchmark(check_password, PASSWORD, encoded)
+
+
+def test_token_authentication(benchmark, rf, user: User):
+    token = Token.objects.create(user=user)
+    request = rf.get("/api/users/me/", HTTP_AUTHORIZATION=f"Token {token.key}")
+    authentication = TokenAuthentication()
+
+    assert benchmark(authentication.authenticate, request)[0] == user
+
+
+@pytest.fixture()
+def session_store():
+    return import_module(settings.SESSION_ENGINE).SessionStore
+
+
+def test_session_save(benchmark, session_store, user: User):
+    def save():
+        session = session_store()
+        session["_auth_user_id"] = str(user.pk)
+        session["_auth_user_backend"] = "django.contrib.auth.backends.ModelBackend"
+        session.save()
+
+    benchmark(save)
+
+
+def test_session_load(benchmark, session_store, user: User):
+    session = session_store()
+    session["_auth_user_id"] = str(user.pk)
+    session.save()
+
+    def load():
+        return session_store(session.session_key).load()
+
+    assert benchmark(load)["_auth_user_id"] == str(user.pk)
+
+
+def test_reverse_user_detail(benchmark, user: User):
+    assert benchmark(reverse, "users:detail", kwargs={"username": user.username})
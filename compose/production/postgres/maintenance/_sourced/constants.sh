@@ -3,3 +3,13 @@
 
 BACKUP_DIR_PATH='/backups'
 BACKUP_FILE_PREFIX='backup'
+# 'directory' takes a parallel, compressed pg_dump directory archive,
+# 'sql' keeps the legacy single-threaded 'pg_dump | gzip' file.
+BACKUP_FORMAT="${BACKUP_FORMAT:-directory}"
+BACKUP_DIRECTORY_SUFFIX='pgdump'
+BACKUP_JOBS="${BACKUP_JOBS:-$(nproc)}"
+BACKUP_COMPRESSION_LEVEL="${BACKUP_COMPRESSION_LEVEL:-3}"
+BACKUP_FINGERPRINTS_FILENAME='fingerprints.tsv'
+# Tables whose row counts and checksums are recorded at backup time
+# and verified after a restore.
+BACKUP_VERIFY_TABLES="${BACKUP_VERIFY_TABLES:-users_user account_emailaddress authtoken_token socialaccount_socialaccount django_site}"
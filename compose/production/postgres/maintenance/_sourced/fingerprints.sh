@@ -0,0 +1,22 @@
+#!/usr/bin/env bash
+
+
+fingerprint_existing_tables_sql() {
+    declare desc="SQL printing, on a single line, which of the given tables exist. \$\"\{@\}\": table names."
+    local tables
+    tables="$(printf "'%s'," "${@}")"
+    echo "SELECT coalesce(string_agg(name, ' ' ORDER BY name), '') FROM unnest(ARRAY[${tables%,}]::text[]) AS name WHERE to_regclass(name) IS NOT NULL;"
+}
+
+fingerprint_table_sql() {
+    declare desc="SQL printing a table's row count and an order-independent checksum of its rows. \$\"\{1\}\": table name."
+    echo "SELECT '${1}', count(*), coalesce(sum(('x' || substr(md5(t::text), 1, 15))::bit(60)::bigint), 0) FROM ${1} AS t;"
+}
+
+fingerprint_tables() {
+    declare desc="Print a tab-separated fingerprint line for every given table that exists. \$\"\{@\}\": table names."
+    local table
+    for table in $(psql -X -qAt -c "$(fingerprint_existing_tables_sql "${@}")"); do
+        psql -X -qAt -F $'\t' -c "$(fingerprint_table_sql "${table}")"
+    done
+}
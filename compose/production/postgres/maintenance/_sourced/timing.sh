@@ -0,0 +1,28 @@
+#!/usr/bin/env bash
+
+
+timing_start() {
+    declare desc="Remember the current time under the given step name. \$\"\{1\}\": step name."
+    TIMING_STEPS+=("${1}")
+    TIMING_STARTED_AT+=("$(date +%s%N)")
+}
+
+timing_stop() {
+    declare desc="Record the duration of the most recently started step."
+    local started_at="${TIMING_STARTED_AT[-1]}"
+    TIMING_DURATIONS+=("$(( ($(date +%s%N) - started_at) / 1000000 ))")
+}
+
+timing_report() {
+    declare desc="Print how long every recorded step took."
+    local i ms
+    message_info "Timing report:"
+    for i in "${!TIMING_DURATIONS[@]}"; do
+        ms="${TIMING_DURATIONS[${i}]}"
+        printf '    %-24s %8d.%03ds\n' "${TIMING_STEPS[${i}]}" "$(( ms / 1000 ))" "$(( ms % 1000 ))"
+    done
+}
+
+TIMING_STEPS=()
+TIMING_STARTED_AT=()
+TIMING_DURATIONS=()
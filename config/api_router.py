@@ -2,11 +2,13 @@ from django.conf import settings
 from rest_framework.routers import DefaultRouter
 from rest_framework.routers import SimpleRouter
 
+from lego_deck.core.api.views import UploadViewSet
 from lego_deck.users.api.views import UserViewSet
 
 router = DefaultRouter() if settings.DEBUG else SimpleRouter()
 
 router.register("users", UserViewSet)
+router.register("uploads", UploadViewSet)
 
 
 app_name = "api"
@@ -1,6 +1,9 @@
 import os
 
 from celery import Celery
+from celery import signals
+
+from lego_deck.core import log
 
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
@@ -15,3 +18,32 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
+
+
+# Tasks log with the request id of whatever queued them.
+@signals.before_task_publish.connect
+def add_request_id(headers, **kwargs):
+    headers.setdefault("request_id", log.request_id.get())
+
+
+@signals.task_prerun.connect
+def set_log_context(task_id, task, **kwargs):
+    task.request.log_tokens = (
+        log.request_id.set(
+            getattr(task.request, "request_id", None) or log.request_id.get(),
+        ),
+        log.task_id.set(task_id),
+        log.task_name.set(task.name),
+    )
+
+
+@signals.task_postrun.connect
+def reset_log_context(task, **kwargs):
+    tokens = getattr(task.request, "log_tokens", None)
+    if tokens is not None:
+        for var, token in zip(
+            (log.request_id, log.task_id, log.task_name),
+            tokens,
+            strict=True,
+        ):
+            var.reset(token)
@@ -0,0 +1,142 @@
+# ruff: noqa: N999
+"""
+Gunicorn configuration for production.
+
+https://docs.gunicorn.org/en/stable/settings.html
+
+Workers are sized from the CPUs and memory the container may use, each runs
+``GUNICORN_THREADS`` threads. The application is imported once in the master
+and workers are forked from it, sharing its memory copy-on-write: the garbage
+collector is kept from touching those pages, and connections opened before the
+fork are dropped in each worker.
+
+Workers keep their metrics in ``PROMETHEUS_MULTIPROC_DIR``, on tmpfs by
+default, where any of them can read them all, see ``lego_deck.core.metrics``.
+"""
+
+import gc
+import os
+import shutil
+from pathlib import Path
+
+import environ
+
+env = environ.Env()
+
+# Memory budget of a worker, in MiB, used to cap the number of workers.
+WORKER_MEMORY = env.int("GUNICORN_WORKER_MEMORY", default=256)
+
+
+def cpu_limit() -> float:
+    """CPUs available, from the cgroup quota if set."""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    return len(os.sched_getaffinity(0))
+
+
+def memory_limit() -> int | None:
+    """Memory available in MiB, from the cgroup limit if set."""
+    try:
+        limit = Path("/sys/fs/cgroup/memory.max").read_text().strip()
+    except OSError:
+        return None
+    return None if limit == "max" else int(limit) // 2**20
+
+
+def default_workers() -> int:
+    workers = int(2 * cpu_limit()) + 1
+    memory = memory_limit()
+    if memory is not None:
+        workers = min(workers, memory // WORKER_MEMORY)
+    return max(workers, 1)
+
+
+def memory_usage() -> str:
+    """RSS of the current process, and how much of it is shared."""
+    usage = {}
+    try:
+        for line in Path("/proc/self/smaps_rollup").read_text().splitlines()[1:]:
+            name, value = line.split()[:2]
+            usage[name.rstrip(":")] = int(value) // 1024
+    except OSError:
+        return "unknown"
+    shared = usage["Shared_Clean"] + usage["Shared_Dirty"]
+    return f"RSS {usage['Rss']}MiB, {shared}MiB shared, PSS {usage['Pss']}MiB"
+
+
+bind = "0.0.0.0:5000"
+workers = env.int("GUNICORN_WORKERS", default=default_workers())
+threads = env.int("GUNICORN_THREADS", default=4)
+# Recycle workers to contain slow leaks, not all at once.
+max_requests = env.int("GUNICORN_MAX_REQUESTS", default=1000)
+max_requests_jitter = env.int("GUNICORN_MAX_REQUESTS_JITTER", default=100)
+timeout = env.int("GUNICORN_TIMEOUT", default=30)
+# Behind traefik, which keeps connections open.
+keepalive = 5
+# Heartbeats on tmpfs, an overlay filesystem can block workers.
+worker_tmp_dir = "/dev/shm"  # noqa: S108
+preload_app = env.bool("GUNICORN_PRELOAD", default=True)
+
+# Set before the app, and prometheus_client, are imported.
+METRICS_DIR = Path(
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/dev/shm/prometheus"),  # noqa: S108
+)
+
+if preload_app:
+    # Collections during the import would leave the heap fragmented.
+    gc.disable()
+
+
+def on_starting(server):
+    # Counters restart from zero with the server, like in a single process.
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    METRICS_DIR.mkdir(parents=True)
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from django.db import connections
+
+    connections.close_all()
+    # Move everything imported so far out of the collector's reach: scanning
+    # it from a worker would write to, and so copy, every shared page.
+    gc.collect()
+    gc.freeze()
+    server.log.info(
+        "Froze %d objects before forking, %s",
+        gc.get_freeze_count(),
+        memory_usage(),
+    )
+
+
+def post_fork(server, worker):
+    gc.enable()
+    if not preload_app:
+        return
+    from django.db import connections
+
+    from lego_deck.core.redis import reset_connections
+
+    # Sockets inherited from the master can't be shared with it.
+    connections.close_all()
+    reset_connections()
+
+
+def post_worker_init(worker):
+    worker.log.info("Worker %s ready, %s", worker.pid, memory_usage())
+
+
+def worker_exit(server, worker):
+    server.log.info("Worker %s exiting, %s", worker.pid, memory_usage())
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    # Its counters are kept, its gauges of live processes dropped.
+    multiprocess.mark_process_dead(worker.pid)
@@ -19,6 +19,9 @@ if READ_DOT_ENV_FILE:
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#debug
 DEBUG = env.bool("DJANGO_DEBUG", False)
+# Identifies the deployed build, set at image build time. Cached content that
+# depends on code or templates includes it so a deploy never serves stale output.
+DEPLOY_VERSION = env("DJANGO_DEPLOY_VERSION", default="dev")
 # Local time zone. Choices are
 # http://en.wikipedia.org/wiki/List_of_tz_zones_by_name
 # though not all of them may be available with every OS.
@@ -50,6 +53,11 @@ DATABASES["default"]["ATOMIC_REQUESTS"] = True
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# REDIS
+# ------------------------------------------------------------------------------
+# Used directly by features that need more than the cache API.
+REDIS_URL = env("REDIS_URL", default="redis://localhost:6379/0")
+
 # URLS
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#root-urlconf
@@ -85,6 +93,7 @@ THIRD_PARTY_APPS = [
 ]
 
 LOCAL_APPS = [
+    "lego_deck.core",
     "lego_deck.users",
     # Your stuff: custom apps go here
 ]
@@ -109,17 +118,29 @@ AUTH_USER_MODEL = "users.User"
 LOGIN_REDIRECT_URL = "users:redirect"
 # https://docs.djangoproject.com/en/dev/ref/settings/#login-url
 LOGIN_URL = "account_login"
+# Seconds between two buffered `last_seen` updates of a user by the same process.
+USER_ACTIVITY_RESOLUTION = env.int("DJANGO_USER_ACTIVITY_RESOLUTION", default=60)
 
 # PASSWORDS
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
 PASSWORD_HASHERS = [
     # https://docs.djangoproject.com/en/dev/topics/auth/passwords/#using-argon2-with-django
-    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "lego_deck.users.hashers.Argon2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
     "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
 ]
+# Argon2 costs: iterations, memory in KiB and lanes. Passwords are rehashed
+# with new costs when their user next logs in.
+ARGON2_TIME_COST = env.int("DJANGO_ARGON2_TIME_COST", default=2)
+ARGON2_MEMORY_COST = env.int("DJANGO_ARGON2_MEMORY_COST", default=102400)
+ARGON2_PARALLELISM = env.int("DJANGO_ARGON2_PARALLELISM", default=8)
+# Processes hashing passwords for each process serving requests, 0 to hash in
+# the request's thread, and hashes waiting for them before more are refused
+# with a 503. See `lego_deck.users.hashers`.
+PASSWORD_HASHING_WORKERS = env.int("DJANGO_PASSWORD_HASHING_WORKERS", default=1)
+PASSWORD_HASHING_QUEUE = env.int("DJANGO_PASSWORD_HASHING_QUEUE", default=2)
 # https://docs.djangoproject.com/en/dev/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -134,13 +155,22 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "lego_deck.core.middleware.HealthCheckMiddleware",
+    "lego_deck.core.middleware.MetricsMiddleware",
+    "lego_deck.core.middleware.RequestIdMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "lego_deck.core.middleware.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "lego_deck.core.middleware.AnonymousPageCacheMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "lego_deck.core.middleware.RequestProfilingMiddleware",
+    "lego_deck.users.middleware.LastSeenMiddleware",
+    "lego_deck.users.middleware.PasswordHashingMiddleware",
+    "lego_deck.users.middleware.LoginThrottleMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
@@ -190,6 +220,7 @@ TEMPLATES = [
                 "django.template.context_processors.tz",
                 "django.contrib.messages.context_processors.messages",
                 "lego_deck.users.context_processors.allauth_settings",
+                "lego_deck.core.context_processors.fragment_cache",
             ],
         },
     },
@@ -198,6 +229,14 @@ TEMPLATES = [
 # https://docs.djangoproject.com/en/dev/ref/settings/#form-renderer
 FORM_RENDERER = "django.forms.renderers.TemplatesSetting"
 
+# Seconds `{% cache %}` fragments live, their keys also vary on DEPLOY_VERSION.
+FRAGMENT_CACHE_TIMEOUT = env.int("DJANGO_FRAGMENT_CACHE_TIMEOUT", default=600)
+# Seconds pages marked with `cache_anonymous_page` are served to anonymous
+# visitors without being rendered, then how long a stale copy may still be
+# served while one request renders the page again.
+PAGE_CACHE_TIMEOUT = env.int("DJANGO_PAGE_CACHE_TIMEOUT", default=300)
+PAGE_CACHE_STALE_TIMEOUT = env.int("DJANGO_PAGE_CACHE_STALE_TIMEOUT", default=3600)
+
 # http://django-crispy-forms.readthedocs.io/en/latest/install.html#template-packs
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
@@ -247,15 +286,14 @@ LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
-        "verbose": {
-            "format": "%(levelname)s %(asctime)s %(module)s %(process)d %(thread)d %(message)s",
-        },
+        "json": {"()": "lego_deck.core.log.JsonFormatter"},
     },
     "handlers": {
+        # Writes from a background thread, see lego_deck.core.log.
         "console": {
             "level": "DEBUG",
-            "class": "logging.StreamHandler",
-            "formatter": "verbose",
+            "class": "lego_deck.core.log.QueueHandler",
+            "formatter": "json",
         },
     },
     "root": {"level": "INFO", "handlers": ["console"]},
@@ -293,8 +331,27 @@ CELERY_TASK_SOFT_TIME_LIMIT = 60
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-send-task-events
 CELERY_WORKER_SEND_TASK_EVENTS = True
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-hijack-root-logger
+# Workers log through LOGGING, like the web processes.
+CELERY_WORKER_HIJACK_ROOT_LOGGER = False
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std-setting-task_send_sent_event
 CELERY_TASK_SEND_SENT_EVENT = True
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-schedule
+# Synced into django-celery-beat's tables by the DatabaseScheduler on startup.
+CELERY_BEAT_SCHEDULE = {
+    "purge-expired-rows": {
+        "task": "lego_deck.core.tasks.purge_expired_rows",
+        "schedule": 60 * 60,
+    },
+    "drain-outbox": {
+        "task": "lego_deck.core.tasks.drain_outbox",
+        "schedule": 5,
+    },
+    "flush-user-activity": {
+        "task": "lego_deck.users.tasks.flush_activity",
+        "schedule": 60,
+    },
+}
 # django-allauth
 # ------------------------------------------------------------------------------
 ACCOUNT_ALLOW_REGISTRATION = env.bool("DJANGO_ACCOUNT_ALLOW_REGISTRATION", True)
@@ -323,6 +380,9 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_CLASSES": ("lego_deck.core.api.throttling.APIThrottle",),
+    # Proxies trusted to add the client's address to X-Forwarded-For.
+    "NUM_PROXIES": env.int("DJANGO_NUM_PROXIES", default=0),
 }
 
 # django-cors-headers - https://github.com/adamchainz/django-cors-headers#setup
@@ -337,5 +397,89 @@ SPECTACULAR_SETTINGS = {
     "SERVE_PERMISSIONS": ["rest_framework.permissions.IsAdminUser"],
     "SCHEMA_PATH_PREFIX": "/api/",
 }
+# Retention
+# ------------------------------------------------------------------------------
+# Days rows are kept before `lego_deck.core.tasks.purge_expired_rows` deletes
+# them, None keeps them forever. Sessions are counted from their expiry date.
+RETENTION_DAYS = {
+    "sessions": env.int("DJANGO_SESSION_RETENTION_DAYS", default=0),
+    # Counted from the owner's last visit, 0 keeps tokens forever.
+    "auth_tokens": env.int("DJANGO_AUTH_TOKEN_RETENTION_DAYS", default=365) or None,
+    "email_confirmations": env.int(
+        "DJANGO_EMAIL_CONFIRMATION_RETENTION_DAYS",
+        default=7,
+    ),
+    "outbox_events": env.int("DJANGO_OUTBOX_EVENT_RETENTION_DAYS", default=7),
+    "one_off_periodic_tasks": env.int(
+        "DJANGO_ONE_OFF_PERIODIC_TASK_RETENTION_DAYS",
+        default=30,
+    ),
+    "request_profiles": env.int("DJANGO_REQUEST_PROFILE_RETENTION_DAYS", default=14),
+    # Well past UPLOAD_URL_EXPIRY, uploads can't be completed any more.
+    "pending_uploads": env.int("DJANGO_PENDING_UPLOAD_RETENTION_DAYS", default=1),
+}
+# Rows deleted per transaction, and seconds to pause between transactions.
+RETENTION_BATCH_SIZE = env.int("DJANGO_RETENTION_BATCH_SIZE", default=500)
+RETENTION_BATCH_SLEEP = env.float("DJANGO_RETENTION_BATCH_SLEEP", default=0.1)
+
+# Outbox
+# ------------------------------------------------------------------------------
+# Where `lego_deck.core.tasks.drain_outbox` publishes events, and its options.
+OUTBOX_SINK = env(
+    "DJANGO_OUTBOX_SINK",
+    default="lego_deck.core.outbox.RedisStreamSink",
+)
+OUTBOX_SINK_OPTIONS: dict = {}
+# Events published per transaction.
+OUTBOX_BATCH_SIZE = env.int("DJANGO_OUTBOX_BATCH_SIZE", default=500)
+
+# Uploads
+# ------------------------------------------------------------------------------
+# Lifetime of the signed URLs issued for direct uploads to the media storage.
+UPLOAD_URL_EXPIRY = env.int("DJANGO_UPLOAD_URL_EXPIRY", default=15 * 60)
+# Largest file accepted, in bytes.
+UPLOAD_MAX_SIZE = env.int("DJANGO_UPLOAD_MAX_SIZE", default=100 * 1024 * 1024)
+
+# Downloads
+# ------------------------------------------------------------------------------
+# Lifetime of the signed URLs downloads are redirected to, see
+# `lego_deck.core.downloads`.
+DOWNLOAD_URL_EXPIRY = env.int("DJANGO_DOWNLOAD_URL_EXPIRY", default=60)
+# nginx internal location serving MEDIA_ROOT, files on disk are sent through
+# it with X-Accel-Redirect. Unset, Django streams them.
+MEDIA_ACCEL_REDIRECT_PREFIX = env("DJANGO_MEDIA_ACCEL_REDIRECT_PREFIX", default=None)
+
+# Profiling
+# ------------------------------------------------------------------------------
+# Share of requests profiled, from 0 to 1. Staff users can also have any
+# request profiled by sending an X-Profile header.
+PROFILING_SAMPLE_RATE = env.float("DJANGO_PROFILING_SAMPLE_RATE", default=0.0)
+# Seconds between two samples of the stack of a profiled request.
+PROFILING_INTERVAL = env.float("DJANGO_PROFILING_INTERVAL", default=0.005)
+# Local directory the profiles are written to.
+PROFILING_ROOT = env("DJANGO_PROFILING_ROOT", default=str(BASE_DIR / "profiles"))
+
+# Metrics
+# ------------------------------------------------------------------------------
+# Bearer token Prometheus sends to scrape /metrics. Unset, /metrics is only
+# served with DEBUG on.
+METRICS_TOKEN = env("DJANGO_METRICS_TOKEN", default=None)
+
+# Health checks
+# ------------------------------------------------------------------------------
+# Seconds the result of a probe of the database or Redis is reused for by
+# /readyz, see `lego_deck.core.health`.
+HEALTH_CHECK_CACHE_SECONDS = env.float("DJANGO_HEALTH_CHECK_CACHE_SECONDS", default=5)
+
+# Rate limits
+# ------------------------------------------------------------------------------
+# Attempts allowed per IP address, username or API token in any window of the
+# period, see `lego_deck.core.throttling`. Scopes left out aren't limited.
+THROTTLE_RATES = {
+    "login_ip": "30/m",
+    "login_username": "5/m",
+    "signup_ip": "10/h",
+    "api": "120/m",
+}
 # Your stuff...
 # ------------------------------------------------------------------------------
@@ -0,0 +1,67 @@
+"""
+Settings for load tests, see ``manage.py loadtest``: the request path of
+production (DEBUG off, the two-tier Redis cache, cached templates, Argon2)
+without its external services, HTTPS or rate limits.
+"""
+
+from .base import *  # noqa: F403
+from .base import DATABASES
+from .base import TEMPLATES
+from .base import env
+
+# GENERAL
+# ------------------------------------------------------------------------------
+DEBUG = False
+SECRET_KEY = env("DJANGO_SECRET_KEY", default="load-test-only")
+ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
+
+# DATABASES
+# ------------------------------------------------------------------------------
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
+
+# CACHES
+# ------------------------------------------------------------------------------
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": env("REDIS_URL"),
+        "OPTIONS": {
+            "CLIENT_CLASS": "lego_deck.core.cache.TwoTierClient",
+            "COMPRESSOR": "lego_deck.core.cache.Lz4Compressor",
+            "IGNORE_EXCEPTIONS": True,
+        },
+    },
+}
+
+# TEMPLATES
+# ------------------------------------------------------------------------------
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [  # type: ignore[index]
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
+
+# STORAGES
+# ------------------------------------------------------------------------------
+# Static files are served from the source tree, no manifest to build.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+# EMAIL
+# ------------------------------------------------------------------------------
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+# django-allauth
+# ------------------------------------------------------------------------------
+# Every virtual user comes from the same address.
+ACCOUNT_RATE_LIMITS = False
+THROTTLE_RATES = {}
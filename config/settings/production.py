@@ -10,7 +10,9 @@ from sentry_sdk.integrations.redis import RedisIntegration
 from .base import *  # noqa: F403
 from .base import DATABASES
 from .base import INSTALLED_APPS
+from .base import REST_FRAMEWORK
 from .base import SPECTACULAR_SETTINGS
+from .base import TEMPLATES
 from .base import env
 
 # GENERAL
@@ -31,7 +33,14 @@ CACHES = {
         "BACKEND": "django_redis.cache.RedisCache",
         "LOCATION": env("REDIS_URL"),
         "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # Hot keys are also kept in each process, see lego_deck.core.cache.
+            "CLIENT_CLASS": "lego_deck.core.cache.TwoTierClient",
+            "L1_MAX_ENTRIES": env.int("CACHE_L1_MAX_ENTRIES", default=1024),
+            "L1_TIMEOUT": env.int("CACHE_L1_TIMEOUT", default=5),
+            # Pickled, then compressed past 1KB. Pickle rather than msgpack:
+            # cached values include model instances and dataclasses.
+            "COMPRESSOR": "lego_deck.core.cache.Lz4Compressor",
+            "COMPRESS_MIN_LENGTH": env.int("CACHE_COMPRESS_MIN_LENGTH", default=1024),
             # Mimicing memcache behavior.
             # https://github.com/jazzband/django-redis#memcached-exceptions-behavior
             "IGNORE_EXCEPTIONS": True,
@@ -39,6 +48,21 @@ CACHES = {
     },
 }
 
+# TEMPLATES
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/dev/ref/templates/api/#django.template.loaders.cached.Loader
+# Explicit, so templates are parsed once per process whatever the debug options.
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [  # type: ignore[index]
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
+
 # SECURITY
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#secure-proxy-ssl-header
@@ -80,15 +104,17 @@ AZURE_CONTAINER = env("DJANGO_AZURE_CONTAINER_NAME")
 # STATIC & MEDIA
 # ------------------------
 STORAGES = {
+    # Can issue signed URLs for direct uploads, see lego_deck.core.uploads.
     "default": {
-        "BACKEND": "storages.backends.azure_storage.AzureStorage",
+        "BACKEND": "lego_deck.core.storages.MediaAzureStorage",
         "OPTIONS": {
             "location": "media",
-            "file_overwrite": False,
+            "overwrite_files": False,
         },
     },
+    # Content-hashed names cached for a year, with gzip and brotli variants.
     "staticfiles": {
-        "BACKEND": "storages.backends.azure_storage.AzureStorage",
+        "BACKEND": "lego_deck.core.storages.StaticAzureStorage",
         "OPTIONS": {
             "location": "static",
         },
@@ -120,7 +146,8 @@ ADMIN_URL = env("DJANGO_ADMIN_URL")
 # Anymail
 # ------------------------------------------------------------------------------
 # https://anymail.readthedocs.io/en/stable/installation/#installing-anymail
-INSTALLED_APPS += ["anymail"]
+# Registers anymail's checks without importing them, see the app config.
+INSTALLED_APPS += ["lego_deck.core.apps.AnymailConfig"]
 # https://docs.djangoproject.com/en/dev/ref/settings/#email-backend
 # https://anymail.readthedocs.io/en/stable/installation/#anymail-settings-reference
 # https://anymail.readthedocs.io/en/stable/esps/sendgrid/
@@ -130,11 +157,6 @@ ANYMAIL = {
     "SENDGRID_API_URL": env("SENDGRID_API_URL", default="https://api.sendgrid.com/v3/"),
 }
 
-# Collectfasta
-# ------------------------------------------------------------------------------
-# https://github.com/jasongi/collectfasta#installation
-INSTALLED_APPS = ["collectfasta", *INSTALLED_APPS]
-
 # LOGGING
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#logging
@@ -145,15 +167,14 @@ LOGGING = {
     "version": 1,
     "disable_existing_loggers": True,
     "formatters": {
-        "verbose": {
-            "format": "%(levelname)s %(asctime)s %(module)s %(process)d %(thread)d %(message)s",
-        },
+        "json": {"()": "lego_deck.core.log.JsonFormatter"},
     },
     "handlers": {
+        # Writes from a background thread, see lego_deck.core.log.
         "console": {
             "level": "DEBUG",
-            "class": "logging.StreamHandler",
-            "formatter": "verbose",
+            "class": "lego_deck.core.log.QueueHandler",
+            "formatter": "json",
         },
     },
     "root": {"level": "INFO", "handlers": ["console"]},
@@ -163,6 +184,12 @@ LOGGING = {
             "handlers": ["console"],
             "propagate": False,
         },
+        # Kept enabled once the app is loaded, for the hooks in gunicorn.conf.py.
+        "gunicorn.error": {
+            "level": "INFO",
+            "handlers": ["console"],
+            "propagate": False,
+        },
         # Errors logged by the SDK itself
         "sentry_sdk": {"level": "ERROR", "handlers": ["console"], "propagate": False},
         "django.security.DisallowedHost": {
@@ -193,10 +220,15 @@ sentry_sdk.init(
     integrations=integrations,
     environment=env("SENTRY_ENVIRONMENT", default="production"),
     traces_sample_rate=env.float("SENTRY_TRACES_SAMPLE_RATE", default=0.0),
+    # Only the integrations above: the SDK would otherwise import every library
+    # it supports and finds installed (tornado, for flower) in every process.
+    auto_enabling_integrations=False,
 )
 
 # django-rest-framework
 # -------------------------------------------------------------------------------
+# Behind traefik, which adds the client's address to X-Forwarded-For.
+REST_FRAMEWORK["NUM_PROXIES"] = env.int("DJANGO_NUM_PROXIES", default=1)
 # Tools that generate code samples can use SERVERS to point to the correct domain
 SPECTACULAR_SETTINGS["SERVERS"] = [
     {"url": "https://lego-dock.com", "description": "Production server"},
@@ -6,15 +6,21 @@ from django.urls import include
 from django.urls import path
 from django.views import defaults as default_views
 from django.views.generic import TemplateView
-from drf_spectacular.views import SpectacularAPIView
-from drf_spectacular.views import SpectacularSwaggerView
-from rest_framework.authtoken.views import obtain_auth_token
+
+from lego_deck.core.page_cache import cache_anonymous_page
+from lego_deck.core.views import lazy_view
+from lego_deck.core.views import metrics_view
+from lego_deck.users.api.views import ObtainAuthTokenView
 
 urlpatterns = [
-    path("", TemplateView.as_view(template_name="pages/home.html"), name="home"),
+    path(
+        "",
+        cache_anonymous_page()(TemplateView.as_view(template_name="pages/home.html")),
+        name="home",
+    ),
     path(
         "about/",
-        TemplateView.as_view(template_name="pages/about.html"),
+        cache_anonymous_page()(TemplateView.as_view(template_name="pages/about.html")),
         name="about",
     ),
     # Django Admin, use {% url 'admin:index' %}
@@ -23,6 +29,7 @@ urlpatterns = [
     path("users/", include("lego_deck.users.urls", namespace="users")),
     path("accounts/", include("allauth.urls")),
     # Your stuff: custom urls includes go here
+    path("metrics", metrics_view, name="metrics"),
     # ...
     # Media files
     *static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT),
@@ -33,11 +40,18 @@ urlpatterns += [
     # API base url
     path("api/", include("config.api_router")),
     # DRF auth token
-    path("api/auth-token/", obtain_auth_token),
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
+    path("api/auth-token/", ObtainAuthTokenView.as_view()),
+    # drf-spectacular is only loaded when the schema is asked for.
+    path(
+        "api/schema/",
+        lazy_view("drf_spectacular.views.SpectacularAPIView"),
+        name="api-schema",
+    ),
     path(
         "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="api-schema"),
+        lazy_view(
+            "drf_spectacular.views.SpectacularSwaggerView", url_name="api-schema"
+        ),
         name="api-docs",
     ),
 ]
@@ -1,5 +1,7 @@
+import fakeredis
 import pytest
 
+from lego_deck.core import redis
 from lego_deck.users.models import User
 from lego_deck.users.tests.factories import UserFactory
 
@@ -7,6 +9,15 @@ from lego_deck.users.tests.factories import UserFactory
 @pytest.fixture(autouse=True)
 def _media_storage(settings, tmpdir) -> None:
     settings.MEDIA_ROOT = tmpdir.strpath
+    settings.PROFILING_ROOT = tmpdir.join("profiles").strpath
+
+
+@pytest.fixture(autouse=True)
+def _redis(monkeypatch):
+    monkeypatch.setattr(redis, "Redis", fakeredis.FakeRedis)
+    monkeypatch.setattr(redis, "_connections", {})
+    yield
+    redis.get_redis_connection().flushall()
 
 
 @pytest.fixture()
@@ -0,0 +1,123 @@
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.db.models import Avg
+from django.db.models import Count
+from django.db.models import Max
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
+
+from .models import BackfillProgress
+from .models import OutboxEvent
+from .models import RequestProfile
+from .models import Upload
+
+
+@admin.register(BackfillProgress)
+class BackfillProgressAdmin(admin.ModelAdmin):
+    list_display = ["name", "last_id", "max_id", "rows_processed", "completed_at"]
+    readonly_fields = ["started_at", "updated_at"]
+    search_fields = ["name"]
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ["id", "topic", "event_type", "key", "created_at", "published_at"]
+    list_filter = ["topic", "event_type"]
+    search_fields = ["key"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Upload)
+class UploadAdmin(admin.ModelAdmin):
+    list_display = ["file", "user", "size", "status", "created_at", "verified_at"]
+    list_filter = ["status"]
+    list_select_related = ["user"]
+    raw_id_fields = ["user"]
+    search_fields = ["file", "user__username"]
+    readonly_fields = ["created_at", "completed_at", "verified_at"]
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """
+    Profiles, slowest first, under a table of the views they were taken in
+    ranked by average duration.
+    """
+
+    list_display = [
+        "path",
+        "method",
+        "view_name",
+        "status_code",
+        "duration",
+        "samples",
+        "trigger",
+        "created_at",
+        "stacks_link",
+    ]
+    list_filter = ["trigger", "method", "status_code"]
+    list_select_related = ["user"]
+    search_fields = ["view_name", "path"]
+    date_hierarchy = "created_at"
+    ordering = ["-duration"]
+    # Views listed above the profiles.
+    slowest_views = 20
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/stacks/",
+                self.admin_site.admin_view(self.stacks_view),
+                name="core_requestprofile_stacks",
+            ),
+            *super().get_urls(),
+        ]
+
+    @admin.display(description=_("Stacks"))
+    def stacks_link(self, obj):
+        url = reverse("admin:core_requestprofile_stacks", args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, _("Download"))
+
+    def stacks_view(self, request, pk):
+        profile = get_object_or_404(self.get_queryset(request), pk=pk)
+        if not self.has_view_permission(request, profile):
+            raise PermissionDenied
+        # Profiles are on this host's disk, not in the media storage.
+        return FileResponse(
+            profile.file.open("rb"),
+            as_attachment=True,
+            filename=f"profile-{profile.pk}.folded",
+            content_type="text/plain",
+        )
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        context = getattr(response, "context_data", None) or {}
+        changelist = context.get("cl")
+        if changelist is not None:
+            context["slowest_views"] = (
+                changelist.queryset.order_by()
+                .values("view_name")
+                .annotate(
+                    count=Count("id"),
+                    avg_duration=Avg("duration"),
+                    max_duration=Max("duration"),
+                )
+                .order_by("-avg_duration")[: self.slowest_views]
+            )
+        return response
@@ -0,0 +1,47 @@
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from lego_deck.core.models import Upload
+
+
+class UploadSerializer(serializers.ModelSerializer[Upload]):
+    filename = serializers.CharField(write_only=True, max_length=255)
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Upload
+        fields = [
+            "id",
+            "filename",
+            "content_type",
+            "size",
+            "status",
+            "error",
+            "url",
+            "created_at",
+            "completed_at",
+            "verified_at",
+        ]
+        read_only_fields = [
+            "status",
+            "error",
+            "created_at",
+            "completed_at",
+            "verified_at",
+        ]
+
+    def validate_size(self, value: int) -> int:
+        if not 0 < value <= settings.UPLOAD_MAX_SIZE:
+            msg = f"Files must be between 1 and {settings.UPLOAD_MAX_SIZE} bytes."
+            raise serializers.ValidationError(msg)
+        return value
+
+    def get_url(self, upload: Upload) -> str | None:
+        if upload.status != Upload.Status.VERIFIED:
+            return None
+        return reverse(
+            "api:upload-download",
+            kwargs={"pk": upload.pk},
+            request=self.context.get("request"),
+        )
@@ -0,0 +1,61 @@
+"""DRF throttles on the sliding windows of `lego_deck.core.throttling`."""
+
+from rest_framework.throttling import BaseThrottle
+
+from lego_deck.core import throttling
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Throttle requests in ``scope`` by the identity ``get_key`` returns."""
+
+    scope: str
+
+    def __init__(self):
+        self.retry_after = None
+
+    def get_key(self, request, view) -> str | None:
+        """The identity to throttle ``request`` by, None not to."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view) -> bool:
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        self.retry_after = throttling.hit(self.scope, key)
+        return self.retry_after is None
+
+    def wait(self) -> float | None:
+        return self.retry_after
+
+
+class APIThrottle(SlidingWindowThrottle):
+    """Requests per API token, else per user, else per IP address."""
+
+    scope = "api"
+
+    def get_key(self, request, view) -> str:
+        token = getattr(request.auth, "key", None)
+        if token is not None:
+            return f"token:{token}"
+        if request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+
+class LoginIPThrottle(SlidingWindowThrottle):
+    """Login attempts per IP address, before the password is checked."""
+
+    scope = "login_ip"
+
+    def get_key(self, request, view) -> str:
+        return self.get_ident(request)
+
+
+class LoginUsernameThrottle(SlidingWindowThrottle):
+    """Login attempts per username, from any address."""
+
+    scope = "login_username"
+
+    def get_key(self, request, view) -> str | None:
+        username = request.data.get("username")
+        return username.lower() if isinstance(username, str) and username else None
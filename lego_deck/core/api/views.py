@@ -0,0 +1,72 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.exceptions import NotFound
+from rest_framework.mixins import ListModelMixin
+from rest_framework.mixins import RetrieveModelMixin
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+
+from lego_deck.core import downloads
+from lego_deck.core import uploads
+from lego_deck.core.models import Upload
+
+from .serializers import UploadSerializer
+
+
+class DirectUploadsUnavailable(APIException):
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = "Direct uploads are not available."
+    default_code = "direct_uploads_unavailable"
+
+
+class PassthroughRenderer(BaseRenderer):
+    """Accept any media type, for views returning files rather than data."""
+
+    media_type = "*/*"
+    format = ""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class UploadViewSet(RetrieveModelMixin, ListModelMixin, GenericViewSet):
+    serializer_class = UploadSerializer
+    queryset = Upload.objects.all()
+
+    def get_queryset(self, *args, **kwargs):
+        return self.queryset.filter(user=self.request.user).order_by("-id")
+
+    def create(self, request):
+        """Register an upload, the response says where to send the file."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload, instructions = uploads.start(
+                request.user,
+                **serializer.validated_data,
+            )
+        except uploads.DirectUploadsUnavailableError as e:
+            raise DirectUploadsUnavailable from e
+        data = {**self.get_serializer(upload).data, "upload": instructions}
+        return Response(status=status.HTTP_201_CREATED, data=data)
+
+    @action(detail=True, methods=["post"])
+    def complete(self, request, pk=None):
+        """Report the file as uploaded, it is verified once the upload URL expires."""
+        upload = self.get_object()
+        uploads.complete(upload)
+        serializer = self.get_serializer(upload)
+        return Response(status=status.HTTP_202_ACCEPTED, data=serializer.data)
+
+    @extend_schema(responses={(200, "*/*"): OpenApiTypes.BINARY})
+    @action(detail=True, renderer_classes=[PassthroughRenderer])
+    def download(self, request, pk=None):
+        """Send the file, once verified."""
+        upload = self.get_object()
+        if upload.status != Upload.Status.VERIFIED:
+            raise NotFound
+        return downloads.serve(upload.file, content_type=upload.content_type)
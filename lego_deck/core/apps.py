@@ -0,0 +1,37 @@
+from django.apps import AppConfig
+from django.core import checks
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+
+
+class CoreConfig(AppConfig):
+    # The one "lego_deck.core" in INSTALLED_APPS stands for.
+    default = True
+    name = "lego_deck.core"
+    verbose_name = _("Core")
+
+    def ready(self):
+        import lego_deck.core.signals  # noqa: F401
+
+
+def lazy_check(path: str):
+    """A check importing the one at ``path`` only when checks run."""
+
+    def check(app_configs, **kwargs):
+        return import_string(path)(app_configs, **kwargs)
+
+    return check
+
+
+class AnymailConfig(AppConfig):
+    """
+    anymail's app, its checks import requests: not worth it in processes that
+    never send email.
+    """
+
+    name = "anymail"
+    verbose_name = "Anymail"
+
+    def ready(self):
+        checks.register(lazy_check("anymail.checks.check_deprecated_settings"))
+        checks.register(lazy_check("anymail.checks.check_insecure_settings"))
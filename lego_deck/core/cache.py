@@ -0,0 +1,363 @@
+"""
+Two-tier cache: a small in-process cache (L1) in front of Redis (L2).
+
+``TwoTierClient`` is a django-redis client class. Reads are answered from a
+bounded LRU kept by each process when possible, so hot values don't cost a
+round trip. Values are kept encoded and decoded on every hit, callers can't
+alter the cached copy.
+
+Every write through the client removes the key locally and publishes it on a
+Redis channel. Each process listens to that channel from a background thread
+and drops the keys other processes changed. L1 is only used while that thread
+is subscribed: it's bypassed, and emptied, while the connection is down.
+
+Staleness is still bounded by ``L1_TIMEOUT``:
+
+- a key that expires in Redis may be served locally until its L1 entry does,
+- a write whose invalidation couldn't be published isn't seen by other
+  processes until then.
+
+Options, next to the django-redis ones::
+
+    "L1_MAX_ENTRIES": 1024,      # entries kept per process
+    "L1_TIMEOUT": 5,             # seconds an entry is kept
+    "L1_MAX_VALUE_SIZE": 16384,  # larger encoded values only live in Redis
+    "L1_CHANNEL": "cache-invalidation",
+
+It also provides ``Lz4Compressor``, compressing values above a size threshold.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.client import DefaultClient
+from django_redis.client.default import _main_exceptions
+from django_redis.compressors.lz4 import Lz4Compressor as BaseLz4Compressor
+from django_redis.exceptions import ConnectionInterrupted
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LocalCache:
+    """Thread-safe LRU of ``key -> value`` whose entries expire."""
+
+    def __init__(self, max_entries: int, timeout: float):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Return the value for ``key``, or ``_MISSING``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, keys) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class Lz4Compressor(BaseLz4Compressor):
+    """
+    Compress encoded values longer than the ``COMPRESS_MIN_LENGTH`` option,
+    smaller ones don't shrink enough to be worth decompressing on every read.
+
+    Values stored uncompressed, like before compression was enabled, are still
+    read: django-redis uses them as they are when decompression fails.
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.min_length = options.get("COMPRESS_MIN_LENGTH", 1024)
+
+
+class TwoTierClient(DefaultClient):
+    # Seconds between attempts to resubscribe to the invalidation channel.
+    reconnect_delay = 1.0
+
+    def __init__(self, server, params, backend):
+        super().__init__(server, params, backend)
+        self._l1 = LocalCache(
+            max_entries=self._options.get("L1_MAX_ENTRIES", 1024),
+            timeout=self._options.get("L1_TIMEOUT", 5),
+        )
+        self._max_value_size = self._options.get("L1_MAX_VALUE_SIZE", 16384)
+        self._channel = self._options.get("L1_CHANNEL", "cache-invalidation")
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    # Invalidation
+
+    def ensure_listener(self) -> bool:
+        """
+        Start listening for invalidations in this process if needed, return
+        whether L1 can be used.
+        """
+        if self._pid != os.getpid():
+            with self._start_lock:
+                if self._pid != os.getpid():
+                    # Nothing inherited from the parent process can be trusted.
+                    self._l1.clear()
+                    self._stats = dict.fromkeys(
+                        ("l1_hits", "l1_misses", "l2_hits", "l2_misses"),
+                        0,
+                    )
+                    self._sender = uuid.uuid4().hex
+                    self._generation = 0
+                    self.subscribed = threading.Event()
+                    threading.Thread(
+                        target=self._listen,
+                        name="cache-invalidation",
+                        daemon=True,
+                    ).start()
+                    self._pid = os.getpid()
+        return self.subscribed.is_set()
+
+    def _listen(self) -> None:
+        subscribed = self.subscribed
+        while True:
+            try:
+                pubsub = self.get_client(write=True).pubsub()
+                pubsub.subscribe(self._channel)
+                for message in pubsub.listen():
+                    if message["type"] == "subscribe":
+                        # Whatever was published before is lost.
+                        self._evict(None)
+                        subscribed.set()
+                    elif message["type"] == "message":
+                        self._receive(message["data"])
+            except _main_exceptions:
+                logger.warning(
+                    "Lost the cache invalidation channel, bypassing L1",
+                    exc_info=True,
+                )
+            subscribed.clear()
+            self._evict(None)
+            time.sleep(self.reconnect_delay)
+
+    def _receive(self, data: bytes) -> None:
+        message = json.loads(data)
+        if message["sender"] != self._sender:
+            self._evict(message["keys"])
+
+    def _evict(self, keys: list[str] | None) -> None:
+        """Drop ``keys`` from L1, or everything if None."""
+        self._generation += 1
+        if keys is None:
+            self._l1.clear()
+        else:
+            self._l1.delete(keys)
+
+    def _invalidate(self, keys: list[str] | None) -> None:
+        """Drop ``keys`` locally and in every other process."""
+        self._evict(keys)
+        client = self.get_client(write=True)
+        message = json.dumps({"sender": self._sender, "keys": keys})
+        try:
+            client.publish(self._channel, message)
+        except _main_exceptions as e:
+            raise ConnectionInterrupted(connection=client) from e
+
+    # Reads
+
+    def _cache_locally(self, key: str, raw, generation: int) -> None:
+        # Skip values changed while they were being read, they may be stale.
+        if (
+            generation == self._generation
+            and self.subscribed.is_set()
+            and (isinstance(raw, int) or len(raw) <= self._max_value_size)
+        ):
+            self._l1.set(key, raw)
+
+    def get(self, key, default=None, version=None, client=None):
+        # Nested calls with an explicit client, like from a pipeline, go
+        # straight to Redis.
+        if client is not None:
+            return super().get(key, default=default, version=version, client=client)
+        use_l1 = self.ensure_listener()
+        key = str(self.make_key(key, version=version))
+        raw = self._l1.get(key) if use_l1 else _MISSING
+        if raw is not _MISSING:
+            self._count("l1_hits")
+            return self.decode(raw)
+        self._count("l1_misses")
+
+        generation = self._generation
+        client = self.get_client(write=False)
+        try:
+            raw = client.get(key)
+        except _main_exceptions as e:
+            raise ConnectionInterrupted(connection=client) from e
+        if raw is None:
+            self._count("l2_misses")
+            return default
+        self._count("l2_hits")
+        self._cache_locally(key, raw, generation)
+        return self.decode(raw)
+
+    def get_many(self, keys, version=None, client=None):
+        if client is not None:
+            return super().get_many(keys, version=version, client=client)
+        use_l1 = self.ensure_listener()
+        found, missing = OrderedDict(), {}
+        for key in keys:
+            made = str(self.make_key(key, version=version))
+            raw = self._l1.get(made) if use_l1 else _MISSING
+            if raw is _MISSING:
+                missing[made] = key
+            else:
+                found[key] = self.decode(raw)
+        self._count("l1_hits", len(found))
+        self._count("l1_misses", len(missing))
+        if not missing:
+            return found
+
+        generation = self._generation
+        client = self.get_client(write=False)
+        try:
+            results = client.mget(*missing)
+        except _main_exceptions as e:
+            raise ConnectionInterrupted(connection=client) from e
+        for made, raw in zip(missing, results, strict=True):
+            if raw is None:
+                self._count("l2_misses")
+                continue
+            self._count("l2_hits")
+            self._cache_locally(made, raw, generation)
+            found[missing[made]] = self.decode(raw)
+        return found
+
+    # Writes. Nested calls with an explicit client leave the invalidation to
+    # the outer call, which knows when the write actually happened.
+
+    def _written(self, keys, version, client) -> None:
+        if client is None:
+            self.ensure_listener()
+            self._invalidate([str(self.make_key(k, version=version)) for k in keys])
+
+    def set(  # noqa: PLR0913
+        self,
+        key,
+        value,
+        timeout=DEFAULT_TIMEOUT,
+        version=None,
+        client=None,
+        nx=False,  # noqa: FBT002
+        xx=False,  # noqa: FBT002
+    ):
+        result = super().set(key, value, timeout, version, client, nx=nx, xx=xx)
+        self._written([key], version, client)
+        return result
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        super().set_many(data, timeout=timeout, version=version, client=client)
+        self._written(data, version, client)
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        result = super().delete(key, version=version, prefix=prefix, client=client)
+        if client is None:
+            self.ensure_listener()
+            self._invalidate([str(self.make_key(key, version=version, prefix=prefix))])
+        return result
+
+    def delete_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        result = super().delete_many(keys, version=version, client=client)
+        self._written(keys, version, client)
+        return result
+
+    def _incr(self, key, delta=1, version=None, client=None, **kwargs):
+        result = super()._incr(key, delta, version=version, client=client, **kwargs)
+        self._written([key], version, client)
+        return result
+
+    def incr_version(self, key, delta=1, version=None, client=None):
+        if version is None:
+            version = self._backend.version
+        result = super().incr_version(key, delta, version=version, client=client)
+        self._written([key], version, client)
+        self._written([key], version + delta, client)
+        return result
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        result = super().touch(key, timeout=timeout, version=version, client=client)
+        self._written([key], version, client)
+        return result
+
+    def expire(self, key, timeout, version=None, client=None):
+        result = super().expire(key, timeout, version=version, client=client)
+        self._written([key], version, client)
+        return result
+
+    def pexpire(self, key, timeout, version=None, client=None):
+        result = super().pexpire(key, timeout, version=version, client=client)
+        self._written([key], version, client)
+        return result
+
+    def delete_pattern(self, *args, client=None, **kwargs):
+        result = super().delete_pattern(*args, client=client, **kwargs)
+        if client is None:
+            self.ensure_listener()
+            self._invalidate(None)
+        return result
+
+    def clear(self, client=None):
+        super().clear(client=client)
+        if client is None:
+            self.ensure_listener()
+            self._invalidate(None)
+
+    # Metrics
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        """Add ``n`` to ``stat``, like "l1_hits", here and in the metrics."""
+        self._stats[stat] += n
+        metrics.CACHE_LOOKUPS.labels(*stat.split("_")).inc(n)
+
+    def stats(self) -> dict[str, float]:
+        """Hits and misses per tier in this process, and their ratios."""
+        self.ensure_listener()
+        stats: dict[str, float] = dict(self._stats)
+        for tier in ("l1", "l2"):
+            lookups = stats[f"{tier}_hits"] + stats[f"{tier}_misses"]
+            stats[f"{tier}_hit_ratio"] = (
+                stats[f"{tier}_hits"] / lookups if lookups else 0.0
+            )
+        stats["l1_entries"] = len(self._l1)
+        return stats
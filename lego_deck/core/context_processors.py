@@ -0,0 +1,9 @@
+from django.conf import settings
+
+
+def fragment_cache(request):
+    """Expose the fragment cache timeout and deploy version in templates."""
+    return {
+        "DEPLOY_VERSION": settings.DEPLOY_VERSION,
+        "FRAGMENT_CACHE_TIMEOUT": settings.FRAGMENT_CACHE_TIMEOUT,
+    }
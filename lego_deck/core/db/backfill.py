@@ -0,0 +1,120 @@
+"""
+Resumable data backfills.
+
+Apps declare backfills in a ``backfills.py`` module::
+
+    from django.db.models import F
+
+    from lego_deck.core.db.backfill import Backfill
+    from lego_deck.core.db.backfill import register
+
+
+    @register
+    class FillUserName(Backfill):
+        name = "users.fill_name"
+        model = "users.User"
+
+        def get_queryset(self):
+            return super().get_queryset().filter(name="")
+
+        def process_batch(self, queryset):
+            return queryset.update(name=F("username"))
+
+and run them with ``python manage.py backfill users.fill_name``. Progress is
+checkpointed per batch in :class:`lego_deck.core.models.BackfillProgress`, so an
+interrupted run picks up where it stopped.
+"""
+
+from __future__ import annotations
+
+import typing
+
+from django.apps import apps
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from lego_deck.core.db.batches import Batch
+from lego_deck.core.db.batches import run_in_batches
+from lego_deck.core.models import BackfillProgress
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.db.models import Model
+    from django.db.models import QuerySet
+
+registry: dict[str, type[Backfill]] = {}
+
+
+def register(backfill: type[Backfill]) -> type[Backfill]:
+    """Class decorator adding a backfill to the registry."""
+    if backfill.name in registry:
+        msg = f"A backfill named {backfill.name!r} is already registered."
+        raise ValueError(msg)
+    registry[backfill.name] = backfill
+    return backfill
+
+
+def autodiscover() -> None:
+    autodiscover_modules("backfills")
+
+
+class Backfill:
+    name: str
+    model: str | type[Model]
+    batch_size = 1000
+    sleep = 0.1
+
+    def get_model(self) -> type[Model]:
+        if isinstance(self.model, str):
+            return apps.get_model(self.model)
+        return self.model
+
+    def get_queryset(self) -> QuerySet:
+        return self.get_model()._default_manager.all()
+
+    def process_batch(self, queryset: QuerySet) -> int:
+        """Update the rows of one id range and return how many were touched."""
+        raise NotImplementedError
+
+    def run(
+        self,
+        *,
+        batch_size: int | None = None,
+        sleep: float | None = None,
+        reset: bool = False,
+        on_batch: Callable[[BackfillProgress], None] | None = None,
+    ) -> BackfillProgress:
+        progress, created = BackfillProgress.objects.get_or_create(name=self.name)
+        if reset and not created:
+            progress.last_id = 0
+            progress.max_id = 0
+            progress.rows_processed = 0
+            progress.completed_at = None
+        queryset = self.get_queryset()
+        if not progress.max_id:
+            # Bound the run once, so rows inserted meanwhile (already written
+            # by the new code) don't keep the backfill chasing the table's tail.
+            progress.max_id = queryset.aggregate(max_id=Max("pk"))["max_id"] or 0
+        progress.save()
+
+        def checkpoint(batch: Batch) -> None:
+            progress.last_id = batch.end
+            progress.rows_processed += batch.rows
+            progress.save(update_fields=["last_id", "rows_processed", "updated_at"])
+            if on_batch is not None:
+                on_batch(progress)
+
+        run_in_batches(
+            queryset,
+            self.process_batch,
+            batch_size=batch_size or self.batch_size,
+            sleep=self.sleep if sleep is None else sleep,
+            start=progress.last_id,
+            stop=progress.max_id,
+            on_batch=checkpoint,
+        )
+        progress.completed_at = timezone.now()
+        progress.save(update_fields=["completed_at", "updated_at"])
+        return progress
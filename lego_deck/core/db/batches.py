@@ -0,0 +1,106 @@
+"""
+Helpers to process a table in small primary-key ranges.
+
+Each batch runs in its own short transaction so row locks are released between
+batches, and an optional sleep leaves headroom for regular traffic (and for
+replicas to catch up).
+"""
+
+from __future__ import annotations
+
+import time
+import typing
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Max
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Iterator
+
+    from django.db.models import QuerySet
+
+
+@dataclass(frozen=True)
+class Batch:
+    start: int
+    end: int
+    rows: int
+    max_id: int
+
+
+def id_ranges(start: int, stop: int, batch_size: int) -> Iterator[tuple[int, int]]:
+    """Yield half-open ``(start, end]`` id ranges covering ``start`` to ``stop``."""
+    if batch_size < 1:
+        msg = "batch_size must be a positive integer."
+        raise ValueError(msg)
+    while start < stop:
+        end = min(start + batch_size, stop)
+        yield start, end
+        start = end
+
+
+def run_in_batches(  # noqa: PLR0913
+    queryset: QuerySet,
+    process: Callable[[QuerySet], int | None],
+    *,
+    batch_size: int = 1000,
+    sleep: float = 0.0,
+    start: int = 0,
+    stop: int | None = None,
+    using: str | None = None,
+    on_batch: Callable[[Batch], None] | None = None,
+) -> int:
+    """
+    Call ``process`` with ``queryset`` narrowed to successive primary-key ranges.
+
+    ``process`` returns the number of rows it touched. The upper bound is read
+    once up front, rows inserted afterwards are expected to be written correctly
+    by the new code. ``on_batch`` runs inside the batch transaction, so a
+    checkpoint saved there commits atomically with the batch itself.
+    Returns the total number of rows processed.
+    """
+    using = using or queryset.db
+    if stop is None:
+        stop = queryset.aggregate(max_id=Max("pk"))["max_id"] or 0
+    total = 0
+    for low, high in id_ranges(start, stop, batch_size):
+        with transaction.atomic(using=using):
+            rows = process(queryset.filter(pk__gt=low, pk__lte=high)) or 0
+            total += rows
+            if on_batch is not None:
+                on_batch(Batch(start=low, end=high, rows=rows, max_id=stop))
+        if sleep and high < stop:
+            time.sleep(sleep)
+    return total
+
+
+def delete_in_batches(
+    queryset: QuerySet,
+    *,
+    batch_size: int = 1000,
+    sleep: float = 0.0,
+) -> int:
+    """
+    Delete the rows of ``queryset`` at most ``batch_size`` at a time.
+
+    Batches are picked without an ``ORDER BY`` so the database can stop an
+    index scan on the filtered column as soon as it has enough rows. Returns the
+    number of ``queryset.model`` rows deleted, cascades excluded.
+    """
+    using = queryset.db
+    manager = queryset.model._base_manager.using(using)
+    label = queryset.model._meta.label
+    unordered = queryset.order_by()
+    total = 0
+    while True:
+        with transaction.atomic(using=using):
+            pks = list(unordered.values_list("pk", flat=True)[:batch_size])
+            if pks:
+                _, deleted = manager.filter(pk__in=pks).delete()
+                total += deleted.get(label, 0)
+        if len(pks) < batch_size:
+            return total
+        if sleep:
+            time.sleep(sleep)
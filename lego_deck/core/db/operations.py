@@ -0,0 +1,210 @@
+"""
+Migration operations for changing hot tables without long exclusive locks.
+
+Django already ships the PostgreSQL primitives, they are re-exported here so
+migrations have a single place to import from:
+
+* ``AddIndexConcurrently`` / ``RemoveIndexConcurrently`` build or drop an index
+  with ``CONCURRENTLY``, reads and writes keep flowing meanwhile.
+* ``AddConstraintNotValid`` adds a check constraint enforced for new rows only,
+  ``ValidateConstraint`` later scans the table under a ``SHARE UPDATE
+  EXCLUSIVE`` lock, which doesn't block reads or writes.
+
+On top of those, :class:`SetLockTimeout` bounds how long DDL may queue behind
+running transactions (a queued ``ACCESS EXCLUSIVE`` request blocks everything
+behind it), and :class:`RunInBatches` backfills data over primary-key ranges.
+
+Concurrent and batched operations can't run inside a transaction, migrations
+using them must set ``atomic = False``::
+
+    class Migration(migrations.Migration):
+        atomic = False
+
+        operations = [
+            SetLockTimeout("5s"),
+            migrations.AddField("users", "nickname", models.CharField(...)),
+            RunInBatches("user", fill_nickname, batch_size=5000, sleep=0.2),
+        ]
+
+``AddIndexConcurrently`` waits for every transaction running when it starts,
+it belongs in a migration of its own, without a lock timeout.
+"""
+
+from __future__ import annotations
+
+import typing
+
+from django.contrib.postgres.operations import AddConstraintNotValid
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.contrib.postgres.operations import ValidateConstraint
+from django.db import NotSupportedError
+from django.db import router
+from django.db.migrations.operations.base import Operation
+
+from lego_deck.core.db.batches import run_in_batches
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from django.db.models import QuerySet
+
+__all__ = [
+    "AddConstraintNotValid",
+    "AddIndexConcurrently",
+    "RemoveIndexConcurrently",
+    "RunInBatches",
+    "SetLockTimeout",
+    "ValidateConstraint",
+]
+
+
+class SetLockTimeout(Operation):
+    """
+    Make the following statements of the migration give up after ``timeout``
+    instead of queueing behind long-running transactions.
+
+    The timeout ends with the migration: with its transaction in atomic ones,
+    ``SET LOCAL``, and after the statements deferred to its end in others, the
+    foreign keys and indexes of fields added after this operation included.
+    Later migrations, ``CONCURRENTLY`` ones which wait for every running
+    transaction above all, aren't bound by it.
+    """
+
+    reversible = True
+    reduces_to_sql = True
+
+    def __init__(self, timeout: str = "5s"):
+        self.timeout = timeout
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        if schema_editor.atomic_migration:
+            schema_editor.execute(f"SET LOCAL lock_timeout = '{self.timeout}'")
+        else:
+            schema_editor.execute(f"SET lock_timeout = '{self.timeout}'")
+            if not isinstance(schema_editor.deferred_sql, _DeferredSQL):
+                schema_editor.deferred_sql = _DeferredSQL(
+                    schema_editor.deferred_sql,
+                    last="RESET lock_timeout",
+                )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        # Back to the timeout from before the migration.
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        if schema_editor.atomic_migration:
+            schema_editor.execute("SET LOCAL lock_timeout TO DEFAULT")
+        else:
+            schema_editor.execute("RESET lock_timeout")
+
+    def describe(self):
+        return f"Set lock_timeout to {self.timeout}"
+
+    def deconstruct(self):
+        return self.__class__.__qualname__, [self.timeout], {}
+
+
+class _DeferredSQL(list):
+    """Deferred statements of a schema editor, ``last`` kept after the others."""
+
+    def __init__(self, statements, *, last):
+        super().__init__(statements)
+        super().append(last)
+
+    def append(self, sql):
+        self.insert(len(self) - 1, sql)
+
+    def extend(self, statements):
+        for sql in statements:
+            self.append(sql)
+
+
+class RunInBatches(Operation):
+    """
+    Apply ``code`` to ``model_name`` rows one primary-key range at a time.
+
+    ``code`` receives a queryset of the historical model restricted to the
+    current range and returns the number of rows it changed. Every batch is
+    committed on its own, so the migration must not be atomic.
+    """
+
+    reversible = True
+    reduces_to_sql = False
+
+    def __init__(  # noqa: PLR0913
+        self,
+        model_name: str,
+        code: Callable[[QuerySet], int | None],
+        reverse_code: Callable[[QuerySet], int | None] | None = None,
+        *,
+        batch_size: int = 1000,
+        sleep: float = 0.1,
+        hints: dict | None = None,
+    ):
+        self.model_name = model_name
+        self.code = code
+        self.reverse_code = reverse_code
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.hints = hints or {}
+        if reverse_code is None:
+            self.reversible = False
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def _run(self, code, app_label, schema_editor, state) -> None:
+        if schema_editor.atomic_migration:
+            msg = (
+                f"{self.__class__.__name__} cannot be executed inside a "
+                f"transaction, set Migration.atomic to False."
+            )
+            raise NotSupportedError(msg)
+        alias = schema_editor.connection.alias
+        model = state.apps.get_model(app_label, self.model_name)
+        # As RunPython, with the hints given to the routers.
+        if not router.allow_migrate(
+            alias,
+            app_label,
+            model_name=self.model_name.lower(),
+            model=model,
+            **self.hints,
+        ):
+            return
+        run_in_batches(
+            model._default_manager.using(alias).all(),
+            code,
+            batch_size=self.batch_size,
+            sleep=self.sleep,
+            using=alias,
+        )
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._run(self.code, app_label, schema_editor, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if self.reverse_code is None:
+            msg = "You cannot reverse this operation"
+            raise NotImplementedError(msg)
+        self._run(self.reverse_code, app_label, schema_editor, from_state)
+
+    def describe(self):
+        return f"Run code on {self.model_name} in batches of {self.batch_size}"
+
+    def deconstruct(self):
+        kwargs = {
+            "model_name": self.model_name,
+            "code": self.code,
+            "batch_size": self.batch_size,
+            "sleep": self.sleep,
+        }
+        if self.reverse_code is not None:
+            kwargs["reverse_code"] = self.reverse_code
+        if self.hints:
+            kwargs["hints"] = self.hints
+        return self.__class__.__qualname__, [], kwargs
@@ -0,0 +1,77 @@
+"""
+Permission-checked downloads of media files.
+
+Views check access, then hand the transfer over with :func:`serve`, so workers
+never stream file bodies themselves:
+
+- storages implementing ``download_url()``, like
+  ``lego_deck.core.storages.MediaAzureStorage``, get a redirect to a signed URL
+  valid for ``DOWNLOAD_URL_EXPIRY`` seconds,
+- files on disk are sent by nginx when ``MEDIA_ACCEL_REDIRECT_PREFIX`` is set,
+  with an ``X-Accel-Redirect`` header pointing to its internal location,
+- otherwise, as in development, Django streams the file.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import typing
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse
+from django.http import HttpResponse
+from django.http import HttpResponseRedirect
+from django.utils.cache import add_never_cache_headers
+from django.utils.http import content_disposition_header
+
+if typing.TYPE_CHECKING:
+    from django.db.models.fields.files import FieldFile
+    from django.http.response import HttpResponseBase
+
+
+def serve(
+    file: FieldFile,
+    filename: str | None = None,
+    content_type: str | None = None,
+) -> HttpResponseBase:
+    """Respond with ``file`` as an attachment named ``filename``."""
+    storage, name = file.storage, file.name
+    if not name:
+        msg = "No file to serve."
+        raise ValueError(msg)
+    filename = filename or posixpath.basename(name)
+    response: HttpResponseBase
+    if hasattr(storage, "download_url"):
+        response = HttpResponseRedirect(
+            storage.download_url(
+                name,
+                expire=settings.DOWNLOAD_URL_EXPIRY,
+                filename=filename,
+            ),
+        )
+    elif settings.MEDIA_ACCEL_REDIRECT_PREFIX and isinstance(
+        storage,
+        FileSystemStorage,
+    ):
+        # nginx sets Content-Length and the body, and keeps the other headers.
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = quote(
+            posixpath.join(settings.MEDIA_ACCEL_REDIRECT_PREFIX, name),
+        )
+        # Only None for inline responses without a file name.
+        response["Content-Disposition"] = typing.cast(
+            "str",
+            content_disposition_header(as_attachment=True, filename=filename),
+        )
+    else:
+        response = FileResponse(
+            file.open("rb"),
+            as_attachment=True,
+            filename=filename,
+            content_type=content_type,
+        )
+    # Neither the file nor the signed URL are for shared caches.
+    add_never_cache_headers(response)
+    return response
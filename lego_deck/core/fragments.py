@@ -0,0 +1,36 @@
+"""
+Versions for template fragment cache keys.
+
+``{% cache %}`` keys include a per-object version read from the cache, bumping
+the version on save makes every fragment rendered from the old state
+unreachable, without having to know which fragments exist.
+"""
+
+from __future__ import annotations
+
+import typing
+
+from django.core.cache import cache
+
+if typing.TYPE_CHECKING:
+    from django.db.models import Model
+
+
+def _version_key(instance: Model) -> str:
+    return f"fragment-version:{instance._meta.label_lower}:{instance.pk}"
+
+
+def get_version(instance: Model) -> int:
+    if instance.pk is None:
+        return 0
+    return cache.get(_version_key(instance), 0)
+
+
+def bump_version(instance: Model) -> None:
+    key = _version_key(instance)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Versions never expire on their own: a reset could bring stale
+        # fragments back.
+        cache.set(key, 1, timeout=None)
@@ -0,0 +1,111 @@
+"""
+Health checks for the load balancer, answered by ``HealthCheckMiddleware``.
+
+- ``/healthz``: the process is up and serving requests,
+- ``/readyz``: it can also reach the database and Redis.
+
+Probe results are kept ``HEALTH_CHECK_CACHE_SECONDS`` per process, and only
+one thread runs a probe at a time: checks, however frequent and from however
+many load balancers, cost the dependencies at most one round trip each per
+interval. While a probe runs other threads answer with its previous result,
+failed if there is none, rather than wait for it: probes time out after a
+second or two, requests shouldn't queue behind them.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import typing
+from functools import cache
+
+from django.conf import settings
+from django.db import connection
+
+from lego_deck.core import redis
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+# Seconds a probe may take, a hung connection must fail the check. libpq
+# counts connection timeouts in whole seconds, 2 at least.
+DATABASE_TIMEOUT = 2
+REDIS_TIMEOUT = 1.0
+
+_results: dict[str, tuple[float, bool]] = {}
+_locks: dict[str, threading.Lock] = {}
+
+
+def probe_database() -> None:
+    # A connection of its own, with timeouts the requests' connection doesn't
+    # have, closed after the probe.
+    params = connection.get_connection_params()
+    params["connect_timeout"] = DATABASE_TIMEOUT
+    params["options"] = (
+        f"{params.get('options', '')} "
+        f"-c statement_timeout={DATABASE_TIMEOUT * 1000}"
+    ).strip()
+    probe_connection = connection.get_new_connection(params)
+    try:
+        with probe_connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    finally:
+        probe_connection.close()
+
+
+@cache
+def _redis_client():
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=REDIS_TIMEOUT,
+        socket_connect_timeout=REDIS_TIMEOUT,
+    )
+
+
+def probe_redis() -> None:
+    _redis_client().ping()
+
+
+PROBES: dict[str, Callable[[], None]] = {
+    "database": probe_database,
+    "redis": probe_redis,
+}
+
+
+def check(name: str) -> bool:
+    """
+    Whether the probe ``name`` passed, run at most once per interval and by
+    one thread at a time.
+    """
+    cached = _results.get(name)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    lock = _locks.setdefault(name, threading.Lock())
+    if not lock.acquire(blocking=False):
+        # Being probed by another thread.
+        return cached is not None and cached[1]
+    try:
+        cached = _results.get(name)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        try:
+            PROBES[name]()
+        except Exception:  # noqa: BLE001
+            logger.warning("Health check %s failed", name, exc_info=True)
+            passed = False
+        else:
+            passed = True
+        _results[name] = (
+            time.monotonic() + settings.HEALTH_CHECK_CACHE_SECONDS,
+            passed,
+        )
+        return passed
+    finally:
+        lock.release()
+
+
+def readiness() -> dict[str, bool]:
+    return {name: check(name) for name in PROBES}
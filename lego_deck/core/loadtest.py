@@ -0,0 +1,297 @@
+"""
+Load tests of the main user flows, run by ``manage.py loadtest``.
+
+Virtual users, each with an account of its own, repeatedly pick a scenario at
+random, by weight, until the time is up. Every request is timed and the
+results, per request and overall, are summarised as percentiles and
+throughput.
+
+Accounts are created, and deleted afterwards, in the database the command is
+configured with: the server under test must use the same one. They share a
+password made up for the run, the admin's included.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from dataclasses import field
+
+import requests
+from allauth.account.models import EmailAddress
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+
+from lego_deck.users.models import User
+
+PREFIX = "loadtest-"
+ADMIN_USERNAME = f"{PREFIX}admin"
+
+
+@dataclass
+class Sample:
+    name: str
+    duration: float
+    ok: bool
+
+
+@dataclass
+class Client:
+    """An HTTP session timing each request it makes."""
+
+    base_url: str
+    samples: list[Sample]
+    session: requests.Session = field(default_factory=requests.Session)
+    timeout: float = 30
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        name: str | None = None,
+        expect: tuple[int, ...] = (200,),
+        **kwargs,
+    ) -> requests.Response:
+        csrf_token = self.session.cookies.get(settings.CSRF_COOKIE_NAME)
+        if method == "POST" and csrf_token:
+            kwargs.setdefault("headers", {})["X-CSRFToken"] = csrf_token
+        started = time.perf_counter()
+        try:
+            response = self.session.request(
+                method,
+                self.base_url + path,
+                allow_redirects=False,
+                timeout=self.timeout,
+                **kwargs,
+            )
+        except requests.RequestException:
+            response = None
+        # list.append is atomic, samples are shared by every virtual user.
+        self.samples.append(
+            Sample(
+                name=name or f"{method} {path}",
+                duration=time.perf_counter() - started,
+                ok=response is not None and response.status_code in expect,
+            ),
+        )
+        if response is None or response.status_code not in expect:
+            msg = f"{method} {path}: {response and response.status_code}"
+            raise ScenarioError(msg)
+        return response
+
+    def login(self, username: str, password: str) -> None:
+        self.request("GET", reverse("account_login"))
+        self.request(
+            "POST",
+            reverse("account_login"),
+            data={"login": username, "password": password},
+            expect=(302,),
+        )
+
+    @property
+    def logged_in(self) -> bool:
+        return settings.SESSION_COOKIE_NAME in self.session.cookies
+
+
+class ScenarioError(Exception):
+    pass
+
+
+@dataclass
+class VirtualUser:
+    """An account, browsing with ``client``, and an admin on ``staff_client``."""
+
+    account: User
+    password: str
+    client: Client
+    staff_client: Client
+
+
+# Scenarios, each run by a virtual user.
+
+
+def signup(user: VirtualUser) -> None:
+    # A new visitor.
+    client = Client(user.client.base_url, user.client.samples)
+    new = f"{PREFIX}s-{uuid.uuid4().hex[:12]}"
+    client.request("GET", reverse("account_signup"))
+    client.request(
+        "POST",
+        reverse("account_signup"),
+        data={
+            "username": new,
+            "email": f"{new}@example.com",
+            "password1": user.password,
+            "password2": user.password,
+        },
+        expect=(302,),
+    )
+
+
+def login(user: VirtualUser) -> None:
+    client = user.client
+    client.session.cookies.clear()
+    client.login(user.account.username, user.password)
+    client.request("GET", reverse("users:redirect"), expect=(302,))
+
+
+def api(user: VirtualUser) -> None:
+    client = user.client
+    response = client.request(
+        "POST",
+        "/api/auth-token/",
+        data={"username": user.account.username, "password": user.password},
+    )
+    headers = {"Authorization": f"Token {response.json()['token']}"}
+    for _ in range(3):
+        client.request("GET", reverse("api:user-me"), headers=headers)
+
+
+def profile(user: VirtualUser) -> None:
+    client = user.client
+    if not client.logged_in:
+        client.login(user.account.username, user.password)
+    client.request(
+        "GET",
+        reverse("users:detail", args=[user.account.username]),
+        name="GET /users/<username>/",
+    )
+    client.request("GET", reverse("users:update"))
+    client.request(
+        "POST",
+        reverse("users:update"),
+        data={"name": f"Load Test {random.randint(0, 999)}"},  # noqa: S311
+        expect=(302,),
+    )
+
+
+def admin(user: VirtualUser) -> None:
+    client = user.staff_client
+    if not client.logged_in:
+        client.login(ADMIN_USERNAME, user.password)
+    changelist = reverse("admin:users_user_changelist")
+    client.request("GET", reverse("admin:index"))
+    client.request("GET", changelist)
+    client.request("GET", changelist, params={"q": PREFIX}, name=f"GET {changelist}?q=")
+    client.request(
+        "GET",
+        reverse("admin:users_user_change", args=[user.account.pk]),
+        name="GET /admin/users/user/<id>/change/",
+    )
+
+
+# Relative weights, in the proportions expected of real traffic.
+SCENARIOS = {
+    "signup": (signup, 1),
+    "login": (login, 2),
+    "api": (api, 4),
+    "profile": (profile, 4),
+    "admin": (admin, 1),
+}
+
+
+def create_accounts(count: int, password: str) -> list[User]:
+    """Create ``count`` verified accounts, and the admin's."""
+    encoded = make_password(password)
+    users = User.objects.bulk_create(
+        [User(username=f"{PREFIX}{n}", password=encoded) for n in range(count)]
+        + [
+            User(
+                username=ADMIN_USERNAME,
+                password=encoded,
+                is_staff=True,
+                is_superuser=True,
+            ),
+        ],
+    )
+    EmailAddress.objects.bulk_create(
+        EmailAddress(
+            user=user,
+            email=f"{user.username}@example.com",
+            verified=True,
+            primary=True,
+        )
+        for user in users
+    )
+    return users[:count]
+
+
+def delete_accounts() -> None:
+    User.objects.filter(username__startswith=PREFIX).delete()
+
+
+def run(  # noqa: PLR0913
+    base_url: str,
+    accounts: list[User],
+    password: str,
+    duration: float,
+    scenarios: list[str],
+    samples: list[Sample],
+    errors: list[str],
+) -> float:
+    """Run the virtual users for ``duration`` seconds, return the time taken."""
+    functions = [SCENARIOS[name][0] for name in scenarios]
+    weights = [SCENARIOS[name][1] for name in scenarios]
+    deadline = time.monotonic() + duration
+
+    def virtual_user(account: User) -> None:
+        user = VirtualUser(
+            account,
+            password,
+            Client(base_url, samples),
+            Client(base_url, samples),
+        )
+        while time.monotonic() < deadline:
+            scenario = random.choices(functions, weights)[0]  # noqa: S311
+            try:
+                scenario(user)
+            except ScenarioError as e:
+                errors.append(f"{scenario.__name__}: {e}")
+                # Start over from a new session.
+                user.client.session.cookies.clear()
+                user.staff_client.session.cookies.clear()
+
+    threads = [threading.Thread(target=virtual_user, args=[a]) for a in accounts]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.monotonic() - started
+
+
+def percentile(durations: list[float], p: float) -> float:
+    """Nearest-rank percentile of sorted ``durations``."""
+    return durations[max(0, round(p / 100 * len(durations)) - 1)]
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict[str, float]:
+    durations = sorted(s.duration for s in samples)
+    if not durations:
+        return {"requests": 0}
+    return {
+        "requests": len(durations),
+        "errors": sum(not s.ok for s in samples),
+        "rps": len(durations) / elapsed,
+        "mean_ms": 1000 * sum(durations) / len(durations),
+        "p50_ms": 1000 * percentile(durations, 50),
+        "p95_ms": 1000 * percentile(durations, 95),
+        "p99_ms": 1000 * percentile(durations, 99),
+        "max_ms": 1000 * durations[-1],
+    }
+
+
+def report(samples: list[Sample], elapsed: float) -> dict:
+    by_name: dict[str, list[Sample]] = {}
+    for sample in samples:
+        by_name.setdefault(sample.name, []).append(sample)
+    return {
+        "total": summarize(samples, elapsed),
+        "requests": {
+            name: summarize(named, elapsed) for name, named in sorted(by_name.items())
+        },
+    }
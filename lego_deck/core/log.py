@@ -0,0 +1,197 @@
+"""
+Structured, non-blocking logging.
+
+``QueueHandler`` only puts records on a bounded in-memory queue; a background
+thread formats them and writes them out, so a slow stdout never stalls a
+request or a task. When the queue is full, records are dropped and counted
+rather than waited on, the count is logged once there is room again.
+
+``JsonFormatter`` writes one JSON object per line. Each record carries the id
+of the request it was logged from, set by ``RequestIdMiddleware``, and, in
+Celery workers, the id and name of the task. Tasks inherit the request id of
+whatever queued them, see ``config.celery_app``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import weakref
+from contextvars import ContextVar
+from datetime import UTC
+from datetime import datetime
+
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+task_id: ContextVar[str | None] = ContextVar("task_id", default=None)
+task_name: ContextVar[str | None] = ContextVar("task_name", default=None)
+
+# Attributes every LogRecord has, anything else was passed in ``extra``.
+RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__,
+) | {"message", "asctime", "request_id", "task_id", "task_name"}
+
+
+class ContextFilter(logging.Filter):
+    """Add the request and task ids of the current context to records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        record.task_id = task_id.get()
+        record.task_name = task_name.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "process": record.process,
+            "thread": record.thread,
+        }
+        for name in ("request_id", "task_id", "task_name"):
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        entry.update(
+            (name, value)
+            for name, value in record.__dict__.items()
+            if name not in RECORD_ATTRIBUTES and not name.startswith("_")
+        )
+        return json.dumps(entry, default=str)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records for a thread writing them to ``stream``, stderr by default,
+    with this handler's formatter.
+
+    The thread doesn't survive a fork, forked processes (gunicorn and Celery
+    workers) start their own, with a new queue.
+    """
+
+    listener: _Listener
+    queue: queue.Queue[logging.LogRecord]
+
+    def __init__(self, stream=None, maxsize: int = 10000):
+        self.target = logging.StreamHandler(stream)
+        self.maxsize = maxsize
+        self.dropped = 0
+        super().__init__(queue.Queue(maxsize))
+        self.addFilter(ContextFilter())
+        self.start()
+        _open_handlers.add(self)
+
+    def start(self) -> None:
+        # Anything queued in the parent process is its own to write.
+        self.queue = queue.Queue(self.maxsize)
+        self.dropped = 0
+        self.listener = _Listener(self.queue, self.target)
+        self.listener.start()
+
+    def setFormatter(self, fmt):  # noqa: N802
+        # Records are formatted by the listener's thread, not the caller's.
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Keep what the listener needs to format ``record`` later: the message
+        is resolved now, its arguments might change or not be thread-safe.
+        """
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            # Tracebacks keep every frame, and their locals, alive.
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.dropped:
+                self.queue.put_nowait(self.dropped_record())
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def dropped_record(self) -> logging.LogRecord:
+        record = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Dropped {self.dropped} log records, the queue was full",
+            },
+        )
+        record.request_id = record.task_id = record.task_name = None
+        return record
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait for the records queued so far to be written."""
+        if self.listener.running:
+            marker = _Marker()
+            with contextlib.suppress(queue.Full):
+                self.queue.put(marker, timeout=timeout)
+                marker.written.wait(timeout)
+        self.target.flush()
+
+    def close(self) -> None:
+        _open_handlers.discard(self)
+        if self.listener.running:
+            self.listener.stop()
+        self.target.close()
+        super().close()
+
+
+# Handlers to restart in forked processes, closed ones left out.
+_open_handlers: weakref.WeakSet[QueueHandler] = weakref.WeakSet()
+
+
+def _restart_handlers() -> None:
+    for handler in list(_open_handlers):
+        handler.start()
+
+
+os.register_at_fork(after_in_child=_restart_handlers)
+
+
+class _Marker(logging.LogRecord):
+    """Record set as written when the listener gets to it, see ``flush``."""
+
+    def __init__(self):
+        super().__init__(__name__, logging.NOTSET, "", 0, "", (), None)
+        self.written = threading.Event()
+
+
+class _Listener(logging.handlers.QueueListener):
+    running = False
+
+    def start(self) -> None:
+        super().start()
+        self.running = True
+
+    def stop(self) -> None:
+        self.running = False
+        super().stop()
+
+    def handle(self, record: logging.LogRecord) -> None:
+        if isinstance(record, _Marker):
+            record.written.set()
+        else:
+            super().handle(record)
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from lego_deck.core.db import backfill
+from lego_deck.core.models import BackfillProgress
+
+
+class Command(BaseCommand):
+    help = "Run a registered data backfill in throttled, resumable batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", nargs="?", help="Name of the backfill to run.")
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="List registered backfills and their progress.",
+        )
+        parser.add_argument("--batch-size", type=int, help="Rows per batch.")
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            help="Seconds to pause between batches.",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Discard the saved checkpoint and start over.",
+        )
+
+    def handle(self, *args, **options):
+        backfill.autodiscover()
+        if options["list"]:
+            self.list_backfills()
+            return
+        name = options["name"]
+        if not name:
+            msg = "Provide the name of a backfill, or --list to see them."
+            raise CommandError(msg)
+        try:
+            backfill_class = backfill.registry[name]
+        except KeyError:
+            msg = f"Unknown backfill {name!r}."
+            raise CommandError(msg) from None
+
+        progress = backfill_class().run(
+            batch_size=options["batch_size"],
+            sleep=options["sleep"],
+            reset=options["reset"],
+            on_batch=self.report,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{name}: done, {progress.rows_processed} rows processed.",
+            ),
+        )
+
+    def report(self, progress: BackfillProgress) -> None:
+        self.stdout.write(
+            f"{progress.name}: id {progress.last_id}/{progress.max_id} "
+            f"({progress.percent_done:.1f}%), {progress.rows_processed} rows",
+        )
+
+    def list_backfills(self) -> None:
+        checkpoints = {
+            p.name: p
+            for p in BackfillProgress.objects.filter(name__in=backfill.registry)
+        }
+        for name in sorted(backfill.registry):
+            progress = checkpoints.get(name)
+            if progress is None:
+                state = "not started"
+            elif progress.completed_at:
+                state = f"completed {progress.completed_at:%Y-%m-%d %H:%M}"
+            else:
+                state = f"{progress.percent_done:.1f}%"
+            self.stdout.write(f"{name}: {state}")
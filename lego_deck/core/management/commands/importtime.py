@@ -0,0 +1,114 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# What each process imports before it can do any work.
+ENTRY_POINTS = {
+    # A gunicorn worker, ready to route its first request.
+    "web": (
+        "import config.wsgi\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+    ),
+    # Celery sets Django up and imports the tasks before consuming.
+    "worker": (
+        "from config.celery_app import app\n"
+        "import django\n"
+        "django.setup()\n"
+        "app.loader.import_default_modules()\n"
+    ),
+    "beat": (
+        "from config.celery_app import app\n"
+        "import django\n"
+        "django.setup()\n"
+        "app.loader.import_default_modules()\n"
+        "import django_celery_beat.schedulers\n"
+    ),
+    # Flower reads the Celery configuration, without setting Django up.
+    "flower": (
+        "from config.celery_app import app\n"
+        "app.conf.task_serializer\n"
+        "import flower.app\n"
+    ),
+}
+
+# Environment the entry points run with, as set by their start scripts.
+ENTRY_POINT_ENV = {
+    "worker": {"CELERY_SKIP_CHECKS": "1"},
+    "beat": {"CELERY_SKIP_CHECKS": "1"},
+}
+
+
+def parse_importtime(output: str) -> Counter[str]:
+    """Microseconds spent importing each top-level package's own modules."""
+    spent: Counter[str] = Counter()
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        if self_us.strip().isdigit():
+            spent[name.strip().split(".")[0]] += int(self_us)
+    return spent
+
+
+class Command(BaseCommand):
+    help = "Measure the cold start of each entry point and what its imports cost."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "entry_points",
+            nargs="*",
+            choices=[[], *ENTRY_POINTS],
+            help="Entry points to measure, all by default.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs timed per entry point, the median is reported.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=15,
+            help="Packages listed per entry point.",
+        )
+
+    def handle(self, *args, **options):
+        for name in options["entry_points"] or ENTRY_POINTS:
+            code, env = ENTRY_POINTS[name], ENTRY_POINT_ENV.get(name, {})
+            durations = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                self.run(code, env)
+                durations.append(time.perf_counter() - started)
+            spent = parse_importtime(self.run(code, env, "-X", "importtime"))
+
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(
+                    f"{name}: {statistics.median(durations):.2f}s cold start, "
+                    f"{sum(spent.values()) / 1e6:.2f}s importing",
+                ),
+            )
+            for package, us in spent.most_common(options["limit"]):
+                self.stdout.write(f"  {us / 1000:8.1f}ms  {package}")
+
+    def run(self, code: str, env: dict[str, str], *flags: str) -> str:
+        """Run ``code`` in a fresh interpreter, return what it wrote to stderr."""
+        # With the settings in use, --settings sets DJANGO_SETTINGS_MODULE too.
+        env = {**os.environ, **env}
+        process = subprocess.run(  # noqa: S603
+            [sys.executable, *flags, "-c", code],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return process.stderr
@@ -0,0 +1,226 @@
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import UTC
+from datetime import datetime
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from lego_deck.core import loadtest
+
+# Where results are written by default, next to pytest-benchmark's.
+RESULTS_DIR = Path(".benchmarks") / "loadtest"
+# The settings accounts are created with unless told otherwise.
+SETTINGS_MODULE = "config.settings.loadtest"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the user flows against gunicorn, started with the current "
+        "settings, or a running server. Run with config.settings.loadtest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            help="Test the server at this URL rather than starting one.",
+        )
+        parser.add_argument("--users", type=int, default=20, help="Virtual users.")
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=60,
+            help="Seconds the virtual users run for.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="gunicorn workers of the server started.",
+        )
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=list(loadtest.SCENARIOS),
+            dest="scenarios",
+            help="Scenario to run, repeat for several. All by default.",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help=f"Where to write the results, in {RESULTS_DIR} by default.",
+        )
+        parser.add_argument(
+            "--compare",
+            type=Path,
+            help="Results of a previous run to compare with.",
+        )
+        parser.add_argument(
+            "--allow-create-accounts",
+            action="store_true",
+            help=(
+                f"Create and delete the {loadtest.PREFIX}* accounts, a superuser "
+                f"among them, even though the settings aren't {SETTINGS_MODULE} "
+                "and DEBUG is off."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if not (
+            settings.SETTINGS_MODULE == SETTINGS_MODULE
+            or settings.DEBUG
+            or options["allow_create_accounts"]
+        ):
+            msg = (
+                f"Refusing to create a superuser and delete {loadtest.PREFIX}* "
+                f"users with {settings.SETTINGS_MODULE}: run with "
+                f"--settings={SETTINGS_MODULE}, or --allow-create-accounts."
+            )
+            raise CommandError(msg)
+        scenarios = options["scenarios"] or list(loadtest.SCENARIOS)
+        # Known to this run only: accounts left behind by a killed run can't
+        # be logged into.
+        password = secrets.token_urlsafe(24)
+        loadtest.delete_accounts()
+        accounts = loadtest.create_accounts(options["users"], password)
+        samples: list[loadtest.Sample] = []
+        errors: list[str] = []
+        try:
+            with self.server(options["url"], options["workers"]) as url:
+                elapsed = loadtest.run(
+                    url,
+                    accounts,
+                    password,
+                    options["duration"],
+                    scenarios,
+                    samples,
+                    errors,
+                )
+        finally:
+            loadtest.delete_accounts()
+
+        results = {
+            "commit": git_commit(),
+            "date": datetime.now(tz=UTC).isoformat(),
+            "settings": os.environ.get("DJANGO_SETTINGS_MODULE"),
+            "users": options["users"],
+            "duration": elapsed,
+            "workers": None if options["url"] else options["workers"],
+            "scenarios": scenarios,
+            **loadtest.report(samples, elapsed),
+        }
+        previous = None
+        if options["compare"]:
+            previous = json.loads(options["compare"].read_text())
+        self.write_report(results, previous)
+        for error in sorted(set(errors))[:10]:
+            self.stderr.write(error)
+
+        output = options["output"]
+        if output is None:
+            output = (
+                settings.BASE_DIR
+                / RESULTS_DIR
+                / f"{datetime.now(tz=UTC):%Y%m%dT%H%M%S}-{results['commit']}.json"
+            )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(f"Results written to {output}")
+
+    @contextmanager
+    def server(self, url: str | None, workers: int):
+        """Yield the URL of the server to test, started if ``url`` is None."""
+        if url:
+            yield url.rstrip("/")
+            return
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            process = subprocess.Popen(  # noqa: S603
+                [
+                    sys.executable,
+                    "-m",
+                    "gunicorn",
+                    "config.wsgi",
+                    "--config=config/gunicorn.conf.py",
+                    f"--bind=127.0.0.1:{port}",
+                    f"--workers={workers}",
+                ],
+                cwd=settings.BASE_DIR,
+                env={**os.environ, "PROMETHEUS_MULTIPROC_DIR": metrics_dir},
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                url = f"http://127.0.0.1:{port}"
+                self.wait_until_ready(url, process)
+                yield url
+            finally:
+                process.terminate()
+                process.wait()
+
+    def wait_until_ready(self, url: str, process, timeout: float = 60) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                msg = f"gunicorn exited with {process.returncode}"
+                raise CommandError(msg)
+            try:
+                if requests.get(f"{url}/readyz", timeout=1).ok:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        msg = f"gunicorn wasn't ready after {timeout}s"
+        raise CommandError(msg)
+
+    def write_report(self, results: dict, previous: dict | None) -> None:
+        rows = [("total", results["total"])]
+        rows += list(results["requests"].items())
+        old = {"total": previous["total"], **previous["requests"]} if previous else {}
+        width = max(len(name) for name, _ in rows)
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"{'request':<{width}}  {'count':>7}  {'errors':>6}  {'req/s':>7}  "
+                f"{'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}",
+            ),
+        )
+        for name, stats in rows:
+            if not stats["requests"]:
+                continue
+            line = (
+                f"{name:<{width}}  {stats['requests']:>7}  {stats['errors']:>6}  "
+                f"{stats['rps']:>7.1f}  {stats['p50_ms']:>8.1f}  "
+                f"{stats['p95_ms']:>8.1f}  {stats['p99_ms']:>8.1f}"
+            )
+            before = old.get(name)
+            if before and before.get("requests"):
+                line += (
+                    f"  (p95 {stats['p95_ms'] / before['p95_ms'] - 1:+.0%}, "
+                    f"req/s {stats['rps'] / before['rps'] - 1:+.0%})"
+                )
+            self.stdout.write(line)
@@ -0,0 +1,85 @@
+import hashlib
+import posixpath
+import time
+import typing
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+if typing.TYPE_CHECKING:
+    from django.contrib.staticfiles.apps import StaticFilesConfig
+    from django.core.files.storage import Storage
+
+# Stored next to the collected files, so a fresh storage is always filled.
+MARKER_NAME = "staticfiles.sha256"
+
+
+def source_hash() -> str:
+    """
+    Hash the files collectstatic would copy: their paths, their contents and
+    the storage they go to.
+    """
+    config = typing.cast("StaticFilesConfig", apps.get_app_config("staticfiles"))
+    found: dict[str, tuple[Storage, str]] = {}
+    for finder in finders.get_finders():
+        for path, storage in finder.list(config.ignore_patterns):
+            prefix = getattr(storage, "prefix", None)
+            prefixed_path = posixpath.join(prefix, path) if prefix else path
+            # Like collectstatic, the first file found for a path wins.
+            found.setdefault(prefixed_path, (storage, path))
+
+    digest = hashlib.sha256(settings.STORAGES["staticfiles"]["BACKEND"].encode())
+    for prefixed_path, (storage, path) in sorted(found.items()):
+        digest.update(b"\0" + prefixed_path.encode() + b"\0")
+        with storage.open(path) as source:
+            for chunk in source.chunks():
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stored_hash() -> str | None:
+    try:
+        with staticfiles_storage.open(MARKER_NAME) as marker:
+            return marker.read().decode()
+    except FileNotFoundError:
+        return None
+
+
+class Command(BaseCommand):
+    help = "Run collectstatic, unless static files are unchanged since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Run collectstatic even if nothing changed.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        current = source_hash()
+        if not options["force"] and stored_hash() == current:
+            self.stdout.write(
+                f"Static files unchanged ({current[:12]}), "
+                f"checked in {time.monotonic() - started:.2f}s.",
+            )
+            return
+
+        call_command(
+            "collectstatic",
+            interactive=False,
+            verbosity=options["verbosity"],
+        )
+        staticfiles_storage.delete(MARKER_NAME)
+        staticfiles_storage.save(MARKER_NAME, ContentFile(current.encode()))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Static files collected ({current[:12]}) "
+                f"in {time.monotonic() - started:.2f}s.",
+            ),
+        )
@@ -0,0 +1,109 @@
+"""
+Application metrics, in the Prometheus format.
+
+Under gunicorn, ``PROMETHEUS_MULTIPROC_DIR`` is set by ``config/gunicorn.conf.py``:
+each worker then keeps its values in memory-mapped files in that directory and
+``/metrics``, whichever worker answers it, adds up those of all workers, past
+and present. Elsewhere, like under ``runserver``, values are kept in memory.
+
+Requests are measured by ``MetricsMiddleware``, labelled with the name of the
+URL pattern they resolved to: paths that don't resolve are all counted under
+``<unresolved>``, so scanners can't make up new series. Cache lookups are
+counted by ``lego_deck.core.cache.TwoTierClient``. Values kept elsewhere, like
+the outbox backlog, are read when scraped by collectors passed to
+:func:`render`.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import typing
+
+from prometheus_client import CollectorRegistry
+from prometheus_client import Counter
+from prometheus_client import Histogram
+from prometheus_client import generate_latest
+from prometheus_client import multiprocess
+from prometheus_client import registry
+
+if typing.TYPE_CHECKING:
+    from prometheus_client.registry import Collector
+
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent answering requests, streaming excluded.",
+    ["view", "method", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Size of response bodies, before compression. Streamed bodies excluded.",
+    ["view"],
+    buckets=(100, 1000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run per request.",
+    ["view"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+DB_QUERY_DURATION = Counter(
+    "http_request_db_query_duration_seconds",
+    "Time spent in database queries while answering requests.",
+    ["view"],
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups",
+    "Cache lookups per tier, l1 or l2, and result, hits or misses.",
+    ["tier", "result"],
+)
+
+
+def get_view_label(request) -> str:
+    match = request.resolver_match
+    # Named views by their name, others by their dotted path.
+    return "<unresolved>" if match is None else match.view_name
+
+
+class QueryCounter:
+    """Database execute wrapper counting queries and the time they take."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):  # noqa: PLR0913
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def observe(request, response, duration: float, queries: QueryCounter) -> None:
+    view = get_view_label(request)
+    method = request.method if request.method in METHODS else "other"
+    REQUEST_DURATION.labels(view, method, response.status_code).observe(duration)
+    if not response.streaming:
+        size = getattr(request, "uncompressed_size", None)
+        RESPONSE_SIZE.labels(view).observe(
+            len(response.content) if size is None else size,
+        )
+    DB_QUERIES.labels(view).observe(queries.count)
+    DB_QUERY_DURATION.labels(view).inc(queries.duration)
+
+
+def render(*collectors: Collector) -> bytes:
+    """The metrics of every process, and those ``collectors`` read now."""
+    collected = CollectorRegistry()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.MultiProcessCollector(collected)
+    else:
+        collected.register(registry.REGISTRY)
+    for collector in collectors:
+        collected.register(collector)
+    return generate_latest(collected)
@@ -0,0 +1,364 @@
+import contextlib
+import logging
+import random
+import re
+import time
+import uuid
+import zlib
+
+import brotli
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import DisallowedHost
+from django.db import connections
+from django.http import JsonResponse
+from django.urls import Resolver404
+from django.urls import resolve
+from django.utils.cache import add_never_cache_headers
+from django.utils.cache import patch_vary_headers
+
+from . import health
+from . import log
+from . import metrics
+from . import page_cache
+from . import profiling
+from .models import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+
+class HealthCheckMiddleware:
+    """
+    Answer the load balancer's health checks, see `health`. Goes first: the
+    checks skip host validation, the HTTPS redirect, sessions, authentication
+    and the transaction ATOMIC_REQUESTS opens around views.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in ("GET", "HEAD"):
+            return self.get_response(request)
+        content: dict[str, object]
+        if request.path_info == "/healthz":
+            status = 200
+            content = {"status": "ok"}
+        elif request.path_info == "/readyz":
+            probes = health.readiness()
+            ready = all(probes.values())
+            status = 200 if ready else 503
+            content = {
+                "status": "ok" if ready else "unavailable",
+                "checks": {
+                    name: "ok" if passed else "failed"
+                    for name, passed in probes.items()
+                },
+            }
+        else:
+            return self.get_response(request)
+        response = JsonResponse(content, status=status)
+        add_never_cache_headers(response)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Measure each request's duration, response size and database queries, see
+    `metrics`. Goes first, to measure the rest of the stack too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = metrics.QueryCounter()
+        started = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        metrics.observe(request, response, time.perf_counter() - started, queries)
+        return response
+
+
+class RequestIdMiddleware:
+    """
+    Tag the logs of each request with an id, sent back in ``X-Request-ID``. A
+    well-formed id received in that header, from a proxy or a client retrying,
+    is kept. Goes first.
+    """
+
+    valid_id = re.compile(r"[\w.-]{1,64}")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get("X-Request-ID", "")
+        if not self.valid_id.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+        request.id = request_id
+        token = log.request_id.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            log.request_id.reset(token)
+        response["X-Request-ID"] = request_id
+        return response
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serve views marked with `cache_anonymous_page` from the cache to anonymous
+    visitors, see `page_cache`. Goes before SessionMiddleware.
+    """
+
+    # How long a request that finds neither an entry nor the lock waits for
+    # the request holding it, before rendering the page itself.
+    lock_wait = 1.0
+    poll_interval = 0.05
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def get_key(self, request) -> tuple[str, int] | None:
+        """Return the cache key and timeout for ``request``, if cacheable."""
+        if request.method != "GET" or any(
+            name in request.COOKIES
+            for name in (settings.SESSION_COOKIE_NAME, "messages")
+        ):
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if not hasattr(match.func, "page_cache_timeout"):
+            return None
+        # Set by the handler if the view runs, for responses served from the
+        # cache too.
+        request.resolver_match = match
+        try:
+            key = page_cache.get_key(request)
+        except DisallowedHost:
+            # Left for CommonMiddleware to reject.
+            return None
+        return key, match.func.page_cache_timeout or settings.PAGE_CACHE_TIMEOUT
+
+    def __call__(self, request):
+        cacheable = self.get_key(request)
+        if cacheable is None:
+            return self.get_response(request)
+        key, timeout = cacheable
+        entry = cache.get(key)
+        if entry is not None and entry.is_fresh:
+            return self.serve(entry, "hit")
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, timeout=30):
+            # Another request is regenerating the page.
+            return self.serve_locked(request, key, entry)
+        try:
+            response = self.get_response(request)
+            if page_cache.is_cacheable(response):
+                page_cache.store(key, response, timeout)
+                response["X-Page-Cache"] = "miss"
+        finally:
+            cache.delete(lock_key)
+        return response
+
+    def serve_locked(self, request, key: str, entry):
+        if entry is not None:
+            return self.serve(entry, "stale")
+        entry = self.wait_for(key)
+        if entry is not None:
+            return self.serve(entry, "hit")
+        return self.get_response(request)
+
+    def wait_for(self, key: str):
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry
+        return None
+
+    def serve(self, entry, state: str):
+        response = entry.to_response()
+        response["X-Page-Cache"] = state
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, as the client prefers. Streaming
+    responses are compressed chunk by chunk, each chunk is flushed as it comes.
+
+    Responses already encoded, of a type that doesn't compress (images,
+    archives...) or embedding a CSRF token are sent as they are: compressing a
+    secret next to content reflecting the request exposes it to BREACH.
+    """
+
+    # Shorter responses aren't worth it.
+    min_length = 500
+    # Fast settings, suited for content compressed on every request.
+    brotli_quality = 4
+    gzip_level = 6
+    compressible_types = re.compile(
+        r"^(text/|application/(json|javascript|xml|.+\+json|.+\+xml)|image/svg\+xml)",
+    )
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.is_compressible(request, response):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = self.negotiate(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_stream(
+                encoding,
+                response.streaming_content,
+                is_async=response.is_async,
+            )
+            del response.headers["Content-Length"]
+        else:
+            compressor = self.compressor(encoding)
+            content = compressor(response.content) + compressor(None)
+            if len(content) >= len(response.content):
+                return response
+            # For MetricsMiddleware, above, which only sees the result.
+            request.uncompressed_size = len(response.content)
+            response.content = content
+            response.headers["Content-Length"] = str(len(content))
+
+        # Compression changes the bytes, a strong ETag no longer matches them.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def is_compressible(self, request, response) -> bool:
+        return (
+            (response.streaming or len(response.content) >= self.min_length)
+            and not response.has_header("Content-Encoding")
+            and not response.has_header("Content-Range")
+            and bool(self.compressible_types.match(response.get("Content-Type", "")))
+            # Set by CsrfViewMiddleware when the page embeds a token.
+            and settings.CSRF_COOKIE_NAME not in response.cookies
+        )
+
+    @staticmethod
+    def negotiate(accept_encoding: str) -> str | None:
+        """Pick brotli or gzip from an ``Accept-Encoding`` header, or None."""
+        qualities = {}
+        for item in accept_encoding.lower().split(","):
+            coding, _, params = item.partition(";")
+            quality = 1.0
+            for param in params.split(";"):
+                name, _, value = param.strip().partition("=")
+                if name == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            qualities[coding.strip()] = quality
+        default = qualities.get("*", 0.0)
+        # On a tie, brotli, which compresses better.
+        encoding = max(("br", "gzip"), key=lambda e: qualities.get(e, default))
+        return encoding if qualities.get(encoding, default) > 0 else None
+
+    def compressor(self, encoding: str):
+        """
+        Return a function compressing a chunk and flushing it. Called with
+        None, it finishes the stream.
+        """
+        if encoding == "br":
+            brotli_compressor = brotli.Compressor(quality=self.brotli_quality)
+
+            def compress(chunk):
+                if chunk is None:
+                    return brotli_compressor.finish()
+                return brotli_compressor.process(chunk) + brotli_compressor.flush()
+
+        else:
+            # 31: a gzip header and trailer.
+            zlib_compressor = zlib.compressobj(self.gzip_level, wbits=31)
+
+            def compress(chunk):
+                if chunk is None:
+                    return zlib_compressor.flush()
+                return zlib_compressor.compress(chunk) + zlib_compressor.flush(
+                    zlib.Z_SYNC_FLUSH,
+                )
+
+        return compress
+
+    def compress_stream(self, encoding: str, chunks, *, is_async: bool):
+        compress = self.compressor(encoding)
+        if is_async:
+
+            async def compress_async():
+                async for chunk in chunks:
+                    if chunk:
+                        yield compress(chunk)
+                yield compress(None)
+
+            return compress_async()
+
+        def compress_sync():
+            for chunk in chunks:
+                if chunk:
+                    yield compress(chunk)
+            yield compress(None)
+
+        return compress_sync()
+
+
+class RequestProfilingMiddleware:
+    """
+    Profile a share of requests, ``PROFILING_SAMPLE_RATE``, and those of staff
+    users sending an ``X-Profile`` header, see `profiling`. The id of the
+    profile is returned in an ``X-Profile-Id`` header to the latter. Goes after
+    AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def get_trigger(self, request) -> str | None:
+        if request.headers.get("X-Profile") and request.user.is_staff:
+            return RequestProfile.Trigger.REQUESTED
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate and random.random() < rate:  # noqa: S311
+            return RequestProfile.Trigger.SAMPLED
+        return None
+
+    def __call__(self, request):
+        trigger = self.get_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+        sampler = profiling.StackSampler(settings.PROFILING_INTERVAL)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        duration = time.perf_counter() - started
+
+        try:
+            profile = profiling.save(request, response, sampler, duration, trigger)
+        except Exception:
+            # Losing a profile is no reason to fail the request.
+            logger.exception("Could not save the profile of %s", request.path)
+        else:
+            if trigger == RequestProfile.Trigger.REQUESTED:
+                response["X-Profile-Id"] = str(profile.pk)
+        return response
@@ -0,0 +1,60 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="BackfillProgress",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=255, unique=True, verbose_name="Name"),
+                ),
+                (
+                    "last_id",
+                    models.BigIntegerField(default=0, verbose_name="Last processed id"),
+                ),
+                (
+                    "max_id",
+                    models.BigIntegerField(default=0, verbose_name="Upper id bound"),
+                ),
+                (
+                    "rows_processed",
+                    models.BigIntegerField(default=0, verbose_name="Rows processed"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Started at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                (
+                    "completed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Completed at"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Backfill progress",
+                "verbose_name_plural": "Backfill progress",
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+import lego_deck.core.profiling
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0003_upload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "view_name",
+                    models.CharField(
+                        blank=True, max_length=255, verbose_name="View name"
+                    ),
+                ),
+                ("method", models.CharField(max_length=10, verbose_name="Method")),
+                ("path", models.CharField(max_length=500, verbose_name="Path")),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(verbose_name="Status code"),
+                ),
+                ("duration", models.FloatField(verbose_name="Duration (s)")),
+                ("samples", models.PositiveIntegerField(verbose_name="Samples")),
+                (
+                    "trigger",
+                    models.CharField(
+                        choices=[("sampled", "Sampled"), ("requested", "Requested")],
+                        max_length=16,
+                        verbose_name="Trigger",
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        storage=lego_deck.core.profiling.get_storage,
+                        upload_to="%Y/%m/%d",
+                        verbose_name="Stacks",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Created at"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Request profile",
+                "verbose_name_plural": "Request profiles",
+            },
+        ),
+    ]
@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .profiling import get_storage as get_profile_storage
+
+
+class BackfillProgress(models.Model):
+    """
+    Checkpoint of a batched data backfill.
+    Lets `manage.py backfill` resume from the last committed batch.
+    """
+
+    name = models.CharField(_("Name"), max_length=255, unique=True)
+    last_id = models.BigIntegerField(_("Last processed id"), default=0)
+    max_id = models.BigIntegerField(_("Upper id bound"), default=0)
+    rows_processed = models.BigIntegerField(_("Rows processed"), default=0)
+    started_at = models.DateTimeField(_("Started at"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+    completed_at = models.DateTimeField(_("Completed at"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Backfill progress")
+        verbose_name_plural = _("Backfill progress")
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def percent_done(self) -> float:
+        if not self.max_id:
+            return 100.0
+        return min(100.0, 100.0 * self.last_id / self.max_id)
+
+
+class OutboxEvent(models.Model):
+    """
+    Event written in the same transaction as the change it describes.
+    `lego_deck.core.outbox.drain` publishes pending events to the sink.
+    """
+
+    topic = models.CharField(_("Topic"), max_length=100)
+    key = models.CharField(_("Key"), max_length=255)
+    event_type = models.CharField(_("Event type"), max_length=100)
+    payload = models.JSONField(_("Payload"), encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(_("Created at"), default=timezone.now)
+    published_at = models.DateTimeField(_("Published at"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Outbox event")
+        verbose_name_plural = _("Outbox events")
+        indexes = [
+            # Keeps finding the next pending batch cheap however many
+            # published events are waiting for the retention purge.
+            models.Index(
+                fields=["id"],
+                condition=models.Q(published_at__isnull=True),
+                name="core_outbox_pending_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.topic}:{self.event_type}:{self.key}"
+
+
+class Upload(models.Model):
+    """
+    File uploaded by a client straight to the media storage.
+    See `lego_deck.core.uploads` for the flow.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        UPLOADED = "uploaded", _("Uploaded")
+        VERIFIED = "verified", _("Verified")
+        REJECTED = "rejected", _("Rejected")
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="uploads",
+        verbose_name=_("User"),
+    )
+    file = models.FileField(_("File"), max_length=500)
+    content_type = models.CharField(_("Content type"), max_length=255)
+    size = models.PositiveBigIntegerField(_("Size"))
+    status = models.CharField(
+        _("Status"),
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    error = models.CharField(_("Error"), max_length=255, blank=True)
+    created_at = models.DateTimeField(_("Created at"), default=timezone.now)
+    completed_at = models.DateTimeField(_("Completed at"), null=True, blank=True)
+    verified_at = models.DateTimeField(_("Verified at"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Upload")
+        verbose_name_plural = _("Uploads")
+
+    def __str__(self) -> str:
+        return self.file.name
+
+
+class RequestProfile(models.Model):
+    """
+    Index of a request profile written by `RequestProfilingMiddleware`, the
+    stacks themselves are in `file`. See `lego_deck.core.profiling`.
+    """
+
+    class Trigger(models.TextChoices):
+        SAMPLED = "sampled", _("Sampled")
+        REQUESTED = "requested", _("Requested")
+
+    view_name = models.CharField(_("View name"), max_length=255, blank=True)
+    method = models.CharField(_("Method"), max_length=10)
+    path = models.CharField(_("Path"), max_length=500)
+    status_code = models.PositiveSmallIntegerField(_("Status code"))
+    duration = models.FloatField(_("Duration (s)"))
+    samples = models.PositiveIntegerField(_("Samples"))
+    trigger = models.CharField(_("Trigger"), max_length=16, choices=Trigger.choices)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name=_("User"),
+    )
+    file = models.FileField(
+        _("Stacks"),
+        storage=get_profile_storage,
+        upload_to="%Y/%m/%d",
+    )
+    created_at = models.DateTimeField(_("Created at"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("Request profile")
+        verbose_name_plural = _("Request profiles")
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.path}"
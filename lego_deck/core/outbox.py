@@ -0,0 +1,214 @@
+"""
+Transactional outbox.
+
+:func:`publish` stores an event in the ``OutboxEvent`` table inside the caller's
+transaction, so an event exists if and only if the change it describes was
+committed. :func:`drain` later hands pending events to the configured sink in
+id order. Delivery is at-least-once: if the process dies between the sink
+accepting a batch and its commit, the batch is sent again. Consumers should
+de-duplicate on the event id.
+
+The backlog and delivery metrics of :func:`stats` are exported to ``/metrics``
+by :class:`MetricsCollector`.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import typing
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from prometheus_client.core import CounterMetricFamily
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from redis.exceptions import RedisError
+
+from lego_deck.core.models import OutboxEvent
+from lego_deck.core.redis import get_redis_connection
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+
+DRAIN_LOCK_KEY = "outbox:drain"
+METRICS_KEY = "outbox:metrics"
+
+
+def publish(topic: str, key: str, event_type: str, payload: dict) -> OutboxEvent:
+    """Record an event, call it within the transaction making the change."""
+    return OutboxEvent.objects.create(
+        topic=topic,
+        key=key,
+        event_type=event_type,
+        payload=payload,
+    )
+
+
+class RedisStreamSink:
+    """Append events to one Redis stream per topic, ``outbox:<topic>``."""
+
+    def __init__(self, url: str | None = None, maxlen: int = 100_000):
+        self.url = url
+        self.maxlen = maxlen
+        self.encoder = DjangoJSONEncoder()
+
+    def send(self, events: Sequence[OutboxEvent]) -> None:
+        pipe = get_redis_connection(self.url).pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(
+                f"outbox:{event.topic}",
+                {
+                    "id": event.pk,
+                    "key": event.key,
+                    "type": event.event_type,
+                    "created_at": event.created_at.isoformat(),
+                    "payload": self.encoder.encode(event.payload),
+                },
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        pipe.execute()
+
+
+def get_sink():
+    return import_string(settings.OUTBOX_SINK)(**settings.OUTBOX_SINK_OPTIONS)
+
+
+@dataclass(frozen=True)
+class DrainReport:
+    published: int
+    seconds: float
+    # Age of the oldest event published by this run.
+    max_lag: float
+
+
+def _publish_batch(sink, batch_size: int) -> tuple[int, float]:
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.filter(published_at__isnull=True)
+            .order_by("id")
+            .select_for_update(skip_locked=True)[:batch_size],
+        )
+        if not events:
+            return 0, 0.0
+        sink.send(events)
+        now = timezone.now()
+        OutboxEvent.objects.filter(pk__in=[e.pk for e in events]).update(
+            published_at=now,
+        )
+    return len(events), (now - events[0].created_at).total_seconds()
+
+
+def drain(batch_size: int | None = None, max_batches: int = 100) -> DrainReport:
+    """
+    Publish pending events, ``batch_size`` per transaction.
+
+    A Redis lock keeps concurrent drains from interleaving batches, which would
+    break the ordering. A drain that can't take the lock publishes nothing.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    redis = get_redis_connection()
+    lock = redis.lock(DRAIN_LOCK_KEY, timeout=settings.CELERY_TASK_SOFT_TIME_LIMIT)
+    if not lock.acquire(blocking=False):
+        return DrainReport(published=0, seconds=0.0, max_lag=0.0)
+    started = time.monotonic()
+    published, max_lag = 0, 0.0
+    try:
+        sink = get_sink()
+        for _ in range(max_batches):
+            count, lag = _publish_batch(sink, batch_size)
+            published += count
+            max_lag = max(max_lag, lag)
+            if count < batch_size:
+                break
+    finally:
+        lock.release()
+    report = DrainReport(published, time.monotonic() - started, max_lag)
+    if report.published:
+        pipe = redis.pipeline(transaction=False)
+        pipe.hincrby(METRICS_KEY, "published_total", report.published)
+        pipe.hset(
+            METRICS_KEY,
+            mapping={
+                "last_lag_seconds": report.max_lag,
+                "last_throughput": report.published / max(report.seconds, 1e-6),
+                "last_drain_at": time.time(),
+            },
+        )
+        pipe.execute()
+        logger.info(
+            "Published %d outbox events in %.3fs, max lag %.3fs",
+            report.published,
+            report.seconds,
+            report.max_lag,
+        )
+    return report
+
+
+def stats() -> dict[str, float]:
+    """Delivery metrics: backlog, current lag, and the last drain's throughput."""
+    oldest = (
+        OutboxEvent.objects.filter(published_at__isnull=True)
+        .order_by("id")
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    stored = typing.cast(
+        "dict[bytes, bytes]",
+        get_redis_connection().hgetall(METRICS_KEY),
+    )
+    metrics = {k.decode(): float(v) for k, v in stored.items()}
+    return {
+        "pending": OutboxEvent.objects.filter(published_at__isnull=True).count(),
+        "lag_seconds": (timezone.now() - oldest).total_seconds() if oldest else 0.0,
+        "published_total": metrics.get("published_total", 0.0),
+        "last_lag_seconds": metrics.get("last_lag_seconds", 0.0),
+        "last_throughput": metrics.get("last_throughput", 0.0),
+    }
+
+
+class MetricsCollector(Collector):
+    """
+    :func:`stats` for Prometheus, read when scraped: events are published by
+    Celery workers, whose metrics ``/metrics`` doesn't see.
+    """
+
+    def collect(self):
+        try:
+            current = stats()
+        except (DatabaseError, RedisError):
+            logger.warning("Outbox metrics unavailable", exc_info=True)
+            return
+        yield GaugeMetricFamily(
+            "outbox_pending_events",
+            "Events not published yet.",
+            value=current["pending"],
+        )
+        yield GaugeMetricFamily(
+            "outbox_oldest_pending_event_age_seconds",
+            "Age of the oldest event not published yet, 0 without any.",
+            value=current["lag_seconds"],
+        )
+        yield CounterMetricFamily(
+            "outbox_published_events",
+            "Events published.",
+            value=current["published_total"],
+        )
+        yield GaugeMetricFamily(
+            "outbox_last_drain_lag_seconds",
+            "Longest time an event published by the last drain waited.",
+            value=current["last_lag_seconds"],
+        )
+        yield GaugeMetricFamily(
+            "outbox_last_drain_throughput",
+            "Events per second published by the last drain.",
+            value=current["last_throughput"],
+        )
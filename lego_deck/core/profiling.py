@@ -0,0 +1,137 @@
+"""
+Sampling profiler for requests, see ``RequestProfilingMiddleware``.
+
+While a request is profiled, a background thread looks at the stack of the
+thread serving it every ``PROFILING_INTERVAL`` seconds. The request itself runs
+uninstrumented, the cost is that thread waking up, not a hook on every call.
+
+Stacks are written in the collapsed format, one ``frame;frame;frame count``
+line per distinct stack, outermost frame first, that flamegraph.pl,
+speedscope and inferno read. Files are kept on the local disk, under
+``PROFILING_ROOT``, and indexed by ``RequestProfile`` rows.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import typing
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+if typing.TYPE_CHECKING:
+    from types import FrameType
+
+    from django.http import HttpRequest
+    from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileStorage(FileSystemStorage):
+    """Files under ``PROFILING_ROOT``, never served publicly."""
+
+    @property
+    def base_location(self):
+        return settings.PROFILING_ROOT
+
+    @property
+    def location(self):
+        return str(Path(self.base_location).absolute())
+
+    @property
+    def base_url(self):
+        return None
+
+
+def get_storage() -> ProfileStorage:
+    return ProfileStorage()
+
+
+class StackSampler:
+    """Count the stacks a thread is seen in, from another thread."""
+
+    def __init__(self, interval: float, thread_id: int | None = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="stack-sampler",
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        self._stopped.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # noqa: SLF001
+            if frame is not None:
+                self.stacks[fold(frame)] += 1
+            del frame
+
+    @property
+    def samples(self) -> int:
+        return self.stacks.total()
+
+
+def fold(frame: FrameType | None) -> str:
+    """The stack ending at ``frame``, outermost frame first."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}.{code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def to_collapsed(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def get_view_name(request: HttpRequest) -> str:
+    match = request.resolver_match
+    # Named views by their name, others by their dotted path.
+    return "" if match is None else match.view_name
+
+
+def save(
+    request: HttpRequest,
+    response: HttpResponse,
+    sampler: StackSampler,
+    duration: float,
+    trigger: str,
+):
+    """Write the profile of ``request`` and index it, return the index row."""
+    from .models import RequestProfile
+
+    user = getattr(request, "user", None)
+    profile = RequestProfile(
+        view_name=get_view_name(request),
+        method=request.method or "",
+        path=request.path[:500],
+        status_code=response.status_code,
+        duration=duration,
+        samples=sampler.samples,
+        trigger=trigger,
+        user=user if user is not None and user.is_authenticated else None,
+    )
+    profile.file.save(
+        "profile.folded",
+        ContentFile(to_collapsed(sampler.stacks).encode()),
+        save=False,
+    )
+    profile.save()
+    return profile
@@ -0,0 +1,34 @@
+"""Shared Redis connections for features that need more than the cache API."""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django_redis.pool import ConnectionFactory
+from redis import Redis
+
+_connections: dict[str, Redis] = {}
+
+
+def get_redis_connection(url: str | None = None) -> Redis:
+    """
+    Return a client for ``url``, defaulting to the ``REDIS_URL`` setting.
+
+    Clients are reused per URL, their connection pools reconnect on their own
+    in forked processes.
+    """
+    url = url or settings.REDIS_URL
+    if url not in _connections:
+        _connections[url] = Redis.from_url(url)
+    return _connections[url]
+
+
+def reset_connections() -> None:
+    """
+    Forget the connections opened so far, these clients and the cache's.
+
+    For forked processes, which must not use their parent's sockets. Their
+    pools would notice on their own, but only once used.
+    """
+    pools = [client.connection_pool for client in _connections.values()]
+    for pool in pools + list(ConnectionFactory._pools.values()):  # noqa: SLF001
+        pool.reset()
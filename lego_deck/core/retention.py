@@ -0,0 +1,134 @@
+"""
+Retention of rows that pile up forever unless something deletes them.
+
+The number of days each kind of row is kept for is configured in the
+``RETENTION_DAYS`` setting, ``None`` keeps the rows forever. Rows are deleted
+once ``date_field``, and every one of ``other_date_fields``, is older than that.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import timedelta
+from typing import Any
+
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+
+from lego_deck.core.db.batches import delete_in_batches
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    name: str
+    model: str
+    date_field: str
+    filters: dict[str, Any] = field(default_factory=dict)
+    other_date_fields: tuple[str, ...] = ()
+
+    def get_queryset(self, cutoff):
+        model = apps.get_model(self.model)
+        dates = (self.date_field, *self.other_date_fields)
+        return model._default_manager.filter(
+            **{f"{date_field}__lt": cutoff for date_field in dates},
+            **self.filters,
+        )
+
+
+POLICIES = [
+    # Counted from the session's expiry date, not its creation.
+    RetentionPolicy("sessions", "sessions.Session", "expire_date"),
+    # Tokens are reused for as long as they work: only those of users not seen
+    # since are stale. Unknown last_seen, from before it was recorded, is kept.
+    RetentionPolicy(
+        "auth_tokens",
+        "authtoken.Token",
+        "created",
+        other_date_fields=("user__last_seen",),
+    ),
+    RetentionPolicy("email_confirmations", "account.EmailConfirmation", "created"),
+    RetentionPolicy(
+        "outbox_events",
+        "core.OutboxEvent",
+        "published_at",
+        {"published_at__isnull": False},
+    ),
+    # django-celery-beat disables one-off tasks after they ran, but keeps them.
+    RetentionPolicy(
+        "one_off_periodic_tasks",
+        "django_celery_beat.PeriodicTask",
+        "last_run_at",
+        {"one_off": True, "enabled": False},
+    ),
+    # Their files are deleted along with them.
+    RetentionPolicy("request_profiles", "core.RequestProfile", "created_at"),
+    # Never completed, long after their upload URL expired. Whatever the
+    # client wrote to the storage is deleted along with them.
+    RetentionPolicy(
+        "pending_uploads",
+        "core.Upload",
+        "created_at",
+        {"status": "pending"},
+    ),
+]
+
+
+@dataclass(frozen=True)
+class PurgeReport:
+    name: str
+    deleted: int
+    seconds: float
+
+
+def purge(
+    policy: RetentionPolicy,
+    days: int,
+    *,
+    batch_size: int,
+    sleep: float,
+) -> PurgeReport:
+    cutoff = timezone.now() - timedelta(days=days)
+    started = time.monotonic()
+    deleted = delete_in_batches(
+        policy.get_queryset(cutoff),
+        batch_size=batch_size,
+        sleep=sleep,
+    )
+    report = PurgeReport(policy.name, deleted, time.monotonic() - started)
+    logger.info(
+        "Purged %d %s rows older than %d days in %.2fs",
+        report.deleted,
+        report.name,
+        days,
+        report.seconds,
+    )
+    return report
+
+
+def purge_expired_rows() -> list[PurgeReport]:
+    """Apply every retention policy that has a retention period configured."""
+    reports = []
+    for policy in POLICIES:
+        days = settings.RETENTION_DAYS.get(policy.name)
+        if days is None:
+            continue
+        try:
+            apps.get_model(policy.model)
+        except LookupError:
+            logger.debug("Skipping %s, %s is not installed", policy.name, policy.model)
+            continue
+        reports.append(
+            purge(
+                policy,
+                days,
+                batch_size=settings.RETENTION_BATCH_SIZE,
+                sleep=settings.RETENTION_BATCH_SLEEP,
+            ),
+        )
+    return reports
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import RequestProfile
+from .models import Upload
+
+
+@receiver(post_delete, sender=RequestProfile, dispatch_uid="delete_profile_file")
+def delete_profile_file(sender, instance, **kwargs):
+    # Once committed, a rolled back delete still has its file.
+    file = instance.file
+    transaction.on_commit(lambda: file.delete(save=False))
+
+
+@receiver(post_delete, sender=Upload, dispatch_uid="delete_upload_file")
+def delete_upload_file(sender, instance, **kwargs):
+    file = instance.file
+    if file:
+        transaction.on_commit(lambda: file.delete(save=False))
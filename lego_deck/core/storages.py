@@ -0,0 +1,168 @@
+"""
+Azure Blob Storage backends.
+
+:class:`MediaAzureStorage` can hand out signed URLs for clients to upload to
+directly, see :mod:`lego_deck.core.uploads`, and to download from, see
+:mod:`lego_deck.core.downloads`.
+
+:class:`StaticAzureStorage` adds Django's manifest (content-hashed file names)
+on top of ``AzureStorage``. Hashed files never change, they are uploaded with a
+one year ``immutable`` ``Cache-Control``, everything else (unhashed originals,
+the manifest) only gets a short one.
+
+Text assets also get ``<name>.gz`` and ``<name>.br`` siblings, stored with the
+matching ``Content-Encoding``, for a CDN or proxy to pick from based on
+``Accept-Encoding``.
+
+The manifest of the previous ``collectstatic`` run tells which blobs are already
+up to date, unchanged files are not uploaded again. Delete ``staticfiles.json``
+from the container to force a full upload.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import posixpath
+import re
+
+import brotli
+from azure.core.exceptions import ResourceNotFoundError
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.core.files.base import ContentFile
+from django.utils.http import content_disposition_header
+from storages.backends.azure_storage import AzureStorage
+from storages.utils import clean_name
+
+logger = logging.getLogger(__name__)
+
+# Django appends the first 12 hex digits of the MD5 of the content.
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}(\.[^./]+)?$")
+
+
+def _compress_gzip(data: bytes) -> bytes:
+    # A fixed mtime keeps the output identical for identical input.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _compress_brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+class StaticAzureStorage(ManifestFilesMixin, AzureStorage):
+    location = "static"
+    # Saves a HEAD request per file, uploads replace existing blobs anyway.
+    overwrite_files = True
+    cache_control = "public, max-age=300"
+    immutable_cache_control = "public, max-age=31536000, immutable"
+
+    compressors = {".gz": _compress_gzip, ".br": _compress_brotli}
+    compressible_extensions = frozenset(
+        (".css", ".js", ".mjs", ".map", ".json", ".svg", ".txt", ".xml", ".ico"),
+    )
+    # Below this size the compressed variant isn't worth an extra blob.
+    compress_min_size = 256
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # What the previous run uploaded, according to its manifest.
+        self._stored = dict(self.hashed_files)
+        self._stored_hashed = set(self._stored.values())
+        self.uploaded = 0
+        self.skipped = 0
+
+    def _open(self, name, mode="rb"):
+        file = super()._open(name, mode)
+        if "r" in mode:
+            # Download right away, to raise the FileNotFoundError callers of
+            # Storage.open() expect, not ResourceNotFoundError on first read.
+            try:
+                file.file  # noqa: B018
+            except ResourceNotFoundError as e:
+                raise FileNotFoundError(name) from e
+        return file
+
+    def is_hashed(self, name: str) -> bool:
+        root, ext = posixpath.splitext(name)
+        if ext in self.compressors:
+            name = root
+        return HASHED_NAME_RE.search(posixpath.basename(name)) is not None
+
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        if self.is_hashed(name):
+            params["cache_control"] = self.immutable_cache_control
+        return params
+
+    def is_unchanged(self, name: str, content) -> bool:
+        """Whether the previous run already uploaded ``content`` as ``name``."""
+        if name in self._stored_hashed:
+            # The name is derived from the content.
+            return True
+        hashed_name = self._stored.get(name)
+        # Stylesheets are hashed after their URLs are rewritten, so their
+        # originals never match and are always uploaded again.
+        return hashed_name is not None and hashed_name == self.hashed_name(
+            name,
+            content,
+        )
+
+    def _save(self, name, content):
+        if self.is_unchanged(clean_name(name), content):
+            self.skipped += 1
+            return clean_name(name)
+        name = super()._save(name, content)
+        self.uploaded += 1
+        if posixpath.splitext(name)[1] in self.compressible_extensions:
+            self._save_compressed(name, content)
+        return name
+
+    def _save_compressed(self, name: str, content) -> None:
+        content.seek(0)
+        data = content.read()
+        if len(data) < self.compress_min_size:
+            return
+        for suffix, compress in self.compressors.items():
+            compressed = compress(data)
+            if len(compressed) < len(data):
+                # The type is guessed from the name without the suffix, the
+                # suffix itself sets Content-Encoding.
+                super()._save(name + suffix, ContentFile(compressed))
+
+    def delete(self, name):
+        super().delete(name)
+        name = clean_name(name)
+        self._stored.pop(name, None)
+        self._stored_hashed.discard(name)
+
+    def post_process(self, *args, **kwargs):
+        yield from super().post_process(*args, **kwargs)
+        logger.info(
+            "Static files: %d uploaded, %d unchanged",
+            self.uploaded,
+            self.skipped,
+        )
+
+
+class MediaAzureStorage(AzureStorage):
+    location = "media"
+
+    def upload_url(self, name: str, expire: int) -> str:
+        """Signed URL allowing to create ``name`` for ``expire`` seconds."""
+        return self.url(name, expire=expire, mode="cw")
+
+    def download_url(self, name: str, expire: int, filename: str) -> str:
+        """Signed URL to read ``name`` for ``expire`` seconds, as ``filename``."""
+        disposition = content_disposition_header(as_attachment=True, filename=filename)
+        return self.url(
+            name,
+            expire=expire,
+            parameters={"content_disposition": disposition},
+        )
+
+    def upload_headers(self, content_type: str) -> dict[str, str]:
+        """Headers the client must send with its ``PUT`` to the upload URL."""
+        return {
+            "x-ms-blob-type": "BlockBlob",
+            "x-ms-blob-content-type": content_type,
+        }
@@ -0,0 +1,32 @@
+from dataclasses import asdict
+
+from celery import shared_task
+
+from . import outbox
+from . import retention
+from . import uploads
+from .models import Upload
+
+
+# Deleting in throttled batches can take a while after a long pause,
+# so this task gets more time than CELERY_TASK_SOFT_TIME_LIMIT.
+@shared_task(soft_time_limit=15 * 60, time_limit=20 * 60)
+def purge_expired_rows():
+    """Delete rows past their retention period, see the RETENTION_DAYS setting."""
+    return [asdict(report) for report in retention.purge_expired_rows()]
+
+
+@shared_task()
+def drain_outbox():
+    """Publish pending outbox events to the configured sink."""
+    return asdict(outbox.drain())
+
+
+@shared_task()
+def verify_upload(upload_id: int):
+    """Check a direct upload landed in storage as announced."""
+    upload = Upload.objects.filter(pk=upload_id).first()
+    if upload is not None:
+        uploads.verify(upload)
+        return upload.status
+    return None
@@ -0,0 +1,16 @@
+from django import template
+
+from lego_deck.core.fragments import get_version
+
+register = template.Library()
+
+
+@register.filter
+def fragment_key(instance):
+    """
+    Identify `instance` and its current version in a `{% cache %}` key, the
+    fragment is invalidated whenever the instance is saved.
+    """
+    if getattr(instance, "pk", None) is None:
+        return ""
+    return f"{instance.pk}.{get_version(instance)}"
@@ -0,0 +1,97 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import F
+
+from lego_deck.core.db.backfill import Backfill
+from lego_deck.core.db.backfill import registry
+from lego_deck.core.db.batches import id_ranges
+from lego_deck.core.models import BackfillProgress
+from lego_deck.users.models import User
+from lego_deck.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class FillName(Backfill):
+    name = "tests.fill_name"
+    model = "users.User"
+    batch_size = 2
+    sleep = 0
+
+    def process_batch(self, queryset):
+        return queryset.filter(name="").update(name=F("username"))
+
+
+@pytest.fixture()
+def _registered():
+    registry[FillName.name] = FillName
+    yield
+    del registry[FillName.name]
+
+
+def test_id_ranges():
+    assert list(id_ranges(0, 5, 2)) == [(0, 2), (2, 4), (4, 5)]
+    assert list(id_ranges(5, 5, 2)) == []
+
+
+def test_id_ranges_rejects_empty_batches():
+    with pytest.raises(ValueError, match="batch_size"):
+        list(id_ranges(0, 5, 0))
+
+
+def test_run_backfills_all_rows():
+    users = UserFactory.create_batch(5, name="")
+
+    progress = FillName().run()
+
+    assert progress.rows_processed == len(users)
+    assert progress.last_id == progress.max_id == max(u.pk for u in users)
+    assert progress.completed_at is not None
+    assert not User.objects.filter(name="").exists()
+
+
+def test_run_resumes_from_checkpoint():
+    first, *rest = sorted(UserFactory.create_batch(4, name=""), key=lambda u: u.pk)
+    BackfillProgress.objects.create(
+        name=FillName.name,
+        last_id=first.pk,
+        max_id=rest[-1].pk,
+    )
+
+    progress = FillName().run()
+
+    assert progress.rows_processed == len(rest)
+    first.refresh_from_db()
+    assert first.name == ""
+
+
+def test_run_reset_starts_over():
+    user = UserFactory(name="")
+    BackfillProgress.objects.create(
+        name=FillName.name,
+        last_id=user.pk,
+        max_id=user.pk,
+    )
+
+    FillName().run(reset=True)
+
+    user.refresh_from_db()
+    assert user.name == user.username
+
+
+@pytest.mark.usefixtures("_registered")
+def test_command_reports_progress(capsys):
+    UserFactory.create_batch(3, name="")
+
+    call_command("backfill", FillName.name, "--sleep", "0")
+
+    out = capsys.readouterr().out
+    assert "100.0%" in out
+    assert f"{FillName.name}: done, 3 rows processed." in out
+
+
+@pytest.mark.usefixtures("_registered")
+def test_command_lists_backfills(capsys):
+    call_command("backfill", "--list")
+
+    assert f"{FillName.name}: not started" in capsys.readouterr().out
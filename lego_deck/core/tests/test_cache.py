@@ -0,0 +1,128 @@
+import time
+
+import fakeredis
+import pytest
+from django_redis.cache import RedisCache
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture()
+def make_cache():
+    """Build caches sharing one Redis, each standing for a worker process."""
+    server = fakeredis.FakeServer()
+
+    def make(**options):
+        cache = RedisCache(
+            "redis://localhost:6379/0",
+            {
+                "OPTIONS": {
+                    "CLIENT_CLASS": "lego_deck.core.cache.TwoTierClient",
+                    "CONNECTION_POOL_KWARGS": {
+                        "connection_class": fakeredis.FakeRedisConnection,
+                        "server": server,
+                    },
+                    **options,
+                },
+            },
+        )
+        cache.client.ensure_listener()
+        _wait_until(cache.client.subscribed.is_set)
+        return cache
+
+    return make
+
+
+def test_reads_are_served_locally(make_cache):
+    cache = make_cache()
+    cache.set("key", {"value": 1})
+
+    assert cache.get("key") == {"value": 1}
+    assert cache.get("key") == {"value": 1}
+    stats = cache.client.stats()
+    assert stats["l1_hits"] == 1
+    assert stats["l2_hits"] == 1
+    assert stats["l1_hit_ratio"] == stats["l1_hits"] / (
+        stats["l1_hits"] + stats["l2_hits"]
+    )
+
+
+def test_local_values_are_copies(make_cache):
+    cache = make_cache()
+    cache.set("key", {"value": 1})
+    cache.get("key")["value"] = 2
+
+    assert cache.get("key") == {"value": 1}
+
+
+def test_writes_invalidate_other_processes(make_cache):
+    first, second = make_cache(), make_cache()
+    first.set("key", 1)
+    first.set("other", 1)
+    assert second.get_many(["key", "other"]) == {"key": 1, "other": 1}
+
+    first.set("key", "changed")
+    _wait_until(lambda: second.get("key") == "changed")
+    incremented = first.incr("other")
+    _wait_until(lambda: second.get("other") == incremented)
+    first.delete("key")
+    _wait_until(lambda: second.get("key") is None)
+    first.clear()
+    _wait_until(lambda: second.get("other") is None)
+
+
+def test_own_writes_are_seen_immediately(make_cache):
+    cache = make_cache()
+    cache.set("key", "old")
+    cache.get("key")
+    cache.set_many({"key": "new"})
+
+    assert cache.get("key") == "new"
+
+
+def test_large_values_stay_in_redis(make_cache):
+    cache = make_cache(L1_MAX_VALUE_SIZE=100)
+    cache.set("key", "x" * 1000)
+    cache.get("key")
+    cache.get("key")
+
+    assert cache.client.stats()["l1_hits"] == 0
+
+
+def test_bypassed_while_unsubscribed(make_cache):
+    cache = make_cache()
+    cache.set("key", 1)
+    cache.get("key")
+    cache.client.subscribed.clear()
+
+    assert cache.get("key") == 1
+    assert cache.client.stats()["l1_hits"] == 0
+
+
+class TestLz4Compressor:
+    @pytest.fixture()
+    def cache(self, make_cache):
+        return make_cache(COMPRESSOR="lego_deck.core.cache.Lz4Compressor")
+
+    def _stored(self, cache, key) -> bytes:
+        return cache.client.get_client().get(cache.make_key(key))
+
+    def test_compresses_large_values(self, cache):
+        value = "fragment " * 1000
+        cache.set("large", value)
+        cache.set("small", "fragment")
+
+        assert len(self._stored(cache, "large")) < len(value) / 10
+        assert b"fragment" in self._stored(cache, "small")
+        assert cache.get("large") == value
+
+    def test_reads_uncompressed_values(self, cache, make_cache):
+        value = "fragment " * 1000
+        make_cache().set("key", value)
+
+        assert cache.get("key") == value
@@ -0,0 +1,119 @@
+import gzip
+
+import brotli
+import pytest
+from django.http import FileResponse
+from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+
+from lego_deck.core.middleware import CompressionMiddleware
+
+CONTENT = b"<p>Lego deck</p>" * 100
+
+
+def _compress(rf, response, accept_encoding="gzip, deflate, br"):
+    request = rf.get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate(accept_encoding, expected):
+    assert CompressionMiddleware.negotiate(accept_encoding) == expected
+
+
+def test_compresses_brotli(rf):
+    response = _compress(rf, HttpResponse(CONTENT))
+
+    assert response["Content-Encoding"] == "br"
+    assert response["Vary"] == "Accept-Encoding"
+    assert int(response["Content-Length"]) == len(response.content)
+    assert brotli.decompress(response.content) == CONTENT
+
+
+def test_compresses_gzip(rf):
+    response = HttpResponse(CONTENT, headers={"ETag": '"abc"'})
+    response = _compress(rf, response, accept_encoding="gzip")
+
+    assert response["Content-Encoding"] == "gzip"
+    assert response["ETag"] == 'W/"abc"'
+    assert gzip.decompress(response.content) == CONTENT
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        HttpResponse(b"<p>Short</p>"),
+        HttpResponse(CONTENT, content_type="image/png"),
+        HttpResponse(CONTENT, headers={"Content-Encoding": "gzip"}),
+    ],
+    ids=["short", "image", "encoded"],
+)
+def test_skips(rf, response):
+    content, encoding = response.content, response.get("Content-Encoding")
+    response = _compress(rf, response)
+
+    assert response.content == content
+    assert response.get("Content-Encoding") == encoding
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize("accept_encoding", ["br", "gzip"])
+def test_skips_responses_with_csrf_token(client, settings, accept_encoding):
+    response = client.get(
+        reverse("account_login"),
+        HTTP_ACCEPT_ENCODING=accept_encoding,
+    )
+
+    assert settings.CSRF_COOKIE_NAME in response.cookies
+    assert not response.has_header("Content-Encoding")
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "decompress"),
+    [("br", brotli.decompress), ("gzip", gzip.decompress)],
+)
+def test_compresses_stream_incrementally(rf, accept_encoding, decompress):
+    produced = []
+
+    def chunks():
+        for i in range(3):
+            produced.append(i)
+            yield CONTENT
+
+    response = StreamingHttpResponse(chunks(), content_type="application/json")
+    response = _compress(rf, response, accept_encoding=accept_encoding)
+    stream = iter(response)
+    first = next(stream)
+
+    assert produced == [0]
+    assert response["Content-Encoding"] == accept_encoding
+    assert not response.has_header("Content-Length")
+    assert decompress(first + b"".join(stream)) == CONTENT * 3
+
+
+def test_skips_compressed_files(rf, tmp_path):
+    path = tmp_path / "archive.zip"
+    path.write_bytes(CONTENT)
+    with path.open("rb") as file:
+        response = _compress(rf, FileResponse(file))
+
+        assert not response.has_header("Content-Encoding")
+
+
+@pytest.mark.django_db()
+def test_pages_are_compressed(client):
+    response = client.get(reverse("about"), HTTP_ACCEPT_ENCODING="br")
+
+    assert response["Content-Encoding"] == "br"
@@ -0,0 +1,89 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from lego_deck.core.models import Upload
+from lego_deck.core.tests.test_uploads import DirectUploadStorage
+from lego_deck.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+class SignedURLStorage(DirectUploadStorage):
+    def download_url(self, name: str, expire: int, filename: str) -> str:
+        return f"https://storage.invalid/{name}?expire={expire}&filename={filename}"
+
+
+@pytest.fixture()
+def api_client(user: User) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def _upload(user: User, status=Upload.Status.VERIFIED) -> Upload:
+    name = default_storage.save("uploads/1/abc/report.pdf", ContentFile(b"%PDF"))
+    return Upload.objects.create(
+        user=user,
+        file=name,
+        content_type="application/pdf",
+        size=4,
+        status=status,
+    )
+
+
+def _download(api_client, upload: Upload):
+    # Like a browser following a link.
+    return api_client.get(
+        f"/api/uploads/{upload.pk}/download/",
+        HTTP_ACCEPT="text/html,*/*;q=0.8",
+    )
+
+
+def test_streams_without_accel_redirect(api_client, user: User):
+    response = _download(api_client, _upload(user))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert b"".join(response.streaming_content) == b"%PDF"
+    assert response["Content-Type"] == "application/pdf"
+    assert response["Content-Disposition"] == 'attachment; filename="report.pdf"'
+    assert "private" in response["Cache-Control"]
+
+
+def test_hands_over_to_nginx(api_client, user: User, settings):
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+    response = _download(api_client, _upload(user))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == b""
+    assert response["X-Accel-Redirect"] == "/protected-media/uploads/1/abc/report.pdf"
+    assert response["Content-Type"] == "application/pdf"
+    assert response["Content-Disposition"] == 'attachment; filename="report.pdf"'
+
+
+def test_redirects_to_signed_url(api_client, user: User, settings):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "default": {"BACKEND": f"{__name__}.SignedURLStorage"},
+    }
+    response = _download(api_client, _upload(user))
+
+    assert response.status_code == status.HTTP_302_FOUND
+    assert response["Location"] == (
+        "https://storage.invalid/uploads/1/abc/report.pdf"
+        "?expire=60&filename=report.pdf"
+    )
+
+
+def test_only_verified_uploads(api_client, user: User):
+    upload = _upload(user, status=Upload.Status.UPLOADED)
+
+    assert _download(api_client, upload).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_only_own_uploads(api_client):
+    upload = _upload(User.objects.create(username="other"))
+
+    assert _download(api_client, upload).status_code == status.HTTP_404_NOT_FOUND
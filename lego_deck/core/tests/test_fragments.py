@@ -0,0 +1,56 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import render_to_string
+
+from lego_deck.core.fragments import get_version
+from lego_deck.core.templatetags.fragment_cache import fragment_key
+from lego_deck.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def _render_detail(rf, user: User) -> str:
+    request = rf.get("/")
+    request.user = user
+    context = {"object": user, "is_owner": True}
+    return render_to_string("users/user_detail.html", context, request=request)
+
+
+def test_fragment_key(user: User):
+    assert fragment_key(AnonymousUser()) == ""
+    assert fragment_key(user) == f"{user.pk}.{get_version(user)}"
+
+
+def test_saving_bumps_version(user: User, django_capture_on_commit_callbacks):
+    version = get_version(user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+
+    assert get_version(user) == version + 1
+
+
+def test_fragment_is_cached_until_saved(
+    user: User,
+    rf,
+    django_capture_on_commit_callbacks,
+):
+    assert f"<h2>{user.username}</h2>" in _render_detail(rf, user)
+
+    User.objects.filter(pk=user.pk).update(username="renamed")
+    user.refresh_from_db()
+    assert "<h2>renamed</h2>" not in _render_detail(rf, user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+    assert "<h2>renamed</h2>" in _render_detail(rf, user)
+
+
+def test_fragment_varies_on_deploy_version(user: User, rf, settings):
+    _render_detail(rf, user)
+    User.objects.filter(pk=user.pk).update(username="renamed")
+    user.refresh_from_db()
+
+    settings.DEPLOY_VERSION = "next"
+
+    assert "<h2>renamed</h2>" in _render_detail(rf, user)
@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+from django.db import connection
+from rest_framework import status
+
+from lego_deck.core import health
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _results(monkeypatch):
+    monkeypatch.setattr(health, "_results", {})
+
+
+def test_healthz(client, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        # Checked by the server's address, not a host the site is served on.
+        response = client.get("/healthz", HTTP_HOST="10.0.0.5:5000")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"status": "ok"}
+    assert not response.cookies
+    assert "no-cache" in response["Cache-Control"]
+
+
+def test_readyz(client, django_assert_num_queries):
+    # The probe has a connection of its own.
+    with django_assert_num_queries(0):
+        response = client.get("/readyz", HTTP_HOST="10.0.0.5:5000")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "status": "ok",
+        "checks": {"database": "ok", "redis": "ok"},
+    }
+
+
+def test_readyz_failing(client, monkeypatch):
+    calls = []
+
+    def probe_redis():
+        calls.append(1)
+        raise ConnectionError
+
+    monkeypatch.setitem(health.PROBES, "redis", probe_redis)
+
+    for _ in range(3):
+        response = client.get("/readyz")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json() == {
+            "status": "unavailable",
+            "checks": {"database": "ok", "redis": "failed"},
+        }
+    # Probed once, then answered from the cached result.
+    assert len(calls) == 1
+
+
+def test_probe_results_expire(settings, monkeypatch):
+    settings.HEALTH_CHECK_CACHE_SECONDS = 0
+    calls = []
+    monkeypatch.setitem(health.PROBES, "redis", lambda: calls.append(1))
+
+    checks = 2
+    for _ in range(checks):
+        health.check("redis")
+
+    assert len(calls) == checks
+
+
+def test_database_probe_times_out(monkeypatch):
+    params = []
+    get_new_connection = connection.get_new_connection
+
+    def record(conn_params):
+        params.append(conn_params)
+        return get_new_connection(conn_params)
+
+    monkeypatch.setattr(connection, "get_new_connection", record)
+
+    health.probe_database()
+
+    assert params[0]["connect_timeout"] == health.DATABASE_TIMEOUT
+    assert "-c statement_timeout=" in params[0]["options"]
+
+
+def test_probe_in_progress_not_waited_for(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def probe_redis():
+        started.set()
+        release.wait()
+
+    monkeypatch.setitem(health.PROBES, "redis", probe_redis)
+    thread = threading.Thread(target=health.check, args=["redis"])
+    thread.start()
+    started.wait()
+
+    assert not health.check("redis")
+
+    release.set()
+    thread.join()
+    assert health.check("redis")
+
+
+def test_other_methods_reach_the_views(client):
+    response = client.post("/healthz")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,28 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from lego_deck.core.management.commands.importtime import parse_importtime
+
+OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     django.utils.functional
+import time:       300 |        400 |   django.utils
+import time:        50 |        450 | django
+import time:      1000 |       1000 | tornado
+"""
+
+
+def test_parse_importtime():
+    assert parse_importtime(OUTPUT) == {"django": 450, "tornado": 1000}
+
+
+def test_reports_entry_point():
+    out = StringIO()
+    limit = 3
+    call_command("importtime", "worker", repeat=1, limit=limit, stdout=out)
+
+    summary, *modules = out.getvalue().splitlines()
+    assert summary.startswith("worker: ")
+    assert "cold start" in summary
+    assert len(modules) == limit
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from lego_deck.core import loadtest
+from lego_deck.users.models import User
+
+
+def test_percentile():
+    # The nth percentile of 1 to 100 is n.
+    durations = [float(n) for n in range(1, 101)]
+
+    for n in (1, 50, 99, 100):
+        assert loadtest.percentile(durations, n) == n
+    assert loadtest.percentile([1.0], 95) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_loadtest(live_server, tmp_path, settings):
+    settings.ACCOUNT_RATE_LIMITS = False
+    settings.THROTTLE_RATES = {}
+    output = tmp_path / "results.json"
+
+    call_command(
+        "loadtest",
+        url=live_server.url,
+        users=2,
+        duration=1,
+        output=output,
+        allow_create_accounts=True,
+    )
+
+    results = json.loads(output.read_text())
+    assert results["total"]["requests"] > 0
+    assert results["total"]["errors"] == 0
+    assert set(results["total"]) >= {"rps", "p50_ms", "p95_ms", "p99_ms"}
+    assert not User.objects.filter(username__startswith=loadtest.PREFIX).exists()
+
+
+@pytest.mark.django_db()
+def test_loadtest_refuses_other_settings(tmp_path):
+    with pytest.raises(CommandError, match="Refusing"):
+        call_command("loadtest", url="http://localhost:1", output=tmp_path / "r")
+
+    assert not User.objects.exists()
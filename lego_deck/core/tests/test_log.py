@@ -0,0 +1,150 @@
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import uuid
+
+import pytest
+from celery import shared_task
+from django.http import HttpResponse
+
+from config.celery_app import add_request_id
+from lego_deck.core import log
+from lego_deck.core.middleware import RequestIdMiddleware
+
+
+@shared_task()
+def log_context():
+    return log.request_id.get(), log.task_id.get(), log.task_name.get()
+
+
+@pytest.fixture()
+def stream() -> io.StringIO:
+    return io.StringIO()
+
+
+@pytest.fixture()
+def handler(stream):
+    handler = log.QueueHandler(stream, maxsize=2)
+    handler.setFormatter(log.JsonFormatter())
+    yield handler
+    handler.close()
+
+
+def _record(msg, *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord(
+        "lego_deck.test",
+        logging.INFO,
+        __file__,
+        1,
+        msg,
+        args,
+        None,
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def _lines(handler, stream) -> list[dict]:
+    handler.flush()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_formatter():
+    user_id = 42
+    try:
+        1 / 0  # noqa: B018
+    except ZeroDivisionError:
+        record = _record("Failed for %s", "alice", request_id="abc", user_id=user_id)
+        record.levelname = "ERROR"
+        record.exc_info = sys.exc_info()
+
+    entry = json.loads(log.JsonFormatter().format(record))
+
+    assert entry["level"] == "ERROR"
+    assert entry["logger"] == "lego_deck.test"
+    assert entry["message"] == "Failed for alice"
+    assert entry["request_id"] == "abc"
+    assert "task_id" not in entry
+    assert entry["user_id"] == user_id
+    assert "ZeroDivisionError" in entry["exception"]
+
+
+def test_queue_handler_writes_from_listener(handler, stream):
+    token = log.request_id.set("abc")
+    try:
+        handler.handle(_record("Hello %s", "world"))
+    finally:
+        log.request_id.reset(token)
+
+    [entry] = _lines(handler, stream)
+    assert entry["message"] == "Hello world"
+    assert entry["request_id"] == "abc"
+    # The thread logging, not the listener's.
+    assert entry["thread"] == threading.get_ident()
+
+
+def test_queue_handler_drops_when_full(handler, stream):
+    handler.listener.stop()
+    for n in range(3):
+        handler.handle(_record(f"record {n}"))
+    assert handler.dropped == 1
+
+    while not handler.queue.empty():
+        handler.queue.get_nowait()
+    handler.listener.start()
+    handler.handle(_record("record 3"))
+
+    assert [entry["message"] for entry in _lines(handler, stream)] == [
+        "Dropped 1 log records, the queue was full",
+        "record 3",
+    ]
+
+
+def test_only_open_handlers_restart_after_fork(handler):
+    closed = log.QueueHandler(io.StringIO())
+    closed.close()
+
+    pid = os.fork()
+    if pid == 0:
+        restarted = handler.listener.running and not closed.listener.running
+        os._exit(0 if restarted else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+def test_request_id_middleware(rf):
+    seen = []
+
+    def get_response(request):
+        seen.append(log.request_id.get())
+        return HttpResponse()
+
+    middleware = RequestIdMiddleware(get_response)
+    generated = middleware(rf.get("/"))
+    kept = middleware(rf.get("/", headers={"X-Request-ID": "edge-1234"}))
+    replaced = middleware(rf.get("/", headers={"X-Request-ID": "bad id\n"}))
+
+    assert uuid.UUID(generated["X-Request-ID"]).hex == generated["X-Request-ID"]
+    assert kept["X-Request-ID"] == "edge-1234"
+    assert replaced["X-Request-ID"] not in ("bad id\n", generated["X-Request-ID"])
+    assert seen == [r["X-Request-ID"] for r in (generated, kept, replaced)]
+    assert log.request_id.get() is None
+
+
+def test_tasks_log_with_request_id(settings):
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    headers: dict[str, str] = {}
+    token = log.request_id.set("abc")
+    try:
+        add_request_id(headers=headers)
+        result = log_context.delay()
+    finally:
+        log.request_id.reset(token)
+
+    assert headers == {"request_id": "abc"}
+    assert result.get() == ("abc", result.id, log_context.name)
+    assert log.task_id.get() is None
@@ -0,0 +1,106 @@
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+
+pytestmark = pytest.mark.django_db
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_measured(client, user):
+    client.force_login(user)
+    labels = {"view": "users:detail", "method": "GET", "status": "200"}
+    before = {
+        "requests": _sample("http_request_duration_seconds_count", **labels),
+        "queries": _sample("http_request_db_queries_sum", view="users:detail"),
+        "bytes": _sample("http_response_size_bytes_sum", view="users:detail"),
+    }
+
+    response = client.get(reverse("users:detail", args=[user.username]))
+
+    assert _sample("http_request_duration_seconds_count", **labels) == (
+        before["requests"] + 1
+    )
+    queries = _sample("http_request_db_queries_sum", view="users:detail")
+    assert queries > before["queries"]
+    assert _sample("http_response_size_bytes_sum", view="users:detail") == (
+        before["bytes"] + len(response.content)
+    )
+
+
+def test_response_size_before_compression(client, user):
+    client.force_login(user)
+    url = reverse("users:detail", args=[user.username])
+    before = _sample("http_response_size_bytes_sum", view="users:detail")
+
+    compressed = client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+
+    assert compressed["Content-Encoding"] == "gzip"
+    size = _sample("http_response_size_bytes_sum", view="users:detail") - before
+    assert size == len(client.get(url).content)
+
+
+def test_cached_pages_measured(client):
+    labels = {"view": "about", "method": "GET", "status": "200"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+
+    client.get(reverse("about"))
+    assert client.get(reverse("about"))["X-Page-Cache"] == "hit"
+
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 2
+
+
+def test_unresolved_paths_share_a_label(client):
+    labels = {"view": "<unresolved>", "method": "GET", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+
+    client.get("/no-such-page/")
+    client.get("/wp-login.php")
+
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 2
+
+
+def test_metrics_need_the_token(client, settings):
+    settings.METRICS_TOKEN = "secret"  # noqa: S105
+    url = reverse("metrics")
+
+    assert client.get(url).status_code == status.HTTP_404_NOT_FOUND
+    response = client.get(url, headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = client.get(url, headers={"Authorization": "Bearer secret"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"].startswith("text/plain")
+    assert b"http_request_duration_seconds_bucket{" in response.content
+
+
+def test_metrics_disabled_without_token(client, settings):
+    settings.METRICS_TOKEN = None
+
+    assert client.get(reverse("metrics")).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_metrics_added_up_across_processes(tmp_path):
+    def run(code: str) -> str:
+        return subprocess.run(  # noqa: S603
+            [sys.executable, "-c", f"from lego_deck.core import metrics\n{code}"],
+            cwd=settings.BASE_DIR,
+            env={"PROMETHEUS_MULTIPROC_DIR": str(tmp_path)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+    for _ in range(2):
+        run("metrics.CACHE_LOOKUPS.labels('l1', 'hits').inc(2)")
+
+    output = run("print(metrics.render().decode())")
+
+    assert 'cache_lookups_total{result="hits",tier="l1"} 4.0' in output
@@ -0,0 +1,142 @@
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.db import NotSupportedError
+from django.db import connection
+from django.db import migrations
+from django.db import models
+from django.db.migrations.state import ProjectState
+from django.test.utils import CaptureQueriesContext
+
+from lego_deck.core.db.operations import RunInBatches
+from lego_deck.core.db.operations import SetLockTimeout
+from lego_deck.users.models import User
+from lego_deck.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def clear_names(queryset):
+    return queryset.update(name="")
+
+
+def _schema_editor(*, atomic_migration):
+    return SimpleNamespace(connection=connection, atomic_migration=atomic_migration)
+
+
+def test_run_in_batches_updates_every_row():
+    UserFactory.create_batch(5)
+    operation = RunInBatches("user", clear_names, batch_size=2, sleep=0)
+    state = ProjectState.from_apps(apps)
+
+    operation.database_forwards(
+        "users",
+        _schema_editor(atomic_migration=False),
+        state,
+        state,
+    )
+
+    assert not User.objects.exclude(name="").exists()
+
+
+def test_run_in_batches_refuses_atomic_migrations():
+    operation = RunInBatches("user", clear_names)
+    state = ProjectState.from_apps(apps)
+
+    with pytest.raises(NotSupportedError):
+        operation.database_forwards(
+            "users",
+            _schema_editor(atomic_migration=True),
+            state,
+            state,
+        )
+
+
+def test_run_in_batches_irreversible_without_reverse_code():
+    assert not RunInBatches("user", clear_names).reversible
+    assert RunInBatches("user", clear_names, clear_names).reversible
+
+
+def _lock_timeout() -> str:
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW lock_timeout")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_lock_timeout_ends_with_atomic_migration():
+    with connection.schema_editor(atomic=True) as editor:
+        SetLockTimeout("3s").database_forwards("users", editor, None, None)
+        assert _lock_timeout() == "3s"
+
+    assert _lock_timeout() == "0"
+
+
+def test_lock_timeout_ends_with_non_atomic_migration():
+    with connection.schema_editor(atomic=False) as editor:
+        SetLockTimeout("3s").database_forwards("users", editor, None, None)
+        assert _lock_timeout() == "3s"
+
+    assert _lock_timeout() == "0"
+
+
+def test_lock_timeout_outlasts_deferred_statements():
+    class Migration(migrations.Migration):
+        atomic = False
+        operations = [
+            SetLockTimeout("3s"),
+            migrations.AddField(
+                "user",
+                "referrer",
+                models.ForeignKey("users.User", models.SET_NULL, null=True),
+            ),
+        ]
+
+    with (
+        CaptureQueriesContext(connection) as queries,
+        connection.schema_editor(atomic=False) as editor,
+    ):
+        Migration("0001_test", "users").apply(ProjectState.from_apps(apps), editor)
+
+    statements = [query["sql"] for query in queries]
+    # The index of the foreign key is deferred.
+    index = next(i for i, sql in enumerate(statements) if "CREATE INDEX" in sql)
+    assert statements.index("RESET lock_timeout") > index
+    assert _lock_timeout() == "0"
+
+
+def test_run_in_batches_routed_with_hints(settings):
+    class Router:
+        def allow_migrate(self, db, app_label, **hints):
+            return hints.get("target") != db
+
+    settings.DATABASE_ROUTERS = [Router()]
+    UserFactory()
+    operation = RunInBatches("user", clear_names, hints={"target": "default"})
+    state = ProjectState.from_apps(apps)
+
+    operation.database_forwards(
+        "users",
+        _schema_editor(atomic_migration=False),
+        state,
+        state,
+    )
+
+    assert User.objects.exclude(name="").exists()
+
+
+def test_lock_timeout_restored_backwards():
+    with connection.schema_editor(atomic=False) as editor:
+        operation = SetLockTimeout("3s")
+        operation.database_forwards("users", editor, None, None)
+        operation.database_backwards("users", editor, None, None)
+        assert _lock_timeout() == "0"
+
+
+def test_deconstruct():
+    assert SetLockTimeout("3s").deconstruct() == ("SetLockTimeout", ["3s"], {})
+    operation = RunInBatches("user", clear_names, batch_size=10)
+    name, args, kwargs = operation.deconstruct()
+    assert name == "RunInBatches"
+    assert RunInBatches(*args, **kwargs).batch_size == operation.batch_size
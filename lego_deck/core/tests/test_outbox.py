@@ -0,0 +1,107 @@
+import json
+import typing
+
+import pytest
+from celery.result import EagerResult
+
+from lego_deck.core import metrics
+from lego_deck.core import outbox
+from lego_deck.core.models import OutboxEvent
+from lego_deck.core.redis import get_redis_connection
+from lego_deck.core.tasks import drain_outbox
+from lego_deck.users.models import User
+from lego_deck.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _events(user: User) -> list[str]:
+    return list(
+        OutboxEvent.objects.filter(topic="users", key=str(user.pk))
+        .order_by("id")
+        .values_list("event_type", flat=True),
+    )
+
+
+class TestUserEvents:
+    def test_created(self, user: User):
+        assert _events(user)[0] == "created"
+        event = OutboxEvent.objects.filter(key=str(user.pk)).earliest("id")
+        assert event.payload["username"] == user.username
+
+    def test_updated(self, user: User):
+        user.name = "Renamed"
+        user.save()
+
+        assert _events(user)[-1] == "updated"
+        assert OutboxEvent.objects.latest("id").payload["name"] == "Renamed"
+
+    def test_deactivated(self, user: User):
+        user = User.objects.get(pk=user.pk)
+        user.is_active = False
+        user.save()
+
+        assert _events(user)[-1] == "deactivated"
+
+    def test_unpublished_fields_are_ignored(self, user: User):
+        count = OutboxEvent.objects.count()
+
+        user.save(update_fields=["last_login"])
+
+        assert OutboxEvent.objects.count() == count
+
+
+class TestDrain:
+    def test_publishes_in_order(self):
+        users = UserFactory.create_batch(3)
+        pending = OutboxEvent.objects.count()
+
+        report = outbox.drain(batch_size=2)
+
+        assert report.published == pending
+        assert not OutboxEvent.objects.filter(published_at__isnull=True).exists()
+        entries = typing.cast(
+            "list[tuple[bytes, dict[bytes, bytes]]]",
+            get_redis_connection().xrange("outbox:users"),
+        )
+        ids = [int(fields[b"id"]) for _, fields in entries]
+        assert ids == sorted(ids)
+        payloads = [json.loads(fields[b"payload"]) for _, fields in entries]
+        assert {p["id"] for p in payloads} == {u.pk for u in users}
+
+    def test_skips_when_another_drain_runs(self, user: User):
+        lock = get_redis_connection().lock(outbox.DRAIN_LOCK_KEY)
+        lock.acquire()
+
+        assert outbox.drain().published == 0
+
+        lock.release()
+        assert outbox.drain().published == len(_events(user))
+
+    def test_stats(self, user: User):
+        pending = len(_events(user))
+        assert outbox.stats()["pending"] == pending
+
+        outbox.drain()
+
+        stats = outbox.stats()
+        assert stats["pending"] == 0
+        assert stats["lag_seconds"] == 0
+        assert stats["published_total"] == pending
+        assert stats["last_throughput"] > 0
+
+    def test_metrics(self, user: User):
+        pending = len(_events(user))
+
+        output = metrics.render(outbox.MetricsCollector()).decode()
+
+        assert f"outbox_pending_events {float(pending)}" in output
+        assert "outbox_published_events_total 0.0" in output
+
+    def test_task(self, user: User, settings):
+        settings.CELERY_TASK_ALWAYS_EAGER = True
+
+        task_result = drain_outbox.delay()
+
+        assert isinstance(task_result, EagerResult)
+        assert task_result.result["published"] == len(_events(user))
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+
+from lego_deck.core import page_cache
+from lego_deck.core.middleware import AnonymousPageCacheMiddleware
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _state(response) -> str | None:
+    return response.headers.get("X-Page-Cache")
+
+
+def test_anonymous_pages_are_cached(client):
+    first = client.get(reverse("home"))
+    second = client.get(reverse("home"))
+
+    assert _state(first) == "miss"
+    assert _state(second) == "hit"
+    assert second.content == first.content
+    assert second["Content-Type"] == first["Content-Type"]
+
+
+def test_varies_on_language_and_host(client, settings):
+    settings.ALLOWED_HOSTS = ["testserver", "other.example"]
+    client.get(reverse("about"))
+
+    assert _state(client.get(reverse("about"), HTTP_ACCEPT_LANGUAGE="fr")) == "miss"
+    assert _state(client.get(reverse("about"), HTTP_HOST="other.example")) == "miss"
+    assert _state(client.get(reverse("about"))) == "hit"
+
+
+def test_keys_change_on_deploy(client, settings):
+    client.get(reverse("home"))
+    settings.DEPLOY_VERSION = "next"
+
+    assert _state(client.get(reverse("home"))) == "miss"
+
+
+def test_authenticated_users_bypass_cache(client, user):
+    client.get(reverse("home"))
+    client.force_login(user)
+
+    response = client.get(reverse("home"))
+
+    assert _state(response) is None
+    assert user.username.encode() in response.content
+
+
+def test_other_views_are_not_cached(client):
+    assert _state(client.get(reverse("account_login"))) is None
+
+
+def _expire(key: str) -> None:
+    entry = cache.get(key)
+    entry.fresh_until = time.time() - 1
+    cache.set(key, entry)
+
+
+def test_stale_entry_served_while_regenerating(client, rf):
+    client.get(reverse("home"))
+    key = page_cache.get_key(rf.get(reverse("home")))
+    _expire(key)
+
+    # Another request holds the lock.
+    cache.add(f"{key}:lock", 1)
+    assert _state(client.get(reverse("home"))) == "stale"
+
+    cache.delete(f"{key}:lock")
+    assert _state(client.get(reverse("home"))) == "miss"
+    assert _state(client.get(reverse("home"))) == "hit"
+
+
+def test_waits_for_the_first_render(client, rf, monkeypatch):
+    monkeypatch.setattr(AnonymousPageCacheMiddleware, "lock_wait", 0.1)
+    key = page_cache.get_key(rf.get(reverse("home")))
+    cache.add(f"{key}:lock", 1)
+
+    # No entry shows up, the page is rendered without touching the cache.
+    response = client.get(reverse("home"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert _state(response) is None
+    assert cache.get(key) is None
@@ -0,0 +1,133 @@
+import re
+import time
+from collections import Counter
+
+import pytest
+from django.urls import ResolverMatch
+from django.urls import reverse
+from rest_framework import status
+
+from lego_deck.core.models import RequestProfile
+from lego_deck.core.profiling import StackSampler
+from lego_deck.core.profiling import get_view_name
+from lego_deck.core.profiling import to_collapsed
+
+pytestmark = pytest.mark.django_db
+
+
+def spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_sees_the_running_function():
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    spin(0.1)
+    stacks = sampler.stop()
+
+    assert sampler.samples > 0
+    assert any(
+        stack.endswith(
+            "test_profiling.test_sampler_sees_the_running_function;"
+            "lego_deck.core.tests.test_profiling.spin",
+        )
+        for stack in stacks
+    )
+
+
+def test_to_collapsed():
+    stacks = Counter({"a.main;a.work": 3, "a.main": 1})
+
+    assert to_collapsed(stacks) == "a.main;a.work 3\na.main 1\n"
+
+
+def test_requests_not_profiled_by_default(client):
+    client.get(reverse("about"))
+
+    assert not RequestProfile.objects.exists()
+
+
+def test_sampled_request(client, settings, user):
+    settings.PROFILING_SAMPLE_RATE = 1
+    client.force_login(user)
+
+    response = client.get(reverse("about"))
+
+    assert "X-Profile-Id" not in response
+    profile = RequestProfile.objects.get()
+    assert profile.trigger == RequestProfile.Trigger.SAMPLED
+    assert profile.view_name == "about"
+    assert profile.method == "GET"
+    assert profile.status_code == status.HTTP_200_OK
+    assert profile.duration > 0
+    assert profile.user == user
+    with profile.file.open("r") as f:
+        lines = f.read().splitlines()
+    assert len(lines) <= profile.samples
+    assert all(re.fullmatch(r"\S+ \d+", line) for line in lines)
+
+
+def test_requested_by_staff(admin_client, admin_user):
+    response = admin_client.get(reverse("about"), headers={"X-Profile": "1"})
+
+    profile = RequestProfile.objects.get()
+    assert response["X-Profile-Id"] == str(profile.pk)
+    assert profile.trigger == RequestProfile.Trigger.REQUESTED
+    assert profile.user == admin_user
+
+
+def test_requested_by_others(client, user):
+    client.force_login(user)
+
+    response = client.get(reverse("about"), headers={"X-Profile": "1"})
+
+    assert "X-Profile-Id" not in response
+    assert not RequestProfile.objects.exists()
+
+
+def test_file_deleted_with_profile(
+    client,
+    settings,
+    user,
+    django_capture_on_commit_callbacks,
+):
+    settings.PROFILING_SAMPLE_RATE = 1
+    client.force_login(user)
+    client.get(reverse("about"))
+    profile = RequestProfile.objects.get()
+    storage, name = profile.file.storage, profile.file.name
+
+    with django_capture_on_commit_callbacks(execute=True):
+        profile.delete()
+
+    assert not storage.exists(name)
+
+
+def test_admin_lists_slowest_views(admin_client):
+    admin_client.get(reverse("about"), headers={"X-Profile": "1"})
+    profile = RequestProfile.objects.get()
+
+    response = admin_client.get(reverse("admin:core_requestprofile_changelist"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [view["view_name"] for view in response.context["slowest_views"]] == [
+        "about",
+    ]
+
+    response = admin_client.get(
+        reverse("admin:core_requestprofile_stacks", args=[profile.pk]),
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "text/plain"
+    assert response["Content-Disposition"] == (
+        f'attachment; filename="profile-{profile.pk}.folded"'
+    )
+
+
+def test_unnamed_views_by_path(rf):
+    request = rf.get("/")
+    request.resolver_match = ResolverMatch(to_collapsed, (), {})
+
+    assert get_view_name(request) == "lego_deck.core.profiling.to_collapsed"
@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+import pytest
+from allauth.account.models import EmailAddress
+from allauth.account.models import EmailConfirmation
+from celery.result import EagerResult
+from django.contrib.sessions.models import Session
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from lego_deck.core.db.batches import delete_in_batches
+from lego_deck.core.models import Upload
+from lego_deck.core.retention import purge_expired_rows
+from lego_deck.core.tasks import purge_expired_rows as purge_expired_rows_task
+from lego_deck.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _session(key: str, expires_in: timedelta) -> Session:
+    return Session.objects.create(
+        session_key=key,
+        session_data="",
+        expire_date=timezone.now() + expires_in,
+    )
+
+
+def test_delete_in_batches():
+    expired = 5
+    for i in range(expired):
+        _session(f"expired{i}", timedelta(days=-1))
+    batch_size = 2
+
+    deleted = delete_in_batches(Session.objects.all(), batch_size=batch_size)
+
+    assert deleted == expired
+    assert not Session.objects.exists()
+
+
+def test_purges_expired_sessions_only(settings):
+    settings.RETENTION_DAYS = {"sessions": 0}
+    _session("expired", timedelta(days=-1))
+    _session("active", timedelta(days=1))
+
+    reports = purge_expired_rows()
+
+    assert [(r.name, r.deleted) for r in reports] == [("sessions", 1)]
+    assert list(Session.objects.values_list("session_key", flat=True)) == ["active"]
+
+
+def test_purges_old_tokens_and_confirmations(settings):
+    settings.RETENTION_DAYS = {"auth_tokens": 30, "email_confirmations": 7}
+    long_ago = timezone.now() - timedelta(days=31)
+    old = UserFactory(last_seen=long_ago)
+    # Tokens as old, but still in use or from before last_seen was recorded.
+    recent, unknown = UserFactory(last_seen=timezone.now()), UserFactory()
+    for user in (old, recent, unknown):
+        Token.objects.create(user=user)
+    Token.objects.update(created=long_ago)
+    email = EmailAddress.objects.create(user=old, email=old.email)
+    EmailConfirmation.objects.create(
+        email_address=email,
+        key="old",
+        created=timezone.now() - timedelta(days=8),
+    )
+    EmailConfirmation.objects.create(email_address=email, key="recent")
+
+    reports = {r.name: r.deleted for r in purge_expired_rows()}
+
+    assert reports == {"auth_tokens": 1, "email_confirmations": 1}
+    assert set(Token.objects.values_list("user", flat=True)) == {recent.pk, unknown.pk}
+    assert list(EmailConfirmation.objects.values_list("key", flat=True)) == ["recent"]
+
+
+def test_purges_abandoned_uploads_and_their_files(
+    settings,
+    user,
+    django_capture_on_commit_callbacks,
+):
+    settings.RETENTION_DAYS = {"pending_uploads": 1}
+    long_ago = timezone.now() - timedelta(days=2)
+    uploads = {
+        (status, created_at): Upload.objects.create(
+            user=user,
+            file=default_storage.save(f"uploads/{status}", ContentFile(b"data")),
+            content_type="text/plain",
+            size=4,
+            status=status,
+            created_at=created_at,
+        )
+        for status in (Upload.Status.PENDING, Upload.Status.VERIFIED)
+        for created_at in (long_ago, timezone.now())
+    }
+    abandoned = uploads[Upload.Status.PENDING, long_ago]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reports = purge_expired_rows()
+
+    assert [(r.name, r.deleted) for r in reports] == [("pending_uploads", 1)]
+    assert not Upload.objects.filter(pk=abandoned.pk).exists()
+    assert not default_storage.exists(abandoned.file.name)
+    assert Upload.objects.count() == len(uploads) - 1
+
+
+def test_unconfigured_policies_are_skipped(settings):
+    settings.RETENTION_DAYS = {"sessions": None}
+    _session("expired", timedelta(days=-1))
+
+    assert purge_expired_rows() == []
+    assert Session.objects.exists()
+
+
+def test_task_reports_rows_and_time(settings):
+    settings.RETENTION_DAYS = {"sessions": 0}
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    _session("expired", timedelta(days=-1))
+
+    task_result = purge_expired_rows_task.delay()
+
+    assert isinstance(task_result, EagerResult)
+    [report] = task_result.result
+    assert report["name"] == "sessions"
+    assert report["deleted"] == 1
+    assert report["seconds"] >= 0
@@ -0,0 +1,201 @@
+import gzip
+import typing
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+import brotli
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+
+# The Azure SDK is only installed with the production requirements.
+pytest.importorskip("storages.backends.azure_storage")
+
+from azure.core.exceptions import ResourceNotFoundError  # noqa: E402
+
+from lego_deck.core.storages import MediaAzureStorage  # noqa: E402
+from lego_deck.core.storages import StaticAzureStorage  # noqa: E402
+
+
+class Download:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def readinto(self, stream) -> int:
+        return stream.write(self.data)
+
+
+class Blob:
+    def __init__(self, name: str):
+        self.url = f"http://127.0.0.1:10000/devstoreaccount1/static/{name}"
+
+
+class Container:
+    """In-memory stand-in for an Azurite blob container."""
+
+    def __init__(self):
+        self.blobs = {}
+        self.uploads = []
+
+    def upload_blob(self, name, data, *, content_settings, **kwargs):
+        self.blobs[name] = (data.read(), content_settings)
+        self.uploads.append(name)
+
+    def get_blob_client(self, name):
+        return Blob(name)
+
+    def download_blob(self, name, **kwargs):
+        try:
+            return Download(self.blobs[name][0])
+        except KeyError:
+            raise ResourceNotFoundError(name) from None
+
+    def delete_blob(self, name, **kwargs):
+        try:
+            del self.blobs[name]
+        except KeyError:
+            raise ResourceNotFoundError(name) from None
+
+
+@pytest.fixture()
+def container(monkeypatch) -> Container:
+    container = Container()
+    monkeypatch.setattr(StaticAzureStorage, "client", property(lambda _: container))
+    return container
+
+
+@pytest.fixture()
+def static_dir(tmp_path, settings):
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / "logo.png").write_bytes(b"\x89PNG" * 100)
+    (tmp_path / "project.css").write_text(
+        "body { background: url('images/logo.png'); }\n" * 20,
+    )
+    (tmp_path / "project.js").write_text("console.log('hello');\n" * 20)
+    settings.STATICFILES_DIRS = [str(tmp_path)]
+    settings.STATICFILES_FINDERS = [
+        "django.contrib.staticfiles.finders.FileSystemFinder",
+    ]
+    return tmp_path
+
+
+def _collectstatic(settings):
+    # Assigning the setting discards the cached storage instance, like a
+    # new deployment would.
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "lego_deck.core.storages.StaticAzureStorage"},
+    }
+    call_command("collectstatic", interactive=False, verbosity=0)
+
+
+def _stored_name(name: str) -> str:
+    """The hashed name the last collectstatic gave ``name``."""
+    return typing.cast("StaticAzureStorage", staticfiles_storage).stored_name(name)
+
+
+def test_uploads_hashed_and_compressed_files(container, static_dir, settings):
+    _collectstatic(settings)
+
+    css_name = _stored_name("project.css")
+    logo_name = _stored_name("images/logo.png")
+    css, css_settings = container.blobs[f"static/{css_name}"]
+    assert logo_name.encode() in css
+    assert css_settings.cache_control == StaticAzureStorage.immutable_cache_control
+    assert container.blobs["static/project.css"][1].cache_control == (
+        StaticAzureStorage.cache_control
+    )
+
+    css_gz, gz_settings = container.blobs[f"static/{css_name}.gz"]
+    assert gzip.decompress(css_gz) == css
+    assert gz_settings.content_type == "text/css"
+    assert gz_settings.content_encoding == "gzip"
+    assert gz_settings.cache_control == StaticAzureStorage.immutable_cache_control
+    css_br, br_settings = container.blobs[f"static/{css_name}.br"]
+    assert brotli.decompress(css_br) == css
+    assert br_settings.content_encoding == "br"
+    # Images are not compressed.
+    assert f"static/{logo_name}.gz" not in container.blobs
+
+
+def test_skips_unchanged_files(container, static_dir, settings):
+    _collectstatic(settings)
+    container.uploads.clear()
+
+    _collectstatic(settings)
+
+    # The unchanged image and script, hashed or not, are left alone.
+    assert sorted(container.uploads) == [
+        "static/project.css",
+        "static/project.css.br",
+        "static/project.css.gz",
+        "static/staticfiles.json",
+    ]
+
+
+def test_uploads_changed_files(container, static_dir, settings):
+    _collectstatic(settings)
+    container.uploads.clear()
+    (static_dir / "project.js").write_text("console.log('changed');\n" * 20)
+
+    _collectstatic(settings)
+
+    js_name = _stored_name("project.js")
+    assert "static/project.js" in container.uploads
+    assert f"static/{js_name}" in container.uploads
+    assert f"static/{js_name}.br" in container.uploads
+    assert f"static/{_stored_name('images/logo.png')}" not in (container.uploads)
+
+
+def test_uploads_everything_without_manifest(container, static_dir, settings):
+    _collectstatic(settings)
+    uploads = sorted(container.uploads)
+    container.uploads.clear()
+    del container.blobs["static/staticfiles.json"]
+
+    _collectstatic(settings)
+
+    assert sorted(container.uploads) == uploads
+
+
+# Azurite's well-known development account.
+AZURITE_CONNECTION_STRING = (
+    "DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;"
+    "AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq"
+    "/K1SZFPTOtr/KBHBeksoGMGw==;"
+    "BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;"
+)
+
+
+def test_media_upload_url():
+    storage = MediaAzureStorage(
+        connection_string=AZURITE_CONNECTION_STRING,
+        azure_container="media",
+    )
+
+    url = urlsplit(storage.upload_url("uploads/1/abc/a b.pdf", expire=60))
+    query = parse_qs(url.query)
+
+    assert url.netloc == "127.0.0.1:10000"
+    assert url.path == "/devstoreaccount1/media/media/uploads/1/abc/a%20b.pdf"
+    assert query["sp"] == ["cw"]
+    assert query["sr"] == ["b"]
+    assert "sig" in query
+    assert storage.upload_headers("application/pdf") == {
+        "x-ms-blob-type": "BlockBlob",
+        "x-ms-blob-content-type": "application/pdf",
+    }
+
+
+def test_media_download_url():
+    storage = MediaAzureStorage(
+        connection_string=AZURITE_CONNECTION_STRING,
+        azure_container="media",
+    )
+
+    url = storage.download_url("uploads/1/abc/a.pdf", expire=60, filename="a.pdf")
+    query = parse_qs(urlsplit(url).query)
+
+    assert query["sp"] == ["r"]
+    assert query["rscd"] == ['attachment; filename="a.pdf"']
+    assert "sig" in query
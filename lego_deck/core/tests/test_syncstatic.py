@@ -0,0 +1,48 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from lego_deck.core.management.commands.syncstatic import MARKER_NAME
+from lego_deck.core.management.commands.syncstatic import source_hash
+
+
+@pytest.fixture()
+def static_dir(tmp_path, settings):
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "project.css").write_text("body { color: red; }")
+    settings.STATICFILES_DIRS = [str(source)]
+    settings.STATICFILES_FINDERS = [
+        "django.contrib.staticfiles.finders.FileSystemFinder",
+    ]
+    settings.STATIC_ROOT = str(tmp_path / "collected")
+    return source
+
+
+def _syncstatic(*args) -> str:
+    out = StringIO()
+    call_command("syncstatic", *args, stdout=out, verbosity=0)
+    return out.getvalue()
+
+
+def test_collects_and_records_hash(static_dir, tmp_path):
+    assert "collected" in _syncstatic()
+
+    collected = tmp_path / "collected"
+    assert (collected / "project.css").exists()
+    assert (collected / MARKER_NAME).read_text() == source_hash()
+
+
+def test_skips_when_unchanged(static_dir):
+    _syncstatic()
+    assert "unchanged" in _syncstatic()
+    assert "collected" in _syncstatic("--force")
+
+
+def test_collects_changed_files(static_dir, tmp_path):
+    _syncstatic()
+    (static_dir / "project.js").write_text("alert(1);")
+
+    assert "collected" in _syncstatic()
+    assert (tmp_path / "collected" / "project.js").exists()
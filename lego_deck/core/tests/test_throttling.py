@@ -0,0 +1,93 @@
+import pytest
+from django.urls import reverse
+from redis import Redis
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from lego_deck.core import throttling
+from lego_deck.users.models import User
+from lego_deck.users.tests.factories import UserFactory
+
+
+@pytest.fixture(autouse=True)
+def _rates(settings):
+    settings.THROTTLE_RATES = {"test": "2/m", "api": "2/m"}
+
+
+def test_parse_rate():
+    assert throttling.parse_rate("5/m") == (5, 60)
+    assert throttling.parse_rate("100/hour") == (100, 3600)
+
+
+def test_hit():
+    assert throttling.hit("test", "a") is None
+    assert throttling.hit("test", "a") is None
+
+    wait = throttling.hit("test", "a")
+
+    assert wait is not None
+    assert 0 < wait <= throttling.PERIODS["m"]
+    # Refused attempts don't count.
+    again = throttling.hit("test", "a")
+    assert again is not None
+    assert again <= wait
+    # Per identity.
+    assert throttling.hit("test", "b") is None
+
+
+def test_hit_unlimited_scope():
+    for _ in range(5):
+        assert throttling.hit("other", "a") is None
+
+
+def test_hit_without_redis(monkeypatch):
+    monkeypatch.setattr(
+        throttling,
+        "get_redis_connection",
+        lambda: Redis(port=1, socket_connect_timeout=0.1),
+    )
+
+    for _ in range(3):
+        assert throttling.hit("test", "a") is None
+
+
+def test_client_ip(rf, settings):
+    request = rf.get(
+        "/",
+        REMOTE_ADDR="10.0.0.2",
+        HTTP_X_FORWARDED_FOR="1.1.1.1, 2.2.2.2",
+    )
+
+    assert throttling.client_ip(request) == "10.0.0.2"
+
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+
+    # The address the proxy saw, not one the client made up.
+    assert throttling.client_ip(request) == "2.2.2.2"
+
+
+@pytest.mark.django_db()
+def test_api_throttled_per_token(client):
+    tokens = [Token.objects.create(user=UserFactory()) for _ in range(2)]
+    url = reverse("api:user-me")
+
+    for _ in range(2):
+        response = client.get(url, HTTP_AUTHORIZATION=f"Token {tokens[0].key}")
+        assert response.status_code == status.HTTP_200_OK
+    response = client.get(url, HTTP_AUTHORIZATION=f"Token {tokens[0].key}")
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response["Retry-After"]) <= throttling.PERIODS["m"]
+    response = client.get(url, HTTP_AUTHORIZATION=f"Token {tokens[1].key}")
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db()
+def test_api_throttled_per_user(client, user: User):
+    client.force_login(user)
+
+    for _ in range(2):
+        client.get(reverse("api:user-me"))
+    response = client.get(reverse("api:user-me"))
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
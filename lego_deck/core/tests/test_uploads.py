@@ -0,0 +1,172 @@
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage
+from django.core.files.storage import default_storage
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from lego_deck.core import uploads
+from lego_deck.core.models import Upload
+from lego_deck.core.tasks import verify_upload
+from lego_deck.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+class DirectUploadStorage(InMemoryStorage):
+    def upload_url(self, name: str, expire: int) -> str:
+        return f"https://storage.invalid/{name}?expire={expire}"
+
+    def upload_headers(self, content_type: str) -> dict[str, str]:
+        return {"Content-Type": content_type}
+
+
+@pytest.fixture()
+def storage(settings):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "default": {"BACKEND": f"{__name__}.DirectUploadStorage"},
+    }
+    return default_storage
+
+
+@pytest.fixture()
+def api_client(user: User) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def _expire(upload: Upload) -> None:
+    """Move ``upload`` past the expiry of its upload URL."""
+    upload.created_at -= timedelta(seconds=settings.UPLOAD_URL_EXPIRY + 3600)
+    upload.save(update_fields=["created_at"])
+
+
+def _start(api_client, **data):
+    data = {"filename": "../Report 1.pdf", "content_type": "application/pdf"} | data
+    return api_client.post("/api/uploads/", data, format="json")
+
+
+def test_start(api_client, storage, user: User):
+    response = _start(api_client, size=1024)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    upload = Upload.objects.get(pk=response.data["id"])
+    assert upload.user == user
+    assert upload.status == Upload.Status.PENDING
+    assert upload.file.name.startswith(f"uploads/{user.pk}/")
+    assert upload.file.name.endswith("/Report_1.pdf")
+    instructions = response.data["upload"]
+    assert instructions["url"].startswith(f"https://storage.invalid/{upload.file}")
+    assert instructions["method"] == "PUT"
+    assert instructions["headers"] == {"Content-Type": "application/pdf"}
+
+
+def test_start_rejects_large_files(api_client, storage, settings):
+    response = _start(api_client, size=settings.UPLOAD_MAX_SIZE + 1)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "size" in response.data
+
+
+def test_start_needs_capable_storage(api_client):
+    assert _start(api_client, size=1024).status_code == status.HTTP_501_NOT_IMPLEMENTED
+
+
+def test_complete_and_verify(
+    api_client,
+    storage,
+    settings,
+    django_capture_on_commit_callbacks,
+):
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    upload_id = _start(api_client, size=4).data["id"]
+    upload = Upload.objects.get(pk=upload_id)
+    storage.save(upload.file.name, ContentFile(b"%PDF"))
+    _expire(upload)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(f"/api/uploads/{upload_id}/complete/")
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    upload.refresh_from_db()
+    assert upload.status == Upload.Status.VERIFIED
+    assert upload.verified_at is not None
+    response = api_client.get(f"/api/uploads/{upload_id}/")
+    assert response.data["url"].endswith(f"/api/uploads/{upload_id}/download/")
+
+
+def test_verify_waits_for_upload_url_expiry(user: User, storage):
+    upload, instructions = uploads.start(user, "a.txt", "text/plain", 4)
+    storage.save(upload.file.name, ContentFile(b"text"))
+    upload.status = Upload.Status.UPLOADED
+
+    uploads.verify(upload)
+
+    # The client could still replace the file.
+    assert upload.status == Upload.Status.UPLOADED
+    assert uploads.writable_until(upload) > instructions["expires_at"]
+    _expire(upload)
+    uploads.verify(upload)
+    assert upload.status == Upload.Status.VERIFIED
+
+
+def test_verification_queued_after_upload_url_expiry(
+    user: User,
+    storage,
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+):
+    queued = []
+    monkeypatch.setattr(
+        verify_upload,
+        "apply_async",
+        lambda args, **options: queued.append((args, options)),
+    )
+    upload, _ = uploads.start(user, "a.txt", "text/plain", 4)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        uploads.complete(upload)
+
+    assert queued == [((upload.pk,), {"eta": uploads.writable_until(upload)})]
+
+
+def test_verify_rejects_size_mismatch(user: User, storage):
+    upload, _ = uploads.start(user, "a.txt", "text/plain", 10)
+    name = storage.save(upload.file.name, ContentFile(b"too long for it"))
+    upload.status = Upload.Status.UPLOADED
+    _expire(upload)
+
+    uploads.verify(upload)
+
+    assert upload.status == Upload.Status.REJECTED
+    assert "Expected 10 bytes" in upload.error
+    assert not storage.exists(name)
+
+
+def test_verify_rejects_missing_file(user: User, storage):
+    upload, _ = uploads.start(user, "a.txt", "text/plain", 10)
+    upload.status = Upload.Status.UPLOADED
+    _expire(upload)
+
+    uploads.verify(upload)
+
+    assert upload.status == Upload.Status.REJECTED
+
+
+def test_uploads_are_private(api_client, storage):
+    other = User.objects.create(username="other")
+    upload, _ = uploads.start(other, "a.txt", "text/plain", 10)
+
+    assert (
+        api_client.get(f"/api/uploads/{upload.pk}/").status_code
+        == status.HTTP_404_NOT_FOUND
+    )
+    assert (
+        api_client.post(f"/api/uploads/{upload.pk}/complete/").status_code
+        == status.HTTP_404_NOT_FOUND
+    )
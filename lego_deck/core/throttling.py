@@ -0,0 +1,93 @@
+"""
+Rate limits kept in Redis, shared by every process.
+
+Each limit, a scope of ``THROTTLE_RATES`` such as ``"login_ip": "30/m"``,
+allows so many attempts per identity, an IP address, a username or an API
+token, in any window of that length. The times of the attempts in the window
+are kept in a sorted set per identity, updated by a Lua script: checking and
+recording an attempt is a single atomic round trip, whichever process makes
+it and however many make it at once.
+
+Used by ``LoginThrottleMiddleware`` for the account views and by the throttles
+of ``lego_deck.core.api.throttling`` for the API, both refusing attempts before
+a password is hashed or a view runs. Identities are hashed in keys, tokens and
+usernames don't end up in Redis.
+
+If Redis can't be reached attempts are let through, as without limits.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import secrets
+
+from django.conf import settings
+from redis.exceptions import RedisError
+from rest_framework.throttling import BaseThrottle
+
+from lego_deck.core.redis import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "throttle"
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# KEYS[1]: times of the attempts in the window, in milliseconds.
+# ARGV: the number of attempts allowed, the window in milliseconds, and a
+# member unique to this attempt.
+# Returns 0 if the attempt is allowed, otherwise the milliseconds until it
+# would be.
+SLIDING_WINDOW = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = time[1] * 1000 + math.floor(time[2] / 1000)
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now - window)
+if redis.call("ZCARD", KEYS[1]) < limit then
+    redis.call("ZADD", KEYS[1], now, ARGV[3])
+    redis.call("PEXPIRE", KEYS[1], window)
+    return 0
+end
+local oldest = redis.call("ZRANGE", KEYS[1], 0, 0, "WITHSCORES")
+return tonumber(oldest[2]) + window - now
+"""
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """``"5/m"`` or ``"100/hour"`` to attempts allowed and seconds, as in DRF."""
+    limit, period = rate.split("/")
+    return int(limit), PERIODS[period[0]]
+
+
+def client_ip(request) -> str:
+    """
+    The address of the client of a Django or DRF request.
+
+    As DRF finds it, the ``NUM_PROXIES`` of ``REST_FRAMEWORK`` in front of the
+    server are trusted to add it to X-Forwarded-For.
+    """
+    return BaseThrottle().get_ident(request)
+
+
+def hit(scope: str, ident: str) -> float | None:
+    """
+    Record an attempt by ``ident`` in ``scope``.
+
+    Return None if it's allowed, otherwise the seconds until it would be.
+    Scopes without a rate in ``THROTTLE_RATES`` are not limited.
+    """
+    rate = settings.THROTTLE_RATES.get(scope)
+    if rate is None:
+        return None
+    limit, period = parse_rate(rate)
+    digest = hashlib.sha256(ident.encode()).hexdigest()[:32]
+    try:
+        wait = get_redis_connection().register_script(SLIDING_WINDOW)(
+            keys=[f"{KEY_PREFIX}:{scope}:{digest}"],
+            args=[limit, period * 1000, secrets.token_hex(8)],
+        )
+    except RedisError:
+        logger.warning("Redis unavailable, not throttling %s", scope)
+        return None
+    return wait / 1000 if wait else None
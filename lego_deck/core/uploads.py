@@ -0,0 +1,137 @@
+"""
+Direct uploads to the media storage.
+
+Large files shouldn't stream through a gunicorn worker. Instead:
+
+1. :func:`start` records a pending :class:`~lego_deck.core.models.Upload` and
+   returns a short-lived signed URL the client sends the file to.
+2. Once done, the client reports it and :func:`complete` queues verification.
+3. :func:`verify`, run by a Celery task, checks the stored object against what
+   was announced. Mismatching objects are deleted and the upload rejected.
+
+The signed URL lets the client write the object until it expires, verifying it
+earlier would let the client replace a verified file. Verification waits for
+:func:`writable_until`, ``UPLOAD_URL_EXPIRY`` after the upload started.
+
+Only storages implementing ``upload_url()`` and ``upload_headers()``, like
+``lego_deck.core.storages.MediaAzureStorage``, support this.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import typing
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from lego_deck.core.models import Upload
+
+if typing.TYPE_CHECKING:
+    from datetime import datetime
+
+    from lego_deck.users.models import User
+
+# Seconds allowed for the clocks of the storage and of this server to differ.
+CLOCK_SKEW = 60
+
+
+class DirectUploadsUnavailableError(Exception):
+    """The media storage can't issue upload URLs."""
+
+
+class DirectUploadStorage(typing.Protocol):
+    def upload_url(self, name: str, expire: int) -> str: ...
+
+    def upload_headers(self, content_type: str) -> dict[str, str]: ...
+
+
+def supports_direct_uploads(storage: object) -> typing.TypeGuard[DirectUploadStorage]:
+    return hasattr(storage, "upload_url") and hasattr(storage, "upload_headers")
+
+
+def writable_until(upload: Upload) -> datetime:
+    """When the URL handed out for ``upload`` no longer allows writing."""
+    expiry = settings.UPLOAD_URL_EXPIRY + CLOCK_SKEW
+    return upload.created_at + timedelta(seconds=expiry)
+
+
+def start(user: User, filename: str, content_type: str, size: int) -> tuple:
+    """
+    Register a pending upload, return it with the instructions for the client:
+    the URL, method and headers to use, and when the URL expires.
+    """
+    storage = default_storage
+    if not supports_direct_uploads(storage):
+        msg = "The media storage doesn't support direct uploads."
+        raise DirectUploadsUnavailableError(msg)
+    # A random directory keeps names unique without asking the storage.
+    name = posixpath.join(
+        "uploads",
+        str(user.pk),
+        uuid.uuid4().hex,
+        get_valid_filename(posixpath.basename(filename)),
+    )
+    upload = Upload.objects.create(
+        user=user,
+        file=name,
+        content_type=content_type,
+        size=size,
+    )
+    expiry = settings.UPLOAD_URL_EXPIRY
+    instructions = {
+        "url": storage.upload_url(name, expire=expiry),
+        "method": "PUT",
+        "headers": storage.upload_headers(content_type),
+        "expires_at": upload.created_at + timedelta(seconds=expiry),
+    }
+    return upload, instructions
+
+
+def complete(upload: Upload) -> None:
+    """Mark ``upload`` as sent and queue its verification, once it can't change."""
+    from lego_deck.core.tasks import verify_upload
+
+    if upload.status != Upload.Status.PENDING:
+        return
+    upload.status = Upload.Status.UPLOADED
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=["status", "completed_at"])
+    transaction.on_commit(
+        lambda: verify_upload.apply_async((upload.pk,), eta=writable_until(upload)),
+    )
+
+
+def _reject(upload: Upload, error: str) -> None:
+    upload.status = Upload.Status.REJECTED
+    upload.error = error
+    upload.save(update_fields=["status", "error"])
+    upload.file.delete(save=False)
+
+
+def verify(upload: Upload) -> None:
+    """
+    Check the stored object exists and has the announced size.
+
+    ``upload`` is left as it is while the client can still write to it.
+    """
+    if upload.status != Upload.Status.UPLOADED:
+        return
+    if timezone.now() < writable_until(upload):
+        return
+    storage, name = upload.file.storage, upload.file.name
+    if not storage.exists(name):
+        _reject(upload, "File not found in storage.")
+        return
+    size = storage.size(name)
+    if size != upload.size:
+        _reject(upload, f"Expected {upload.size} bytes, found {size}.")
+        return
+    upload.status = Upload.Status.VERIFIED
+    upload.verified_at = timezone.now()
+    upload.save(update_fields=["status", "verified_at"])
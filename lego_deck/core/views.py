@@ -0,0 +1,51 @@
+from functools import cache
+
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.http import HttpResponse
+from django.utils.cache import add_never_cache_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.module_loading import import_string
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from . import metrics
+from . import outbox
+
+
+def lazy_view(path: str, **initkwargs):
+    """
+    Class-based view at ``path``, imported on its first request rather than
+    when the URLconf loads. Attributes of the view, like ``csrf_exempt``, are
+    not visible to middleware: only use it for views that are read only.
+    """
+
+    @cache
+    def load():
+        return import_string(path).as_view(**initkwargs)
+
+    def view(request, *args, **kwargs):
+        return load()(request, *args, **kwargs)
+
+    return view
+
+
+@transaction.non_atomic_requests
+def metrics_view(request):
+    """
+    Metrics of every worker, in the Prometheus text format. Outside DEBUG,
+    only served to scrapers sending ``METRICS_TOKEN`` as a bearer token.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        sent = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not constant_time_compare(sent, token):
+            raise Http404
+    elif not settings.DEBUG:
+        raise Http404
+    response = HttpResponse(
+        metrics.render(outbox.MetricsCollector()),
+        content_type=CONTENT_TYPE_LATEST,
+    )
+    add_never_cache_headers(response)
+    return response
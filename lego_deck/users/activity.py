@@ -0,0 +1,139 @@
+"""
+Buffered ``last_seen`` timestamps.
+
+Writing a timestamp to ``users_user`` on every request turns the hottest table
+into a write hotspot. Timestamps are recorded in a Redis hash instead (one
+field per user id, so repeated activity coalesces into a single value) and
+:func:`flush` applies them to PostgreSQL in bulk from a periodic task.
+
+``last_login`` is still written on login, by Django: password reset tokens
+are derived from it, a buffered value would leave them valid after a login.
+
+Until a flush runs the database lags behind, readers that care use
+:func:`merge_buffered` to overlay the pending values.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import typing
+from datetime import UTC
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection
+from redis.exceptions import RedisError
+from redis.exceptions import ResponseError
+
+from lego_deck.core.redis import get_redis_connection
+
+from .models import User
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+KEY = "users:activity:last_seen"
+FLUSHING_KEY = f"{KEY}:flushing"
+FLUSH_LOCK_KEY = f"{KEY}:flush"
+# Rows per UPDATE statement when flushing.
+FLUSH_CHUNK_SIZE = 1000
+
+# When this process last recorded activity for a user id, to skip
+# redundant Redis writes within USER_ACTIVITY_RESOLUTION.
+_recently_seen: dict[int, float] = {}
+_RECENTLY_SEEN_MAX_SIZE = 10_000
+
+
+def record_activity(user_id: int) -> None:
+    """Buffer the current time as ``last_seen``, at most once per resolution."""
+    now = time.monotonic()
+    last = _recently_seen.get(user_id)
+    if last is not None and now - last < settings.USER_ACTIVITY_RESOLUTION:
+        return
+    if len(_recently_seen) >= _RECENTLY_SEEN_MAX_SIZE:
+        _recently_seen.clear()
+    _recently_seen[user_id] = now
+    try:
+        get_redis_connection().hset(KEY, str(user_id), str(time.time()))
+    except RedisError:
+        # Losing a last_seen update is harmless, failing the request isn't.
+        logger.warning("Redis unavailable, last_seen not recorded")
+
+
+def _from_timestamp(value: bytes | str) -> datetime:
+    return datetime.fromtimestamp(float(value), tz=UTC)
+
+
+def get_buffered(user_ids: Iterable[int]) -> dict[int, datetime]:
+    """Return the pending ``last_seen`` of ``user_ids``, including those mid-flush."""
+    keys = [str(pk) for pk in user_ids]
+    if not keys:
+        return {}
+    pipe = get_redis_connection().pipeline(transaction=False)
+    pipe.hmget(FLUSHING_KEY, keys)
+    pipe.hmget(KEY, keys)
+    flushing, live = pipe.execute()
+    buffered = {}
+    for pk, *values in zip(keys, flushing, live, strict=True):
+        timestamps = [_from_timestamp(v) for v in values if v is not None]
+        if timestamps:
+            buffered[int(pk)] = max(timestamps)
+    return buffered
+
+
+def merge_buffered(users: Iterable[User]) -> None:
+    """Overlay pending timestamps on ``users`` in memory, for display."""
+    users = list(users)
+    buffered = get_buffered(user.pk for user in users)
+    for user in users:
+        value = buffered.get(user.pk)
+        if value is not None and (user.last_seen is None or value > user.last_seen):
+            user.last_seen = value
+
+
+def _bulk_update(values: list[tuple[int, datetime]]) -> None:
+    qn = connection.ops.quote_name
+    table = qn(User._meta.db_table)
+    rows = ", ".join(["(%s::bigint, %s::timestamptz)"] * len(values))
+    sql = (
+        f"UPDATE {table} AS u SET last_seen = GREATEST(u.last_seen, v.ts) "  # noqa: S608
+        f"FROM (VALUES {rows}) AS v(id, ts) WHERE u.id = v.id"
+    )
+    params: list[int | datetime] = []
+    for pk, ts in values:
+        params += [pk, ts]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def flush() -> int:
+    """
+    Write buffered timestamps to the database, return how many there were.
+
+    The live hash is renamed before it is read, so activity recorded during
+    the flush lands in a fresh hash. A hash left behind by a failed flush is
+    retried first. A Redis lock keeps concurrent flushes from renaming the
+    hash under one another, a flush that can't take it updates nothing.
+    """
+    redis = get_redis_connection()
+    lock = redis.lock(FLUSH_LOCK_KEY, timeout=settings.CELERY_TASK_SOFT_TIME_LIMIT)
+    if not lock.acquire(blocking=False):
+        return 0
+    try:
+        if not redis.exists(FLUSHING_KEY):
+            try:
+                redis.rename(KEY, FLUSHING_KEY)
+            except ResponseError:
+                # Nothing was buffered since the last flush.
+                return 0
+        buffered = typing.cast("dict[bytes, bytes]", redis.hgetall(FLUSHING_KEY))
+        values = [(int(pk), _from_timestamp(ts)) for pk, ts in buffered.items()]
+        for start in range(0, len(values), FLUSH_CHUNK_SIZE):
+            _bulk_update(values[start : start + FLUSH_CHUNK_SIZE])
+        redis.delete(FLUSHING_KEY)
+    finally:
+        lock.release()
+    return len(values)
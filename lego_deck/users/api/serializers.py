@@ -4,9 +4,16 @@ from lego_deck.users.models import User
 
 
 class UserSerializer(serializers.ModelSerializer[User]):
+    # Variant URLs by size and format, empty until they are generated.
+    avatar = serializers.DictField(
+        child=serializers.DictField(child=serializers.URLField()),
+        source="avatar_urls",
+        read_only=True,
+    )
+
     class Meta:
         model = User
-        fields = ["username", "name", "url"]
+        fields = ["username", "name", "avatar", "url"]
 
         extra_kwargs = {
             "url": {"view_name": "api:user-detail", "lookup_field": "username"},
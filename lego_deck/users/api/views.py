@@ -1,4 +1,5 @@
 from rest_framework import status
+from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.decorators import action
 from rest_framework.mixins import ListModelMixin
 from rest_framework.mixins import RetrieveModelMixin
@@ -6,6 +7,8 @@ from rest_framework.mixins import UpdateModelMixin
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from lego_deck.core.api.throttling import LoginIPThrottle
+from lego_deck.core.api.throttling import LoginUsernameThrottle
 from lego_deck.users.models import User
 
 from .serializers import UserSerializer
@@ -24,3 +27,8 @@ class UserViewSet(RetrieveModelMixin, ListModelMixin, UpdateModelMixin, GenericV
     def me(self, request):
         serializer = UserSerializer(request.user, context={"request": request})
         return Response(status=status.HTTP_200_OK, data=serializer.data)
+
+
+class ObtainAuthTokenView(ObtainAuthToken):
+    # Throttled before the credentials, and the password's hash, are checked.
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
@@ -0,0 +1,83 @@
+"""
+Fixed-size avatar variants.
+
+Resizing on request would put image decoding on the hot path, so variants are
+generated once by a Celery task when the avatar changes. Each size is stored as
+WebP, and as JPEG for clients without WebP support, next to the original in the
+media storage. ``User.avatar_variants`` records their names.
+"""
+
+from __future__ import annotations
+
+import io
+import posixpath
+import typing
+
+from django.core.files.base import ContentFile
+from PIL import Image
+from PIL import ImageOps
+
+from lego_deck.core.fragments import bump_version
+
+from .models import User
+
+# Square sizes in pixels, templates refer to them by value.
+SIZES = (64, 256)
+# Format name -> (file extension, Pillow save options).
+FORMATS: dict[str, tuple[str, dict[str, typing.Any]]] = {
+    "webp": ("webp", {"format": "WEBP", "quality": 80, "method": 4}),
+    "jpeg": ("jpg", {"format": "JPEG", "quality": 85, "optimize": True}),
+}
+
+
+def render_variants(image: Image.Image) -> dict[tuple[int, str], bytes]:
+    """Encode ``image`` cropped to each of ``SIZES``, in each of ``FORMATS``."""
+    # Lets the JPEG decoder scale down by up to 8x while decoding, the
+    # biggest saving on large photos.
+    image.draft("RGB", (max(SIZES), max(SIZES)))
+    ImageOps.exif_transpose(image, in_place=True)
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    variants = {}
+    # Largest first, each size is cut from the previous one.
+    for size in sorted(SIZES, reverse=True):
+        image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        opaque = image
+        if image.mode == "RGBA":
+            opaque = Image.new("RGB", image.size, "white")
+            opaque.paste(image, mask=image.getchannel("A"))
+        for fmt, (_, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            (image if fmt == "webp" else opaque).save(buffer, **options)
+            variants[size, fmt] = buffer.getvalue()
+    return variants
+
+
+def generate_variants(user_id: int) -> dict[str, dict[str, str]]:
+    """Create the variants of a user's current avatar and record them."""
+    user = User.objects.filter(pk=user_id).only("avatar").first()
+    if user is None or not user.avatar:
+        return {}
+    name, storage = user.avatar.name, user.avatar.storage
+    with user.avatar.open("rb") as original, Image.open(original) as image:
+        rendered = render_variants(image)
+
+    root = posixpath.splitext(name)[0]
+    variants: dict[str, dict[str, str]] = {}
+    for (size, fmt), data in rendered.items():
+        extension = FORMATS[fmt][0]
+        variants.setdefault(str(size), {})[fmt] = storage.save(
+            f"{root}_{size}.{extension}",
+            ContentFile(data),
+        )
+    # Skip the model's save(), the outbox doesn't publish variants.
+    if not User.objects.filter(pk=user_id, avatar=name).update(
+        avatar_variants=variants,
+    ):
+        # Replaced while rendering, the new avatar has its own task.
+        for formats in variants.values():
+            for variant in formats.values():
+                storage.delete(variant)
+        return {}
+    bump_version(user)
+    return variants
@@ -0,0 +1,136 @@
+"""
+Argon2 password hashing, off the threads serving requests.
+
+Argon2 is made to be costly, in CPU and in memory, and every login, signup and
+password change pays for it. Each process hands its hashes to a pool of
+``PASSWORD_HASHING_WORKERS`` processes, and lets at most
+``PASSWORD_HASHING_QUEUE`` more wait for one of them: beyond that
+``PasswordHashingUnavailable`` is raised straight away, and answered with a 503
+by ``PasswordHashingMiddleware``, rather than have a burst of logins tie up
+every thread of every gunicorn worker. Count the memory of the pool, about
+``ARGON2_MEMORY_COST`` KiB per process, on top of that of the workers.
+
+The costs are set by ``ARGON2_TIME_COST``, ``ARGON2_MEMORY_COST`` and
+``ARGON2_PARALLELISM``. Passwords hashed with other costs, or by another of
+the ``PASSWORD_HASHERS``, are rehashed with these when their user next logs in.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import typing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import argon2
+from django.conf import settings
+from django.contrib.auth import hashers
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class PasswordHashingUnavailable(Exception):  # noqa: N818
+    """The hashing processes are all busy, and enough hashes wait for them."""
+
+
+class HashingPool:
+    """Processes hashing passwords, started on first use in each process."""
+
+    def __init__(self):
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots: threading.BoundedSemaphore | None = None
+        self._lock = threading.Lock()
+
+    def run(self, function: Callable, *args):
+        """Return ``function(*args)``, called in the pool if there's one."""
+        workers = settings.PASSWORD_HASHING_WORKERS
+        if not workers:
+            return function(*args)
+        executor, slots = self.start(workers)
+        if not slots.acquire(blocking=False):
+            raise PasswordHashingUnavailable
+        try:
+            return executor.submit(function, *args).result()
+        except BrokenProcessPool:
+            # A process died, killed for its memory say: start over next time.
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            raise
+        finally:
+            slots.release()
+
+    def start(self, workers: int):
+        """Start the pool unless it runs, return it and its places."""
+        with self._lock:
+            if self._executor is None:
+                # Forked from a server process rather than from this one,
+                # which has threads, and started with this module imported.
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload([__name__])
+                self._executor = ProcessPoolExecutor(workers, mp_context=context)
+                self._slots = threading.BoundedSemaphore(
+                    workers + settings.PASSWORD_HASHING_QUEUE,
+                )
+            return self._executor, self._slots
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def reset(self) -> None:
+        """Forget the pool of the parent, in a forked process."""
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+
+pool = HashingPool()
+os.register_at_fork(after_in_child=pool.reset)
+
+
+# Run in the pool: Django's hasher, with the costs it's given.
+
+
+def _encode(password: str, salt: str, costs: tuple[int, int, int]) -> str:
+    hasher = hashers.Argon2PasswordHasher()
+    hasher.time_cost, hasher.memory_cost, hasher.parallelism = costs
+    return hasher.encode(password, salt)
+
+
+def _verify(password: str, encoded: str) -> bool:
+    return hashers.Argon2PasswordHasher().verify(password, encoded)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Django's Argon2 hasher, with costs from the settings, run in ``pool``."""
+
+    def params(self):
+        # As Django's, which reads its costs from here only.
+        return argon2.Parameters(
+            type=argon2.low_level.Type.ID,
+            version=argon2.low_level.ARGON2_VERSION,
+            salt_len=argon2.DEFAULT_RANDOM_SALT_LENGTH,
+            hash_len=argon2.DEFAULT_HASH_LENGTH,
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM,
+        )
+
+    def encode(self, password: str, salt: str) -> str:
+        params = self.params()
+        costs = (params.time_cost, params.memory_cost, params.parallelism)
+        return pool.run(_encode, password, salt, costs)
+
+    def verify(self, password: str, encoded: str) -> bool:
+        return pool.run(_verify, password, encoded)
@@ -0,0 +1,103 @@
+import math
+
+from django.http import HttpResponse
+from django.http import JsonResponse
+from django.shortcuts import render
+from rest_framework.views import APIView
+
+from lego_deck.core import throttling
+
+from . import activity
+from .hashers import PasswordHashingUnavailable
+
+# Seconds clients are told to wait before retrying a login refused for load.
+RETRY_AFTER = 1
+
+
+class LastSeenMiddleware:
+    """Buffer the time authenticated users were last seen, see `activity`."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        # Checked after the view so users authenticated by DRF count too.
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            activity.record_activity(user.pk)
+        return response
+
+
+class PasswordHashingMiddleware:
+    """Answer with a 503 when passwords can't be hashed, see `hashers`."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, PasswordHashingUnavailable):
+            return None
+        response: HttpResponse
+        if self.wants_json(request):
+            response = JsonResponse(
+                {"detail": "Too busy checking passwords, try again shortly."},
+                status=503,
+            )
+        else:
+            response = render(request, "503.html", status=503)
+        response["Retry-After"] = str(RETRY_AFTER)
+        return response
+
+    @staticmethod
+    def wants_json(request) -> bool:
+        # API clients often send no Accept header, or */*, rather than JSON's.
+        view = getattr(request.resolver_match, "func", None)
+        return issubclass(getattr(view, "cls", object), APIView) or any(
+            media_type.match("application/json") and media_type.sub_type != "*"
+            for media_type in request.accepted_types
+        )
+
+
+class LoginThrottleMiddleware:
+    """
+    Refuse logins and signups over the `THROTTLE_RATES` with a 429.
+
+    Logins are limited per IP address and per username, signups per IP
+    address, before the view runs and any password is hashed. The refusal is
+    plain text, no template is rendered for a client sending a flood.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method != "POST":
+            return None
+        url_name = request.resolver_match.url_name
+        if url_name == "account_login":
+            keys = [
+                ("login_ip", throttling.client_ip(request)),
+                ("login_username", request.POST.get("login", "").lower()),
+            ]
+        elif url_name == "account_signup":
+            keys = [("signup_ip", throttling.client_ip(request))]
+        else:
+            return None
+        for scope, key in keys:
+            wait = throttling.hit(scope, key) if key else None
+            if wait is not None:
+                response = HttpResponse(
+                    "Too many attempts, try again later.\n",
+                    content_type="text/plain",
+                    status=429,
+                )
+                response["Retry-After"] = str(math.ceil(wait))
+                return response
+        return None
@@ -0,0 +1,26 @@
+from django.db import migrations
+from django.db import models
+
+from lego_deck.core.db.operations import SetLockTimeout
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        # A nullable column without default is a catalog-only change, but its
+        # brief ACCESS EXCLUSIVE lock must not queue behind long transactions.
+        SetLockTimeout("5s"),
+        migrations.AddField(
+            model_name="user",
+            name="last_seen",
+            field=models.DateTimeField(
+                blank=True,
+                null=True,
+                verbose_name="Last seen",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+from django.db import models
+
+import lego_deck.users.models
+from lego_deck.core.db.operations import SetLockTimeout
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_user_last_seen"),
+    ]
+
+    operations = [
+        # Constant defaults are stored in the catalog since PostgreSQL 11, no
+        # table rewrite, only a brief ACCESS EXCLUSIVE lock.
+        SetLockTimeout("5s"),
+        migrations.AddField(
+            model_name="user",
+            name="avatar",
+            field=models.ImageField(
+                blank=True,
+                upload_to=lego_deck.users.models.avatar_upload_to,
+                verbose_name="Avatar",
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="avatar_variants",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Avatar variants",
+            ),
+        ),
+    ]
@@ -1,8 +1,39 @@
+import posixpath
+import uuid
+
 from django.contrib.auth.models import AbstractUser
+from django.db import transaction
 from django.db.models import CharField
+from django.db.models import DateTimeField
+from django.db.models import ImageField
+from django.db.models import JSONField
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+from lego_deck.core import outbox
+
+# Fields other services are told about through the outbox.
+PUBLISHED_FIELDS = ("username", "name", "email", "is_active")
+
+
+def avatar_upload_to(instance: "User", filename: str) -> str:
+    # A new name per upload, so variants of an old avatar never get served
+    # for the new one.
+    extension = posixpath.splitext(filename)[1].lower()
+    return f"avatars/{uuid.uuid4().hex}{extension}"
+
+
+def _delete_files_on_commit(storage, names: list[str], using: str | None) -> None:
+    """Delete ``names`` from ``storage`` once the transaction commits."""
+    if not names:
+        return
+
+    def delete():
+        for name in names:
+            storage.delete(name)
+
+    transaction.on_commit(delete, using=using)
+
 
 class User(AbstractUser):
     """
@@ -15,6 +46,94 @@ class User(AbstractUser):
     name = CharField(_("Name of User"), blank=True, max_length=255)
     first_name = None  # type: ignore[assignment]
     last_name = None  # type: ignore[assignment]
+    # Buffered in Redis and flushed periodically, see lego_deck.users.activity.
+    last_seen = DateTimeField(_("Last seen"), blank=True, null=True)
+    avatar = ImageField(_("Avatar"), upload_to=avatar_upload_to, blank=True)
+    # Resized copies of the avatar by size and format, filled in by
+    # lego_deck.users.avatars once the avatar is saved.
+    avatar_variants = JSONField(
+        _("Avatar variants"),
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+
+    # As last loaded or saved, see from_db().
+    _loaded_is_active: bool | None = None
+    _loaded_avatar: str | None = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_active = instance.__dict__.get("is_active")  # noqa: SLF001
+        instance._loaded_avatar = instance.__dict__.get("avatar")  # noqa: SLF001
+        return instance
+
+    @property
+    def avatar_changed(self) -> bool:
+        """Whether the avatar differs from the one last loaded or saved."""
+        loaded = self._loaded_avatar
+        if loaded is None and not self._state.adding:
+            # Deferred when loaded, can't tell.
+            return False
+        return (self.avatar.name or "") != (loaded or "")
+
+    @property
+    def avatar_urls(self) -> dict[str, dict[str, str]]:
+        """URLs of the avatar variants, e.g. ``avatar_urls["64"]["webp"]``."""
+        storage = self.avatar.storage
+        return {
+            size: {fmt: storage.url(name) for fmt, name in formats.items()}
+            for size, formats in self.avatar_variants.items()
+        }
+
+    def save(self, *args, **kwargs):
+        """Save and record a `users` outbox event in the same transaction.
+
+        Changes made with `QuerySet.update()` bypass this and aren't published.
+        """
+        update_fields = kwargs.get("update_fields")
+        using = kwargs.get("using")
+        stale_variants = []
+        if self.avatar_changed:
+            # Regenerated for the new avatar once saved, see signals.py, the
+            # files of the old ones deleted.
+            stale_variants = [
+                name
+                for formats in self.avatar_variants.values()
+                for name in formats.values()
+            ]
+            self.avatar_variants = {}
+            if update_fields is not None:
+                kwargs["update_fields"] = update_fields = {
+                    *update_fields,
+                    "avatar_variants",
+                }
+        if update_fields is not None and not set(update_fields) & set(
+            PUBLISHED_FIELDS,
+        ):
+            super().save(*args, **kwargs)
+            self._loaded_avatar = self.avatar.name
+            _delete_files_on_commit(self.avatar.storage, stale_variants, using)
+            return
+        adding = self._state.adding
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            _delete_files_on_commit(self.avatar.storage, stale_variants, using)
+            if adding:
+                event_type = "created"
+            elif not self.is_active and self._loaded_is_active:
+                event_type = "deactivated"
+            else:
+                event_type = "updated"
+            outbox.publish(
+                "users",
+                str(self.pk),
+                event_type,
+                {"id": self.pk, **{f: getattr(self, f) for f in PUBLISHED_FIELDS}},
+            )
+        self._loaded_is_active = self.is_active
+        self._loaded_avatar = self.avatar.name
 
     def get_absolute_url(self) -> str:
         """Get URL for user's detail view.
@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from lego_deck.core.fragments import bump_version
+
+from .models import User
+from .tasks import generate_avatar_variants
+
+
+@receiver(post_save, sender=User, dispatch_uid="bump_user_fragment_version")
+def bump_fragment_version(sender, instance, **kwargs):
+    # Once committed, so a concurrent render can't cache the old state again.
+    transaction.on_commit(lambda: bump_version(instance))
+
+
+@receiver(post_save, sender=User, dispatch_uid="generate_avatar_variants")
+def queue_avatar_variants(sender, instance, **kwargs):
+    if instance.avatar and instance.avatar_changed:
+        user_id = instance.pk
+        transaction.on_commit(lambda: generate_avatar_variants.delay(user_id))
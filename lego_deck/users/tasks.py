@@ -1,5 +1,7 @@
 from celery import shared_task
 
+from . import activity
+from . import avatars
 from .models import User
 
 
@@ -7,3 +9,15 @@ from .models import User
 def get_users_count():
     """A pointless Celery task to demonstrate usage."""
     return User.objects.count()
+
+
+@shared_task()
+def flush_activity():
+    """Write buffered last_seen timestamps to the database."""
+    return activity.flush()
+
+
+@shared_task()
+def generate_avatar_variants(user_id: int):
+    """Resize a user's new avatar, see lego_deck.users.avatars."""
+    return avatars.generate_variants(user_id)
@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.signals import user_logged_in
+from django.contrib.auth.tokens import default_token_generator
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from lego_deck.core.redis import get_redis_connection
+from lego_deck.users import activity
+from lego_deck.users.middleware import LastSeenMiddleware
+from lego_deck.users.models import User
+from lego_deck.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _forget_recently_seen(settings, monkeypatch):
+    settings.USER_ACTIVITY_RESOLUTION = 60
+    monkeypatch.setattr(activity, "_recently_seen", {})
+
+
+def test_login_is_written_at_once(user: User, rf: RequestFactory):
+    token = default_token_generator.make_token(user)
+
+    user_logged_in.send(sender=User, request=rf.get("/"), user=user)
+
+    user.refresh_from_db()
+    assert user.last_login is not None
+    # Password reset links sent before the login no longer work.
+    assert not default_token_generator.check_token(user, token)
+
+
+def test_activity_is_coalesced(user: User):
+    activity.record_activity(user.pk)
+    first = activity.get_buffered([user.pk])[user.pk]
+
+    activity.record_activity(user.pk)
+
+    assert activity.get_buffered([user.pk])[user.pk] == first
+
+
+def test_merge_buffered_keeps_newest(user: User):
+    activity.record_activity(user.pk)
+    buffered = activity.get_buffered([user.pk])[user.pk]
+
+    activity.merge_buffered([user])
+    assert user.last_seen == buffered
+
+    user.last_seen = newer = timezone.now() + timedelta(days=1)
+    activity.merge_buffered([user])
+    assert user.last_seen == newer
+
+
+def test_flush_writes_to_database():
+    users = UserFactory.create_batch(3)
+    for user in users:
+        activity.record_activity(user.pk)
+
+    assert activity.flush() == len(users)
+
+    assert not User.objects.filter(last_seen=None).exists()
+    assert activity.get_buffered([u.pk for u in users]) == {}
+    assert activity.flush() == 0
+
+
+def test_flush_never_moves_timestamps_back(user: User):
+    activity.record_activity(user.pk)
+    future = timezone.now() + timedelta(days=1)
+    User.objects.filter(pk=user.pk).update(last_seen=future)
+
+    activity.flush()
+
+    user.refresh_from_db()
+    assert user.last_seen == future
+
+
+def test_flush_skipped_while_another_runs(user: User):
+    activity.record_activity(user.pk)
+    lock = get_redis_connection().lock(activity.FLUSH_LOCK_KEY)
+    lock.acquire()
+
+    assert activity.flush() == 0
+
+    lock.release()
+    assert activity.flush() == 1
+
+
+class TestLastSeenMiddleware:
+    def test_records_authenticated_users(self, user: User, rf: RequestFactory):
+        request = rf.get("/")
+        request.user = user
+
+        LastSeenMiddleware(lambda r: HttpResponse())(request)
+
+        assert user.pk in activity.get_buffered([user.pk])
+
+    def test_ignores_anonymous_users(self, rf: RequestFactory):
+        request = rf.get("/")
+        request.user = AnonymousUser()
+
+        LastSeenMiddleware(lambda r: HttpResponse())(request)
+
+        assert not get_redis_connection().exists(activity.KEY)
@@ -0,0 +1,148 @@
+import io
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.template.loader import render_to_string
+from PIL import Image
+
+from lego_deck.users import avatars
+from lego_deck.users.api.serializers import UserSerializer
+from lego_deck.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def _image(mode="RGB", size=(800, 600), format_="JPEG") -> bytes:
+    buffer = io.BytesIO()
+    Image.new(mode, size, "red").save(buffer, format=format_)
+    return buffer.getvalue()
+
+
+@pytest.fixture()
+def storage(settings):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    }
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    return default_storage
+
+
+def _set_avatar(user: User, data: bytes, captured) -> None:
+    with captured(execute=True):
+        user.avatar.save("me.jpg", ContentFile(data))
+
+
+@pytest.mark.parametrize(
+    ("mode", "format_"),
+    [("RGB", "JPEG"), ("RGBA", "PNG"), ("P", "GIF"), ("L", "PNG")],
+)
+def test_render_variants(mode, format_):
+    variants = avatars.render_variants(
+        Image.open(io.BytesIO(_image(mode, format_=format_))),
+    )
+
+    assert set(variants) == {
+        (size, fmt) for size in avatars.SIZES for fmt in avatars.FORMATS
+    }
+    for (size, fmt), data in variants.items():
+        with Image.open(io.BytesIO(data)) as variant:
+            assert variant.size == (size, size)
+            assert variant.format == avatars.FORMATS[fmt][1]["format"]
+
+
+def test_variants_generated_on_upload(
+    user: User,
+    storage,
+    django_capture_on_commit_callbacks,
+):
+    _set_avatar(user, _image(), django_capture_on_commit_callbacks)
+
+    user.refresh_from_db()
+    assert set(user.avatar_variants) == {str(size) for size in avatars.SIZES}
+    webp = user.avatar_variants["64"]["webp"]
+    assert webp.startswith(user.avatar.name.rsplit(".", 1)[0])
+    assert storage.exists(webp)
+    assert user.avatar_urls["64"]["webp"] == storage.url(webp)
+
+
+def test_new_avatar_replaces_variants(
+    user: User,
+    storage,
+    django_capture_on_commit_callbacks,
+):
+    _set_avatar(user, _image(), django_capture_on_commit_callbacks)
+    user.refresh_from_db()
+    old_variants = user.avatar_variants
+
+    old_names = [name for formats in old_variants.values() for name in formats.values()]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.avatar.save("new.jpg", ContentFile(_image()))
+        # Cleared as soon as the avatar changes, the files once committed.
+        assert user.avatar_variants == {}
+        assert all(storage.exists(name) for name in old_names)
+
+    user.refresh_from_db()
+    assert user.avatar_variants
+    assert user.avatar_variants != old_variants
+    assert not any(storage.exists(name) for name in old_names)
+
+
+def test_variants_kept_when_new_avatar_rolled_back(
+    user: User,
+    storage,
+    django_capture_on_commit_callbacks,
+):
+    _set_avatar(user, _image(), django_capture_on_commit_callbacks)
+    user.refresh_from_db()
+    names = [
+        name for formats in user.avatar_variants.values() for name in formats.values()
+    ]
+
+    with django_capture_on_commit_callbacks() as callbacks, transaction.atomic():
+        user.avatar.save("new.jpg", ContentFile(_image()))
+        transaction.set_rollback(True)
+
+    assert callbacks == []
+    assert all(storage.exists(name) for name in names)
+
+
+def test_saving_without_avatar_change_keeps_variants(
+    user: User,
+    storage,
+    django_capture_on_commit_callbacks,
+):
+    _set_avatar(user, _image(), django_capture_on_commit_callbacks)
+    user = User.objects.get(pk=user.pk)
+
+    user.name = "Renamed"
+    user.save()
+
+    user.refresh_from_db()
+    assert user.avatar_variants
+
+
+def test_served_variant_urls(
+    user: User,
+    storage,
+    rf,
+    django_capture_on_commit_callbacks,
+):
+    _set_avatar(user, _image(), django_capture_on_commit_callbacks)
+    user.refresh_from_db()
+    request = rf.get("/")
+    request.user = user
+
+    data = UserSerializer(user, context={"request": request}).data
+    html = render_to_string(
+        "users/user_detail.html",
+        {"object": user, "is_owner": True},
+        request=request,
+    )
+
+    assert data["avatar"] == user.avatar_urls
+    assert f'srcset="{user.avatar_urls["256"]["webp"]}"' in html
+    assert f'src="{user.avatar_urls["256"]["jpeg"]}"' in html
@@ -0,0 +1,126 @@
+import pytest
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.hashers import identify_hasher
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+from rest_framework import status
+
+from lego_deck.users import hashers
+from lego_deck.users.models import User
+from lego_deck.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+PASSWORD = "correct horse battery staple"  # noqa: S105
+
+
+@pytest.fixture(autouse=True)
+def _hasher(settings):
+    settings.PASSWORD_HASHERS = ["lego_deck.users.hashers.Argon2PasswordHasher"]
+    # As cheap as Argon2 gets.
+    settings.ARGON2_TIME_COST = 1
+    settings.ARGON2_MEMORY_COST = 8
+    settings.ARGON2_PARALLELISM = 1
+    settings.PASSWORD_HASHING_WORKERS = 1
+    settings.PASSWORD_HASHING_QUEUE = 0
+    yield
+    hashers.pool.shutdown()
+
+
+@pytest.fixture()
+def account() -> User:
+    return UserFactory(password=PASSWORD)
+
+
+@pytest.fixture()
+def _saturated(account: User):
+    """Hold the one place of the pool, as a hash in progress would."""
+    _, slots = hashers.pool.start(1)
+    slots.acquire()
+    yield
+    slots.release()
+
+
+def test_hash_in_pool():
+    encoded = make_password(PASSWORD)
+
+    assert encoded.startswith("argon2$argon2id$v=19$m=8,t=1,p=1$")
+    assert check_password(PASSWORD, encoded)
+    assert not check_password("wrong", encoded)
+    assert hashers.pool.running
+
+
+def test_hash_inline(settings):
+    settings.PASSWORD_HASHING_WORKERS = 0
+
+    assert check_password(PASSWORD, make_password(PASSWORD))
+    assert not hashers.pool.running
+
+
+@pytest.mark.usefixtures("_saturated")
+def test_saturated_pool_refuses():
+    with pytest.raises(hashers.PasswordHashingUnavailable):
+        make_password(PASSWORD)
+
+
+def test_rehashed_on_login(settings, account: User):
+    settings.ARGON2_TIME_COST = 2
+
+    assert authenticate(username=account.username, password=PASSWORD) == account
+
+    account.refresh_from_db()
+    decoded = identify_hasher(account.password).decode(account.password)
+    assert decoded["time_cost"] == settings.ARGON2_TIME_COST
+
+
+def test_rehashed_from_other_hashers(settings):
+    settings.PASSWORD_HASHERS = [
+        "lego_deck.users.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+    ]
+    user = UserFactory()
+    User.objects.filter(pk=user.pk).update(
+        password=make_password(PASSWORD, hasher="md5"),
+    )
+
+    authenticate(username=user.username, password=PASSWORD)
+
+    user.refresh_from_db()
+    assert user.password.startswith("argon2$")
+
+
+@pytest.mark.usefixtures("_saturated")
+def test_login_refused_when_saturated(client, account: User):
+    response = client.post(
+        reverse("account_login"),
+        {"login": account.username, "password": PASSWORD},
+    )
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response["Retry-After"] == "1"
+    assert "503" in response.content.decode()
+
+
+@pytest.mark.usefixtures("_saturated")
+def test_login_refused_as_json_when_asked(client, account: User):
+    response = client.post(
+        reverse("account_login"),
+        {"login": account.username, "password": PASSWORD},
+        HTTP_ACCEPT="application/json, text/html;q=0.9",
+    )
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert "detail" in response.json()
+
+
+@pytest.mark.usefixtures("_saturated")
+def test_api_token_refused_when_saturated(client, account: User):
+    response = client.post(
+        "/api/auth-token/",
+        {"username": account.username, "password": PASSWORD},
+    )
+
+    # Without an Accept header, as curl or requests send.
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert "detail" in response.json()
@@ -0,0 +1,72 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from lego_deck.core import throttling
+from lego_deck.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _rates(settings):
+    settings.THROTTLE_RATES = {
+        "login_ip": "3/m",
+        "login_username": "1/m",
+        "signup_ip": "1/h",
+    }
+
+
+@pytest.fixture()
+def authenticated(monkeypatch) -> list:
+    """Credentials checked by the token view."""
+    calls = []
+    monkeypatch.setattr(
+        "rest_framework.authtoken.serializers.authenticate",
+        lambda request, **credentials: calls.append(credentials),
+    )
+    return calls
+
+
+def test_login_throttled_per_username(client, user: User):
+    data = {"login": user.username, "password": "wrong"}
+    assert client.post(reverse("account_login"), data).status_code == status.HTTP_200_OK
+
+    data["login"] = user.username.upper()
+    response = client.post(reverse("account_login"), data)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response["Retry-After"]) <= throttling.PERIODS["m"]
+    assert response["Content-Type"] == "text/plain"
+    data["login"] = "someone-else"
+    assert client.post(reverse("account_login"), data).status_code == status.HTTP_200_OK
+
+
+def test_login_throttled_per_ip(client):
+    for n in range(3):
+        client.post(reverse("account_login"), {"login": f"user{n}", "password": "x"})
+
+    response = client.post(reverse("account_login"), {"login": "user", "password": "x"})
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    # Pages are not.
+    assert client.get(reverse("account_login")).status_code == status.HTTP_200_OK
+
+
+def test_signup_throttled_per_ip(client):
+    data = {"username": "new", "email": "new@example.com"}
+    response = client.post(reverse("account_signup"), data)
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client.post(reverse("account_signup"), data)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_auth_token_throttled_before_authentication(client, authenticated):
+    client.post("/api/auth-token/", {"username": "alice", "password": "x"})
+
+    response = client.post("/api/auth-token/", {"username": "Alice", "password": "x"})
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert len(authenticated) == 1
@@ -14,13 +14,19 @@ class UserDetailView(LoginRequiredMixin, DetailView):
     slug_field = "username"
     slug_url_kwarg = "username"
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # The page's cached fragment varies on it.
+        context["is_owner"] = self.object == self.request.user
+        return context
+
 
 user_detail_view = UserDetailView.as_view()
 
 
 class UserUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
     model = User
-    fields = ["name"]
+    fields = ["name", "avatar"]
     success_message = _("Information successfully updated")
 
     def get_success_url(self):